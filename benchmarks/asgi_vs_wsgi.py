@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+"""
+Compares the sync DRF post views served by gunicorn (WSGI) with the async
+views served by uvicorn (ASGI) under the same concurrent load.
+
+Both servers run against a throwaway SQLite database seeded by this script,
+so the project's db.sqlite3 is never touched. Usage:
+
+    python benchmarks/asgi_vs_wsgi.py --concurrency 200 --duration 20
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.utils.bench_harness import (  # noqa: E402
+    bench_env, free_port, gunicorn_command, running_server, seed_database, uvicorn_command,
+)
+from core.utils.loadgen import Operation, run_load  # noqa: E402
+
+
+def operations(prefix):
+    def list_posts(worker):
+        return 'GET', f'{prefix}listposts/?page_size=20', None
+
+    def create_post(worker):
+        return 'POST', f'{prefix}listposts/', {'title': 'bench', 'content': 'created under load'}
+
+    return [Operation('list', 8, list_posts), Operation('create', 2, create_post)]
+
+
+def bench(name, command, env, port, prefix, token, args):
+    with running_server(command, env, port) as base_url:
+        report = run_load(
+            base_url, operations(prefix), concurrency=args.concurrency, duration=args.duration,
+            headers_for_worker=lambda index: {'Authorization': f'Bearer {token}'}, seed=1,
+        )
+    return {'deployment': name, **report}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--concurrency', type=int, default=100)
+    parser.add_argument('--duration', type=float, default=15)
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--threads', type=int, default=4, help='gunicorn threads per WSGI worker')
+    parser.add_argument('--posts', type=int, default=1000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = bench_env(os.path.join(tmp, 'bench.sqlite3'))
+        token = seed_database(env, args.posts)
+
+        wsgi_port, asgi_port = free_port(), free_port()
+        results = [
+            bench('wsgi', gunicorn_command(wsgi_port, args.workers, args.threads), env, wsgi_port, '/', token, args),
+            bench('asgi', uvicorn_command(asgi_port, args.workers), env, asgi_port, '/async/', token, args),
+        ]
+
+    print(json.dumps(results, indent=2))
+    print(f"{'deployment':<12}{'rps':>10}{'p50 ms':>10}{'p99 ms':>10}{'errors':>10}", file=sys.stderr)
+    for result in results:
+        print(
+            f"{result['deployment']:<12}{result['throughput_rps']:>10}{result['p50_ms']:>10}"
+            f"{result['p99_ms']:>10}{result['errors']:>10}",
+            file=sys.stderr,
+        )
+
+
+if __name__ == '__main__':
+    main()
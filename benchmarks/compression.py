@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+"""
+Micro-benchmark of response compression on feed-shaped JSON payloads:
+bytes saved and CPU time per response, for gzip and (when the Brotli
+package is installed) brotli, at the levels CompressionMiddleware uses.
+
+Payloads are lists of post representations of increasing length, encoded
+with the same `dumps` the API renderer uses. No database is needed. Usage:
+
+    python benchmarks/compression.py --sizes 1 10 100 1000 10000 --repeat 15
+"""
+import argparse
+import datetime
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def setup_django():
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'codeleap_backend_django.settings')
+    os.environ.setdefault('SECRET_KEY', 'benchmark-secret-key-with-enough-length-for-hs256')
+    import django
+    django.setup()
+
+
+def payload(posts):
+    from core.utils.renderers import dumps
+    created = datetime.datetime(2024, 5, 1, tzinfo=datetime.timezone.utc)
+    return dumps([
+        {
+            'id': i,
+            'username': f'author{i % 20}',
+            'title': f'Post {i}',
+            'content': f'Lorem ipsum dolor sit amet {i} ' * 6,
+            'created_datetime': created + datetime.timedelta(minutes=i),
+            'updated_at': created + datetime.timedelta(minutes=i),
+            'author': {'id': i % 20, 'username': f'author{i % 20}', 'first_name': 'Author', 'last_name': str(i % 20)},
+        }
+        for i in range(posts)
+    ])
+
+
+def encoders():
+    from core.middleware.compression import DEFAULTS, _Compressor, brotli
+    names = ['gzip'] + (['br'] if brotli is not None else [])
+    return {name: (lambda data, name=name: _Compressor(name, DEFAULTS).whole(data)) for name in names}
+
+
+def measure(function, data, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        compressed = function(data)
+        timings.append(time.perf_counter() - start)
+    return {
+        'bytes': len(compressed),
+        'saved_pct': round(100 * (1 - len(compressed) / len(data)), 1),
+        'cpu_ms': round(statistics.median(timings) * 1000, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1, 10, 100, 1000, 10000])
+    parser.add_argument('--repeat', type=int, default=15)
+    args = parser.parse_args()
+
+    setup_django()
+    results = []
+    for posts in args.sizes:
+        data = payload(posts)
+        results.append({
+            'posts': posts,
+            'bytes': len(data),
+            **{name: measure(function, data, args.repeat) for name, function in encoders().items()},
+        })
+
+    print(json.dumps(results, indent=2))
+    names = list(encoders())
+    print(f"{'posts':>7}{'bytes':>11}" + ''.join(f"{name + ' saved':>14}{name + ' ms':>11}" for name in names), file=sys.stderr)
+    for result in results:
+        print(
+            f"{result['posts']:>7}{result['bytes']:>11}"
+            + ''.join(f"{result[name]['saved_pct']:>13}%{result[name]['cpu_ms']:>11}" for name in names),
+            file=sys.stderr,
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+"""
+Stress test of optimistic concurrency on PATCH /editpost/<id>/: several
+editors append their own token to the same post at once, each with a
+read-modify-write loop that sends the version it read and retries on 412.
+Afterwards every token must be in the post; anything missing is a lost
+update. --blind drops the version from the edits to show what happens
+without it.
+
+A throwaway database and a gunicorn server are started per run. Usage:
+
+    python benchmarks/concurrent_edits.py --editors 16 --edits 20 --workers 4 --threads 4
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.utils.bench_harness import (  # noqa: E402
+    bench_env, free_port, gunicorn_command, running_server, seed_accounts,
+)
+
+
+def call(base_url, token, method, path, body=None):
+    request = urllib.request.Request(
+        f'{base_url}{path}', method=method,
+        data=json.dumps(body).encode() if body is not None else None,
+        headers={'Authorization': f'Bearer {token}', 'Content-Type': 'application/json'},
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=30) as response:
+            return response.status, json.loads(response.read() or b'null')
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read() or b'null')
+
+
+def read_post(base_url, token, post_id):
+    # The export is read straight from the database; the feed may be cached per worker
+    _, posts = call(base_url, token, 'GET', '/posts/export/')
+    return next(post for post in posts if post['id'] == post_id)
+
+
+def editor(base_url, token, post_id, name, edits, blind, stats, lock):
+    for index in range(edits):
+        while True:
+            post = read_post(base_url, token, post_id)
+            body = {'content': f"{post['content']} {name}.{index}"}
+            if not blind:
+                body['version'] = post['version']
+            status, _ = call(base_url, token, 'PATCH', f'/editpost/{post_id}/', body)
+            with lock:
+                stats[status] = stats.get(status, 0) + 1
+            if status == 200:
+                break
+            if status != 412:
+                raise RuntimeError(f'PATCH respondeu {status}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--editors', type=int, default=16)
+    parser.add_argument('--edits', type=int, default=20, help='successful edits per editor')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--blind', action='store_true', help='edit without sending the version')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = bench_env(os.path.join(tmp, 'bench.sqlite3'))
+        account = seed_accounts(env, 1, 1, sample=1)[0]
+        token, post_id = account['token'], account['posts'][0]
+        port = free_port()
+        with running_server(gunicorn_command(port, args.workers, args.threads), env, port) as base_url:
+            stats, lock = {}, threading.Lock()
+            threads = [
+                threading.Thread(target=editor, args=(
+                    base_url, token, post_id, f'e{index}', args.edits, args.blind, stats, lock,
+                ))
+                for index in range(args.editors)
+            ]
+            started = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - started
+            post = read_post(base_url, token, post_id)
+
+    expected = {f'e{editor}.{index}' for editor in range(args.editors) for index in range(args.edits)}
+    found = set(post['content'].split()) & expected
+    print(json.dumps({
+        'editors': args.editors,
+        'edits_per_editor': args.edits,
+        'blind': args.blind,
+        'seconds': round(elapsed, 2),
+        'responses': stats,
+        'final_version': post['version'],
+        'lost_updates': len(expected - found),
+    }, indent=2))
+    return 1 if expected - found else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
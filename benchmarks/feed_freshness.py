@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+"""
+Checks that /listposts/ stays fresh across server processes: every round
+warms each worker's feed cache, creates a post through one of them, then
+reads the feed --reads times, half of them revalidating with the ETag from
+before the write. Each read must list the new post, and an ETag must always
+come with the same body; a worker serving its cached page under the new
+validators would leave clients stuck on 304 with stale data.
+
+A throwaway database and a server with several workers are started per run.
+Usage:
+
+    python benchmarks/feed_freshness.py --rounds 20 --workers 4
+    python benchmarks/feed_freshness.py --server uvicorn --path /async/listposts/
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.utils.bench_harness import (  # noqa: E402
+    bench_env, free_port, gunicorn_command, running_server, seed_accounts, uvicorn_command,
+)
+
+
+def call(base_url, token, method, path, body=None, etag=None):
+    headers = {'Authorization': f'Bearer {token}', 'Content-Type': 'application/json'}
+    if etag:
+        headers['If-None-Match'] = etag
+    request = urllib.request.Request(
+        f'{base_url}{path}', method=method, headers=headers,
+        data=json.dumps(body).encode() if body is not None else None,
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=30) as response:
+            return response.status, response.headers.get('ETag'), response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.headers.get('ETag'), e.read()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rounds', type=int, default=20)
+    parser.add_argument('--reads', type=int, default=16, help='feed reads after each write')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--server', choices=('gunicorn', 'uvicorn'), default='gunicorn')
+    parser.add_argument('--path', default='/listposts/')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = bench_env(os.path.join(tmp, 'bench.sqlite3'))
+        token = seed_accounts(env, 1, 50)[0]['token']
+        port = free_port()
+        command = (gunicorn_command if args.server == 'gunicorn' else uvicorn_command)(port, args.workers)
+        with running_server(command, env, port) as base_url:
+            stale = not_modified = 0
+            bodies = {}
+            for index in range(args.rounds):
+                # Several reads per worker, so each one has the current feed cached
+                for _ in range(args.workers * 4):
+                    _, etag, _ = call(base_url, token, 'GET', args.path)
+                title = f'fresh-{index}'
+                status, _, _ = call(base_url, token, 'POST', '/createpost/', {'title': title, 'content': 'Body'})
+                if status != 201:
+                    raise RuntimeError(f'POST /createpost/ respondeu {status}')
+                for read in range(args.reads):
+                    status, new_etag, body = call(base_url, token, 'GET', args.path, etag=etag if read % 2 else None)
+                    if status == 304:
+                        not_modified += 1
+                        continue
+                    posts = json.loads(body)
+                    posts = posts['results'] if isinstance(posts, dict) else posts
+                    if title not in [post['title'] for post in posts]:
+                        stale += 1
+                    bodies.setdefault(new_etag, set()).add(hashlib.sha256(body).hexdigest())
+
+    conflicting = sum(1 for digests in bodies.values() if len(digests) > 1)
+    print(json.dumps({
+        'server': args.server,
+        'workers': args.workers,
+        'rounds': args.rounds,
+        'reads': args.rounds * args.reads,
+        'stale_reads': stale,
+        'stale_304s': not_modified,
+        'etags_with_several_bodies': conflicting,
+    }, indent=2))
+    return 1 if stale or not_modified or conflicting else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+"""
+Micro-benchmark of the post list serialization paths on 10k posts, each
+measured from the query to the rendered JSON bytes:
+
+    model_serializer  PostSerializer(many=True) over model instances + DRF JSONRenderer
+    instance_dicts    select_related instances + hand-built dicts + DRF JSONRenderer
+                      (the views before the canonical representation)
+    values_rows       values_list rows + represent_rows + ORJSONRenderer
+
+Runs in-process against a throwaway SQLite database. Usage:
+
+    python benchmarks/serialization.py --posts 10000 --repeat 7
+"""
+import argparse
+import io
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def setup_django(database_path):
+    os.environ['SQLITE_PATH'] = database_path
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'codeleap_backend_django.settings')
+    os.environ.setdefault('SECRET_KEY', 'benchmark-secret-key-with-enough-length-for-hs256')
+    import django
+    django.setup()
+    from django.core.management import call_command
+    call_command('migrate', verbosity=0)
+
+
+def seed(posts):
+    from django.core.management import call_command
+    call_command('seed_posts', posts=posts, users=20, seed=1, stdout=io.StringIO())
+
+
+def paths():
+    from rest_framework.renderers import JSONRenderer
+    from core.models.post import Post
+    from core.serializers import PostSerializer, post_rows, represent_post, represent_rows
+    from core.utils.pagination import FEED_ORDERING
+    from core.utils.renderers import ORJSONRenderer
+
+    feed = Post.objects.order_by(*FEED_ORDERING)
+
+    def model_serializer():
+        return JSONRenderer().render(PostSerializer(feed.all(), many=True).data)
+
+    def instance_dicts():
+        return JSONRenderer().render([represent_post(post) for post in feed.select_related('author')])
+
+    def values_rows():
+        return ORJSONRenderer().render(represent_rows(post_rows(feed.all())))
+
+    return {'model_serializer': model_serializer, 'instance_dicts': instance_dicts, 'values_rows': values_rows}
+
+
+def measure(function, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        content = function()
+        timings.append(time.perf_counter() - start)
+    return {
+        'median_ms': round(statistics.median(timings) * 1000, 2),
+        'min_ms': round(min(timings) * 1000, 2),
+        'bytes': len(content),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--posts', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=7)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        setup_django(os.path.join(tmp, 'bench.sqlite3'))
+        seed(args.posts)
+        results = {name: measure(function, args.repeat) for name, function in paths().items()}
+        from django.db import connections
+        connections.close_all()
+
+    baseline = results['model_serializer']['median_ms']
+    for result in results.values():
+        result['speedup'] = round(baseline / result['median_ms'], 2)
+    print(json.dumps({'posts': args.posts, 'results': results}, indent=2))
+    print(f"{'path':<18}{'median ms':>12}{'speedup':>10}", file=sys.stderr)
+    for name, result in results.items():
+        print(f"{name:<18}{result['median_ms']:>12}{result['speedup']:>10}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
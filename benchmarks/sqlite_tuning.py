@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+"""
+Runs the same mixed read/write load against the post endpoints twice, once
+with SQLite's default configuration (SQLITE_TUNING=False) and once with the
+tuned PRAGMAs and persistent connections, each on its own fresh database.
+Reports throughput, latency and how many requests failed with
+"database is locked". Usage:
+
+    python benchmarks/sqlite_tuning.py --workers 4 --concurrency 64 --duration 20
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.utils.bench_harness import (  # noqa: E402
+    bench_env, free_port, gunicorn_command, running_server, seed_database,
+)
+from core.utils.loadgen import Operation, run_load  # noqa: E402
+
+
+class LockCounter:
+    def __init__(self):
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def check(self, content):
+        if b'database is locked' in content:
+            with self._lock:
+                self.count += 1
+
+
+def operations(locks):
+    def remember(worker, status, content):
+        locks.check(content)
+        if status == 201:
+            worker.state.setdefault('own', []).append(json.loads(content)['id'])
+
+    def check(worker, status, content):
+        locks.check(content)
+
+    def list_posts(worker):
+        return 'GET', '/listposts/?page_size=20', None
+
+    def create_post(worker):
+        return 'POST', '/createpost/', {'title': 'bench', 'content': 'created under load'}
+
+    def edit_post(worker):
+        own = worker.state.get('own')
+        if not own:
+            return None
+        return 'PATCH', f'/editpost/{worker.random.choice(own)}/', {'content': 'edited under load'}
+
+    def delete_post(worker):
+        own = worker.state.get('own')
+        if not own:
+            return None
+        return 'DELETE', f'/deletepost/{own.pop()}/', None
+
+    return [
+        Operation('list', 6, list_posts, check),
+        Operation('create', 2, create_post, remember),
+        Operation('edit', 1, edit_post, check),
+        Operation('delete', 1, delete_post, check),
+    ]
+
+
+def bench(name, tuned, tmp, args):
+    env = bench_env(os.path.join(tmp, f'{name}.sqlite3'), SQLITE_TUNING=str(tuned))
+    token = seed_database(env, args.posts)
+    port = free_port()
+    locks = LockCounter()
+    with running_server(gunicorn_command(port, args.workers, args.threads), env, port) as base_url:
+        report = run_load(
+            base_url, operations(locks), concurrency=args.concurrency, duration=args.duration,
+            headers_for_worker=lambda index: {'Authorization': f'Bearer {token}'}, seed=1,
+        )
+    return {'configuration': name, 'database_locked': locks.count, **report}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--concurrency', type=int, default=64)
+    parser.add_argument('--duration', type=float, default=15)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--threads', type=int, default=4, help='gunicorn threads per worker')
+    parser.add_argument('--posts', type=int, default=1000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = [bench('default', False, tmp, args), bench('tuned', True, tmp, args)]
+
+    print(json.dumps(results, indent=2))
+    print(f"{'config':<10}{'rps':>10}{'p50 ms':>10}{'p99 ms':>10}{'errors':>10}{'locked':>10}", file=sys.stderr)
+    for result in results:
+        print(
+            f"{result['configuration']:<10}{result['throughput_rps']:>10}{result['p50_ms']:>10}"
+            f"{result['p99_ms']:>10}{result['errors']:>10}{result['database_locked']:>10}",
+            file=sys.stderr,
+        )
+
+
+if __name__ == '__main__':
+    main()
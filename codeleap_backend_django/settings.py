@@ -1,3 +1,4 @@
+import os
 import sys
 
 LOGGING = {
@@ -41,10 +42,24 @@ LOGGING = {
             'level': 'INFO',
             'propagate': False,
         },
+        # One line per request from core.middleware.metrics; WARNING keeps only
+        # N+1 reports, and is the default under `manage.py test`
+        'core.requests': {
+            'handlers': ['console'],
+            'level': os.getenv('REQUEST_LOG_LEVEL', 'WARNING' if 'test' in sys.argv[1:2] else 'INFO'),
+            'propagate': False,
+        },
+        # Sign-in and sign-up audit lines written by core.utils.audit tasks
+        'core.audit': {
+            'handlers': ['console'],
+            'level': os.getenv('AUDIT_LOG_LEVEL', 'WARNING' if 'test' in sys.argv[1:2] else 'INFO'),
+            'propagate': False,
+        },
     },
 }
 
 from datetime import timedelta
+from django.utils.functional import lazy
 from pathlib import Path
 import os
 
@@ -63,6 +78,8 @@ SIMPLE_JWT = {
     'AUTH_TOKEN_CLASSES': ('rest_framework_simplejwt.tokens.AccessToken',),
     'USER_ID_FIELD': 'id',
     'USER_ID_CLAIM': 'user_id',
+    # request.user for tokens with a username claim (core.utils.jwt_auth)
+    'TOKEN_USER_CLASS': 'core.utils.jwt_auth.LazyTokenUser',
 }
 
 from pathlib import Path
@@ -127,27 +144,139 @@ REST_AUTH = {
     'JWT_AUTH_COOKIE': 'auth-token',
     'JWT_AUTH_REFRESH_COOKIE': 'refresh-token',
     'JWT_AUTH_HTTPONLY': False,
+    # Same token claims as the core auth views
+    'JWT_TOKEN_CLAIMS_SERIALIZER': 'core.utils.jwt_auth.UserTokenObtainPairSerializer',
+}
+
+# Authentication trusts the token's claims and only checks is_active, which
+# is cached per process for TIMEOUT seconds. Deactivating a user takes effect
+# immediately in the process that saved it and within TIMEOUT elsewhere.
+JWT_ACTIVE_USER_CACHE = {
+    'TIMEOUT': int(os.getenv('JWT_ACTIVE_USER_CACHE_TIMEOUT', '30')),
 }
 
 SOCIALACCOUNT_ADAPTER = 'allauth.socialaccount.adapter.DefaultSocialAccountAdapter'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'core.utils.jwt_auth.CachedTokenUserAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
     'DEFAULT_RENDERER_CLASSES': (
-        'rest_framework.renderers.JSONRenderer',
+        # orjson when installed, the stdlib encoder otherwise; same output either way
+        'core.utils.renderers.ORJSONRenderer',
     ),
     'DEFAULT_PARSER_CLASSES': (
         'rest_framework.parsers.JSONParser',
         'rest_framework.parsers.FormParser',
         'rest_framework.parsers.MultiPartParser',
     ),
+    # Token buckets (core.utils.throttling); see API_THROTTLING below
+    'DEFAULT_THROTTLE_CLASSES': (
+        'core.utils.throttling.IPTokenBucketThrottle',
+        'core.utils.throttling.UserTokenBucketThrottle',
+        'core.utils.throttling.EndpointTokenBucketThrottle',
+    ),
+    'DEFAULT_THROTTLE_RATES': {
+        # Every request per client IP / per user; unset means unlimited
+        'ip': os.getenv('THROTTLE_RATE_IP') or None,
+        'user': os.getenv('THROTTLE_RATE_USER') or None,
+        # Writes per endpoint URL name, per user or, when anonymous, per IP
+        'login': os.getenv('THROTTLE_RATE_LOGIN', '10/min'),
+        'rest_login': os.getenv('THROTTLE_RATE_LOGIN', '10/min'),
+        'register': os.getenv('THROTTLE_RATE_REGISTER', '5/min'),
+        'rest_register': os.getenv('THROTTLE_RATE_REGISTER', '5/min'),
+        'google_login': os.getenv('THROTTLE_RATE_GOOGLE_LOGIN', '20/min'),
+        # Also spent by POST /listposts/ and POST /async/listposts/
+        'createpost': os.getenv('THROTTLE_RATE_CREATE_POST', '60/min'),
+        # Counted in items, not requests; keep the burst >= POSTS_BULK_MAX_ITEMS
+        'bulk_posts': os.getenv('THROTTLE_RATE_BULK_POSTS', '10000/hour'),
+    },
+    # Proxies in front of the app that append to X-Forwarded-For. 0 identifies
+    # clients by REMOTE_ADDR and ignores the header, which clients can forge;
+    # set it to the number of trusted proxies to read the client IP from it.
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES', '0')),
+}
+
+# Rate limiting. A rate such as '10/min' is a bucket of 10 requests refilled
+# at one every 6 seconds; throttled requests get 429 with Retry-After.
+# DatabaseBucketStore keeps the buckets in the database so every gunicorn
+# worker shares them; LocalBucketStore keeps them in process memory.
+API_THROTTLING = {
+    'ENABLED': os.getenv('API_THROTTLING_ENABLED', 'True') == 'True',
+    'STORE': os.getenv('API_THROTTLING_STORE', 'core.utils.throttling.DatabaseBucketStore'),
+}
+
+# Post feed pagination
+# Clients that send neither `cursor` nor `page_size` get the legacy plain list
+# while this flag is on; set it to False to paginate every feed request.
+POSTS_FEED_LEGACY_RESPONSE = os.getenv('POSTS_FEED_LEGACY_RESPONSE', 'True') == 'True'
+POSTS_PAGE_SIZE = int(os.getenv('POSTS_PAGE_SIZE', '20'))
+POSTS_MAX_PAGE_SIZE = int(os.getenv('POSTS_MAX_PAGE_SIZE', '100'))
+
+# Upper bound on the items one /posts/bulk/ request may create or delete
+POSTS_BULK_MAX_ITEMS = int(os.getenv('POSTS_BULK_MAX_ITEMS', '5000'))
+
+# Rows fetched per database round-trip by the /posts/export/ stream
+POSTS_EXPORT_CHUNK_SIZE = int(os.getenv('POSTS_EXPORT_CHUNK_SIZE', '2000'))
+
+# /posts/changes/ page size and how long deleted posts are kept as
+# tombstones before `manage.py purge_tombstones` removes them. Clients that
+# last synced before a purge get 410 and must sync again from since=0.
+POSTS_CHANGES_PAGE_SIZE = int(os.getenv('POSTS_CHANGES_PAGE_SIZE', '500'))
+POSTS_CHANGES_MAX_PAGE_SIZE = int(os.getenv('POSTS_CHANGES_MAX_PAGE_SIZE', '5000'))
+POSTS_TOMBSTONE_RETENTION_DAYS = int(os.getenv('POSTS_TOMBSTONE_RETENTION_DAYS', '30'))
+
+# /posts/search/ ranking and highlighting (see core.utils.search.SEARCH_DEFAULTS)
+POSTS_SEARCH = {
+    'TITLE_WEIGHT': float(os.getenv('POSTS_SEARCH_TITLE_WEIGHT', '10.0')),
+    'CONTENT_WEIGHT': float(os.getenv('POSTS_SEARCH_CONTENT_WEIGHT', '1.0')),
+}
+
+# Read-through cache for feed pages, invalidated by every post write.
+# BACKEND 'local' keeps an LRU per process; 'django' stores entries in the
+# CACHES alias named by ALIAS so several gunicorn workers can share them.
+# Entries are also keyed on the feed's ETag, so a worker never serves a page
+# cached before another worker's write.
+POSTS_FEED_CACHE = {
+    'ENABLED': os.getenv('POSTS_FEED_CACHE_ENABLED', 'True') == 'True',
+    'BACKEND': os.getenv('POSTS_FEED_CACHE_BACKEND', 'local'),
+    'ALIAS': os.getenv('POSTS_FEED_CACHE_ALIAS', 'default'),
+    'MAX_ENTRIES': int(os.getenv('POSTS_FEED_CACHE_MAX_ENTRIES', '256')),
+    'TIMEOUT': int(os.getenv('POSTS_FEED_CACHE_TIMEOUT', '60')),
+}
+
+# Post events pushed over Server-Sent Events at /posts/events/ (ASGI only).
+# InProcessHub fans out within one process; switch BACKEND to
+# 'core.utils.post_events.DatabaseHub' when several workers serve the API.
+POSTS_EVENT_HUB = {
+    'BACKEND': os.getenv('POSTS_EVENT_HUB_BACKEND', 'core.utils.post_events.InProcessHub'),
+    'BUFFER_SIZE': int(os.getenv('POSTS_EVENT_BUFFER_SIZE', '1000')),
+    'POLL_INTERVAL': float(os.getenv('POSTS_EVENT_POLL_INTERVAL', '1.0')),
+}
+POSTS_EVENT_HEARTBEAT_SECONDS = 15
+POSTS_EVENT_STREAM_MAX_SECONDS = 300
+
+# Background tasks (core.utils.tasks): queued email, sign-in audit lines and
+# other work kept off the request. ThreadPoolBackend runs them in this
+# process after the request's transaction commits; DatabaseBackend stores
+# them in core_queuedtask for `manage.py run_tasks` workers and survives
+# restarts. Failed tasks are retried MAX_RETRIES times, waiting
+# RETRY_BACKOFF seconds and doubling each time.
+TASK_QUEUE = {
+    'BACKEND': os.getenv('TASK_QUEUE_BACKEND', 'core.utils.tasks.ThreadPoolBackend'),
+    'WORKERS': int(os.getenv('TASK_QUEUE_WORKERS', '4')),
+    'MAX_RETRIES': int(os.getenv('TASK_QUEUE_MAX_RETRIES', '3')),
+    'RETRY_BACKOFF': float(os.getenv('TASK_QUEUE_RETRY_BACKOFF', '2.0')),
 }
 
+# Google ID token verification keeps the signing certs in process memory for
+# the max-age Google sends and refreshes them this many seconds before expiry.
+GOOGLE_CERTS_URL = os.getenv('GOOGLE_CERTS_URL', 'https://www.googleapis.com/oauth2/v1/certs')
+GOOGLE_CERTS_REFRESH_MARGIN = int(os.getenv('GOOGLE_CERTS_REFRESH_MARGIN', '300'))
+
 SOCIALACCOUNT_PROVIDERS = {
     'google': {
         'SCOPE': [
@@ -170,8 +299,13 @@ LOGIN_REDIRECT_URL = '/'
 LOGOUT_REDIRECT_URL = '/'
 
 MIDDLEWARE = [
+    # Outermost, so its timings cover the whole middleware stack
+    'core.middleware.metrics.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'core.middleware.static.AsyncWhiteNoiseMiddleware',
+    # Below WhiteNoise, which serves its own precompressed static files
+    'core.middleware.compression.CompressionMiddleware',
+    'core.middleware.replica.ReplicaStickinessMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -214,7 +348,9 @@ CSRF_COOKIE_SECURE = not DEBUG  # True em produção, False em desenvolvimento
 if DEBUG:
     EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
 else:
-    EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+    # Sent from the task queue so SMTP latency stays out of the request
+    EMAIL_BACKEND = 'core.utils.mail.QueuedEmailBackend'
+    QUEUED_EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
     EMAIL_HOST = os.getenv('EMAIL_HOST', 'smtp.gmail.com')
     EMAIL_PORT = int(os.getenv('EMAIL_PORT', '587'))
     EMAIL_USE_TLS = True
@@ -243,13 +379,72 @@ WSGI_APPLICATION = 'codeleap_backend_django.wsgi.application'
 
 # Database Configuration
 # Using SQLite for both development and production
+# SQLite tuning. core.utils.sqlite applies SQLITE_PRAGMAS to every new
+# connection; SQLITE_TUNING=False restores SQLite's defaults (rollback
+# journal, no busy timeout beyond the driver's, a connection per request),
+# which is what benchmarks/sqlite_tuning.py compares against.
+SQLITE_TUNING = os.getenv('SQLITE_TUNING', 'True') == 'True'
+SQLITE_PRAGMAS = {
+    'journal_mode': os.getenv('SQLITE_JOURNAL_MODE', 'WAL'),
+    'synchronous': os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL'),
+    'busy_timeout': int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', '5000')),
+    'mmap_size': int(os.getenv('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024))),
+    'cache_size': int(os.getenv('SQLITE_CACHE_SIZE', '-20000')),
+    'temp_store': 'MEMORY',
+} if SQLITE_TUNING else {}
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'NAME': os.getenv('SQLITE_PATH', BASE_DIR / 'db.sqlite3'),
+        # Reuse connections so PRAGMAs and the page cache survive between requests
+        'CONN_MAX_AGE': int(os.getenv('SQLITE_CONN_MAX_AGE', '60')) if SQLITE_TUNING else 0,
+        'CONN_HEALTH_CHECKS': SQLITE_TUNING,
+        'OPTIONS': {
+            # Seconds the driver waits on a locked database before raising
+            'timeout': int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', '5000')) / 1000 if SQLITE_TUNING else 5,
+        },
     }
 }
 
+# Per-request instrumentation (core.middleware.metrics): Server-Timing
+# headers, request log lines and the histograms served at /metrics/. A
+# statement repeated REPEATED_QUERY_THRESHOLD times in one request is logged
+# as a likely N+1.
+REQUEST_METRICS = {
+    'ENABLED': os.getenv('REQUEST_METRICS_ENABLED', 'True') == 'True',
+    'REPEATED_QUERY_THRESHOLD': int(os.getenv('REQUEST_METRICS_REPEATED_QUERY_THRESHOLD', '10')),
+}
+
+# API response compression (core.middleware.compression). Bodies smaller
+# than MIN_SIZE bytes are sent uncompressed; brotli is used when the Brotli
+# package is installed and the client accepts it, gzip otherwise.
+API_COMPRESSION = {
+    'MIN_SIZE': int(os.getenv('API_COMPRESSION_MIN_SIZE', '1024')),
+    'GZIP_LEVEL': int(os.getenv('API_COMPRESSION_GZIP_LEVEL', '6')),
+    'BROTLI_QUALITY': int(os.getenv('API_COMPRESSION_BROTLI_QUALITY', '4')),
+}
+
+# Read replicas for Post reads (feed, search, export). SQLITE_REPLICA_PATHS
+# lists copies of the primary kept current by an external replicator such as
+# Litestream or LiteFS; each one becomes a `replicaN` alias. Writes and any
+# read made by a writing client within POSTS_READ_STICKY_SECONDS go to the
+# primary (see core.utils.db_router and core.middleware.replica).
+for _index, _path in enumerate(filter(None, os.getenv('SQLITE_REPLICA_PATHS', '').split(',')), start=1):
+    DATABASES[f'replica{_index}'] = {
+        **DATABASES['default'],
+        'NAME': _path,
+        'TEST': {'MIRROR': 'default'},
+    }
+POSTS_PRIMARY_DATABASE = 'default'
+POSTS_READ_DATABASES = [alias for alias in DATABASES if alias != POSTS_PRIMARY_DATABASE]
+POSTS_READ_STICKY_SECONDS = int(os.getenv('POSTS_READ_STICKY_SECONDS', '5'))
+# Remembers which token users wrote recently, for clients that send no cookies
+# (e.g. cross-origin SPAs). With several workers, point it at a CACHES alias
+# they share.
+POSTS_READ_STICKY_CACHE = os.getenv('POSTS_READ_STICKY_CACHE', 'default')
+DATABASE_ROUTERS = ['core.utils.db_router.PostReplicaRouter']
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -275,3 +470,23 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
+# Files with a 12-hex content hash in the name, such as the generated
+# OpenAPI schema, never change under the same URL: WhiteNoise serves them
+# with a far-future, immutable Cache-Control.
+WHITENOISE_IMMUTABLE_FILE_TEST = r'^.+\.[0-9a-f]{12}\..+$'
+
+
+def _openapi_schema_url():
+    from core.utils.openapi import schema_url
+    return schema_url()
+
+
+# /docs/ and /redoc/ load the schema from the static file written by
+# `manage.py generate_schema` at deploy time, or from the copy built once
+# per process at /docs/schema.json when there is none.
+SWAGGER_SETTINGS = {
+    'SPEC_URL': lazy(_openapi_schema_url, str)(),
+}
+REDOC_SETTINGS = {
+    'SPEC_URL': SWAGGER_SETTINGS['SPEC_URL'],
+}
@@ -0,0 +1,56 @@
+"""
+Settings for API-only workers: DJANGO_SETTINGS_MODULE=codeleap_backend_django.settings_api.
+
+Everything in settings.py applies, minus what only the browser-facing
+routes use: the admin, sessions and messages, allauth with its Google
+provider, dj_rest_auth, DRF's token auth and the drf_yasg docs. Workers
+import, check and migrate-check fewer apps, so they boot and answer their
+first request sooner; `manage.py startup_profile` measures the difference.
+
+The core endpoints are all here, including /auth/login/, /auth/register/
+and /auth/google/ from core.views. /auth/login/ is then core's username and
+password login rather than dj_rest_auth's email login, and /admin/,
+/accounts/, /auth/registration/, /docs/ and /redoc/ are not served; route
+those to a worker running the full settings.
+"""
+from .settings import *  # noqa: F401,F403
+from .settings import INSTALLED_APPS, MIDDLEWARE, TEMPLATES
+
+API_DROPPED_APPS = {
+    'django.contrib.admin',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.sites',
+    'allauth',
+    'allauth.account',
+    'allauth.socialaccount',
+    'allauth.socialaccount.providers.google',
+    'dj_rest_auth',
+    'dj_rest_auth.registration',
+    'rest_framework.authtoken',
+    'drf_yasg',
+}
+API_DROPPED_MIDDLEWARE = {
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    # Needs sessions; DRF authenticates API requests from the bearer token
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'allauth.account.middleware.AccountMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+}
+
+INSTALLED_APPS = [app for app in INSTALLED_APPS if app not in API_DROPPED_APPS]
+MIDDLEWARE = [middleware for middleware in MIDDLEWARE if middleware not in API_DROPPED_MIDDLEWARE]
+AUTHENTICATION_BACKENDS = ['django.contrib.auth.backends.ModelBackend']
+ROOT_URLCONF = 'codeleap_backend_django.urls_api'
+TEMPLATES = [
+    {
+        **TEMPLATES[0],
+        'OPTIONS': {
+            **TEMPLATES[0]['OPTIONS'],
+            'context_processors': [
+                processor for processor in TEMPLATES[0]['OPTIONS']['context_processors']
+                if not processor.startswith('django.contrib.messages')
+            ],
+        },
+    },
+]
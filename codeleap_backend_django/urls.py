@@ -1,18 +1,7 @@
 from django.contrib import admin
 from django.urls import path, include, re_path
-from rest_framework import permissions
-from drf_yasg.views import get_schema_view
-from drf_yasg import openapi
-
-schema_view = get_schema_view(
-    openapi.Info(
-        title="CodeLeap API",
-        default_version='v1',
-        description="Documentação interativa da API CodeLeap",
-    ),
-    public=True,
-    permission_classes=(permissions.AllowAny,),
-)
+
+from core.views.docs import docs_ui, openapi_schema
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -24,8 +13,11 @@ urlpatterns = [
     path('accounts/', include('allauth.urls')),
 
 
-    re_path(r'^docs/$', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),
-    re_path(r'^redoc/$', schema_view.with_ui('redoc', cache_timeout=0), name='schema-redoc'),
+    # The pages load the schema from SPEC_URL (see core.utils.openapi)
+    re_path(r'^docs/$', docs_ui('swagger'), name='schema-swagger-ui'),
+    re_path(r'^redoc/$', docs_ui('redoc'), name='schema-redoc'),
+    path('docs/schema.json', openapi_schema, name='openapi_schema'),
+    path('docs/schema.yaml', openapi_schema, {'fmt': 'yaml'}, name='openapi_schema_yaml'),
 
     path('', include('core.urls')),
-]
\ No newline at end of file
+]
@@ -0,0 +1,6 @@
+"""URLconf of settings_api: the core API without the admin, allauth, dj_rest_auth or docs routes"""
+from django.urls import include, path
+
+urlpatterns = [
+    path('', include('core.urls')),
+]
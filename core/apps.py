@@ -1,3 +1,12 @@
 from django.apps import AppConfig
 class CoreConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        # Registers the per-connection SQLite PRAGMA hook
+        from .utils import sqlite  # noqa: F401
+        # Installs the query recorder used by the request metrics middleware
+        from .utils import metrics  # noqa: F401
+        # Keeps deleted users' posts in the change feed as tombstones
+        from .utils import changes  # noqa: F401
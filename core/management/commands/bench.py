@@ -0,0 +1,212 @@
+import json
+import math
+import os
+import subprocess
+import tempfile
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from ...utils.bench_harness import (
+    BENCH_PASSWORD, bench_env, free_port, gunicorn_command, running_server, seed_accounts, uvicorn_command,
+)
+from ...utils.loadgen import Operation, run_load
+
+DEFAULT_MIX = 'login=1,list=10,create=2,edit=2,delete=1'
+# Compared against --baseline: (report key, True when higher is better)
+REGRESSION_KEYS = (('throughput_rps', True), ('p95_ms', False), ('p99_ms', False))
+
+
+def parse_mix(value):
+    """'list=10,create=2' -> {'list': 10, 'create': 2}"""
+    mix = {}
+    for part in value.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise CommandError(f"Operação desconhecida em --mix: {name!r} (use {', '.join(OPERATIONS)})")
+        try:
+            mix[name] = float(weight)
+        except ValueError:
+            raise CommandError(f'Peso inválido para {name} em --mix: {weight!r}')
+    if not any(weight > 0 for weight in mix.values()):
+        raise CommandError('--mix precisa de ao menos uma operação com peso positivo')
+    return mix
+
+
+def compare_reports(report, baseline, tolerance):
+    """Lists regressions of `report` against `baseline` beyond `tolerance` (a fraction)"""
+    regressions = []
+    for key, higher_is_better in REGRESSION_KEYS:
+        current, previous = report.get(key), baseline.get(key)
+        if current is None or previous is None:
+            continue
+        if previous:
+            change = (current - previous) / previous
+        else:
+            # Nothing to scale against: any move away from zero counts in full
+            change = 0.0 if current == previous else math.inf
+        if (-change if higher_is_better else change) > tolerance:
+            regressions.append(f'{key}: {previous} -> {current} ({change:+.1%})')
+    if report.get('error_rate', 0) > baseline.get('error_rate', 0) + tolerance:
+        regressions.append(f"error_rate: {baseline.get('error_rate', 0)} -> {report['error_rate']}")
+    return regressions
+
+
+def _login(worker):
+    account = worker.state['account']
+    return 'POST', '/auth/login/', {
+        'username': account['username'], 'email': account['email'], 'password': worker.state['password'],
+    }
+
+
+def _list(worker):
+    return 'GET', '/listposts/?page_size=20', None
+
+
+def _create(worker):
+    return 'POST', '/createpost/', {'title': 'bench', 'content': 'created under load'}
+
+
+def _remember(worker, status, content):
+    if status == 201:
+        worker.state['own'].append(json.loads(content)['id'])
+
+
+def _edit(worker):
+    own = worker.state['own']
+    if not own:
+        return None
+    return 'PATCH', f'/editpost/{worker.random.choice(own)}/', {'content': 'edited under load'}
+
+
+def _delete(worker):
+    own = worker.state['own']
+    if not own:
+        return None
+    return 'DELETE', f'/deletepost/{own.pop(worker.random.randrange(len(own)))}/', None
+
+
+OPERATIONS = {
+    'login': (_login, None),
+    'list': (_list, None),
+    'create': (_create, _remember),
+    'edit': (_edit, None),
+    'delete': (_delete, None),
+}
+
+
+def _git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        'Seeds a throwaway database, starts a local server on it and drives the auth and post '
+        'endpoints concurrently. Prints throughput, p50/p95/p99 latency and error rates as JSON.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10)
+        parser.add_argument('--posts', type=int, default=1000)
+        parser.add_argument('--concurrency', type=int, default=20)
+        parser.add_argument('--duration', type=float, default=15, help='seconds of load')
+        parser.add_argument('--requests', type=int, help='stop after this many requests instead of --duration')
+        parser.add_argument('--mix', default=DEFAULT_MIX, help=f'operation weights (default: {DEFAULT_MIX})')
+        parser.add_argument('--server', choices=('wsgi', 'asgi'), default='wsgi',
+                            help='gunicorn (wsgi) or uvicorn (asgi)')
+        parser.add_argument('--workers', type=int, default=2)
+        parser.add_argument('--threads', type=int, default=4, help='gunicorn threads per worker')
+        parser.add_argument('--seed', type=int, default=1, help='random seed of the request mix')
+        parser.add_argument('--output', help='also write the JSON report to this file')
+        parser.add_argument('--baseline', help='JSON report of an earlier run to compare against')
+        parser.add_argument('--tolerance', type=float, default=0.10,
+                            help='allowed regression against --baseline, as a fraction (default: 0.10)')
+
+    def handle(self, *args, **options):
+        if options['users'] < 1:
+            raise CommandError('--users precisa ser ao menos 1')
+        mix = parse_mix(options['mix'])
+        baseline = self._load_baseline(options['baseline'])
+        concurrency = options['concurrency']
+        duration = None if options['requests'] else options['duration']
+
+        with tempfile.TemporaryDirectory() as tmp:
+            env = bench_env(os.path.join(tmp, 'bench.sqlite3'))
+            self.stderr.write(f"Semeando {options['users']} usuários e {options['posts']} posts...")
+            # Workers sharing a user split its posts, so no two of them edit or delete the same one
+            accounts = seed_accounts(env, options['users'], options['posts'], sample=200)
+            sharing = -(-concurrency // len(accounts))
+
+            def prepare(worker):
+                account = accounts[worker.index % len(accounts)]
+                worker.state.update({
+                    'account': account,
+                    'password': BENCH_PASSWORD,
+                    'own': account['posts'][worker.index // len(accounts)::sharing],
+                })
+
+            operations = [
+                Operation(name, weight, _with_state(OPERATIONS[name][0], prepare), OPERATIONS[name][1])
+                for name, weight in mix.items() if weight > 0
+            ]
+
+            port = free_port()
+            if options['server'] == 'asgi':
+                command = uvicorn_command(port, options['workers'])
+            else:
+                command = gunicorn_command(port, options['workers'], options['threads'])
+            with running_server(command, env, port) as base_url:
+                self.stderr.write(f'Carga contra {base_url} com {concurrency} clientes...')
+                report = run_load(
+                    base_url, operations, concurrency=concurrency, duration=duration,
+                    requests=options['requests'], seed=options['seed'],
+                    headers_for_worker=lambda index: {
+                        'Authorization': f"Bearer {accounts[index % len(accounts)]['token']}",
+                    },
+                )
+
+        report = {
+            'revision': _git_revision(),
+            'config': {
+                key: options[key] for key in (
+                    'users', 'posts', 'concurrency', 'duration', 'requests', 'server', 'workers', 'threads', 'seed',
+                )
+            } | {'mix': mix},
+            **report,
+        }
+        if baseline is not None:
+            report['regressions'] = compare_reports(report, baseline, options['tolerance'])
+
+        content = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                output.write(content + '\n')
+        self.stdout.write(content)
+        if report.get('regressions'):
+            raise CommandError('Regressões em relação ao baseline: ' + '; '.join(report['regressions']))
+
+    @staticmethod
+    def _load_baseline(path):
+        if not path:
+            return None
+        try:
+            with open(path) as baseline:
+                return json.load(baseline)
+        except (OSError, ValueError) as e:
+            raise CommandError(f'Não foi possível ler o baseline {path}: {e}')
+
+
+def _with_state(build, prepare):
+    """Runs `prepare` on a worker's first turn, before any operation builds a request"""
+    def wrapped(worker):
+        if 'account' not in worker.state:
+            prepare(worker)
+        return build(worker)
+    return wrapped
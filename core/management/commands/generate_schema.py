@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from ...utils.openapi import write_artifacts
+
+
+class Command(BaseCommand):
+    help = (
+        'Writes the OpenAPI schema as static JSON and YAML files under STATIC_ROOT/openapi/, which '
+        'WhiteNoise serves to /docs/ and /redoc/ with long-lived cache headers. Run it at build or '
+        'deploy time, after collectstatic and before the server starts.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output-dir', help='static root to write into (default: STATIC_ROOT)')
+
+    def handle(self, *args, **options):
+        root = options['output_dir'] or settings.STATIC_ROOT
+        if not root:
+            raise CommandError('Defina STATIC_ROOT ou use --output-dir')
+        for fmt, path in write_artifacts(root).items():
+            self.stdout.write(f'{fmt}: {settings.STATIC_URL}{path}')
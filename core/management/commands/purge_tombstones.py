@@ -0,0 +1,32 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+from django.utils import timezone
+
+from ...utils.changes import purge_tombstones
+
+
+class Command(BaseCommand):
+    help = (
+        'Removes the tombstones of posts deleted more than --older-than-days ago. '
+        '/posts/changes/ clients that last synced before the purged changes have to sync again from 0.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than-days', type=int,
+                            default=getattr(settings, 'POSTS_TOMBSTONE_RETENTION_DAYS', 30))
+        parser.add_argument('--batch-size', type=int, default=1000, help='tombstones removed per transaction')
+        parser.add_argument('--dry-run', action='store_true', help='only count what would be removed')
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        if options['older_than_days'] < 0 or options['batch_size'] <= 0:
+            raise CommandError('--older-than-days não pode ser negativo e --batch-size precisa ser positivo')
+        before = timezone.now() - timedelta(days=options['older_than_days'])
+        purged = purge_tombstones(
+            before, batch_size=options['batch_size'], using=options['database'], dry_run=options['dry_run'],
+        )
+        verb = 'seriam removidos' if options['dry_run'] else 'removidos'
+        self.stdout.write(f'{purged} posts deletados antes de {before.isoformat()} {verb}')
@@ -0,0 +1,63 @@
+import signal
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+
+from ...models.task import QueuedTask
+from ...utils.tasks import claim_task, get_options, run_claimed, worker_id
+
+
+class Command(BaseCommand):
+    help = (
+        'Runs tasks queued by core.utils.tasks.DatabaseBackend. Start as many workers as needed, '
+        'on any host that shares the database; each row is claimed by exactly one of them.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='exit when no task is due instead of polling')
+        parser.add_argument('--max-tasks', type=int, help='exit after running this many tasks')
+        parser.add_argument('--poll-interval', type=float, default=1.0, help='seconds between polls when idle')
+        parser.add_argument('--lease', type=float, default=300,
+                            help='seconds after which a running task whose worker died is claimed again')
+        parser.add_argument('--retry-failed', action='store_true',
+                            help='move failed tasks back to the queue before starting')
+
+    def handle(self, *args, **options):
+        if options['poll_interval'] <= 0 or options['lease'] <= 0:
+            raise CommandError('--poll-interval e --lease precisam ser positivos')
+        if options['retry_failed']:
+            retried = QueuedTask.objects.filter(status=QueuedTask.FAILED).update(
+                status=QueuedTask.PENDING, attempts=0,
+            )
+            self.stdout.write(f'{retried} tasks com falha voltaram para a fila')
+
+        self._stopping = False
+        # Finish the task at hand on SIGTERM/SIGINT instead of leaving it running until its lease expires
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            try:
+                signal.signal(signum, self._stop)
+            except ValueError:
+                # Not the main thread (e.g. call_command from a test runner thread)
+                pass
+
+        worker, queue_options = worker_id(), get_options()
+        succeeded = failed = 0
+        while not self._stopping:
+            if options['max_tasks'] is not None and succeeded + failed >= options['max_tasks']:
+                break
+            close_old_connections()
+            row = claim_task(worker, options['lease'])
+            if row is None:
+                if options['once']:
+                    break
+                time.sleep(options['poll_interval'])
+                continue
+            if run_claimed(row, queue_options):
+                succeeded += 1
+            else:
+                failed += 1
+        self.stdout.write(f'{succeeded} tasks concluídas, {failed} com falha')
+
+    def _stop(self, signum, frame):
+        self._stopping = True
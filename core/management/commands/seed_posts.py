@@ -0,0 +1,171 @@
+import datetime
+import itertools
+import random
+import time
+from contextlib import contextmanager
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import router, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from ...models.post import Post
+from ...utils.changes import change_marks
+from ...utils.feed_cache import get_feed_cache
+from ...utils.search import deferred_search_index
+
+WORDS = (
+    'lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor incididunt ut labore '
+    'et dolore magna aliqua enim ad minim veniam quis nostrud exercitation ullamco laboris nisi aliquip '
+    'ex ea commodo consequat duis aute irure in reprehenderit voluptate velit esse cillum fugiat nulla '
+    'pariatur excepteur sint occaecat cupidatat non proident sunt culpa qui officia deserunt mollit '
+    'anim id est laborum café manhã código projeto equipe entrega reunião ideia cliente produto'
+).split()
+FIRST_NAMES = ('Ana', 'Bruno', 'Carla', 'Diego', 'Elisa', 'Fábio', 'Gabriela', 'Hugo', 'Isabela', 'João')
+LAST_NAMES = ('Almeida', 'Barbosa', 'Costa', 'Dias', 'Ferreira', 'Gomes', 'Lima', 'Melo', 'Rocha', 'Souza')
+
+
+@contextmanager
+def explicit_timestamps(model):
+    """Lets bulk_create keep the created_at/updated_at values set on each instance"""
+    fields = [field for field in model._meta.concrete_fields if getattr(field, 'auto_now', False)
+              or getattr(field, 'auto_now_add', False)]
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def author_weights(users, distribution, skew):
+    """Cumulative weights of each author's share of the posts"""
+    if distribution == 'uniform':
+        weights = [1.0] * users
+    else:
+        # Zipf: the k-th most active author writes about 1/k**skew of the posts of the first
+        weights = [1.0 / (rank ** skew) for rank in range(1, users + 1)]
+    return list(itertools.accumulate(weights))
+
+
+class Command(BaseCommand):
+    help = (
+        'Generates users and posts in bulk for scaling tests. Output is deterministic for a given '
+        '--seed and --end; posts are created oldest first, so ids follow created_at as in production.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=100000)
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--user-prefix', default='seed', help='usernames are <prefix><n>; existing ones are reused')
+        parser.add_argument('--password', help='password of the seeded users (default: unusable)')
+        parser.add_argument('--distribution', choices=('zipf', 'uniform'), default='zipf',
+                            help='how posts are spread across users (default: zipf)')
+        parser.add_argument('--skew', type=float, default=1.1, help='zipf exponent (default: 1.1)')
+        parser.add_argument('--days', type=float, default=365, help='created_at spans this many days before --end')
+        parser.add_argument('--end', help='ISO datetime of the newest post (default: today, 00:00 UTC)')
+        parser.add_argument('--edited', type=float, default=0.1, help='fraction of posts edited after creation')
+        parser.add_argument('--min-words', type=int, default=5)
+        parser.add_argument('--max-words', type=int, default=60)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--batch-size', type=int, default=5000, help='rows per bulk_create call')
+        parser.add_argument('--transaction-size', type=int, default=50000, help='rows per transaction')
+        parser.add_argument('--database', help='database alias (default: where posts are written)')
+
+    def handle(self, *args, **options):
+        if options['posts'] < 0 or options['users'] < 1:
+            raise CommandError('--posts não pode ser negativo e --users precisa ser ao menos 1')
+        if not 0 < options['min_words'] <= options['max_words']:
+            raise CommandError('Use 0 < --min-words <= --max-words')
+        end = self._end(options['end'])
+        using = options['database'] or router.db_for_write(Post)
+        rng = random.Random(options['seed'])
+        started = time.perf_counter()
+
+        authors = self._seed_users(options, using)
+        self.stdout.write(f'{len(authors)} usuários prontos ({time.perf_counter() - started:.1f}s)')
+
+        cum_weights = author_weights(len(authors), options['distribution'], options['skew'])
+        start = end - datetime.timedelta(days=options['days'])
+        step = (end - start) / max(options['posts'], 1)
+        total, written = options['posts'], 0
+        # Explicit sequence numbers, one per post in creation order, instead of one per bulk statement
+        first_seq = change_marks(using)[0] + 1
+        with deferred_search_index(using), explicit_timestamps(Post):
+            while written < total:
+                chunk = min(options['transaction_size'], total - written)
+                with transaction.atomic(using=using):
+                    for offset in range(0, chunk, options['batch_size']):
+                        size = min(options['batch_size'], chunk - offset)
+                        Post.objects.using(using).bulk_create(
+                            self._posts(rng, authors, cum_weights, written + offset, size, start, step, end, first_seq, options),
+                        )
+                written += chunk
+                elapsed = time.perf_counter() - started
+                self.stdout.write(f'{written}/{total} posts ({written / total:.0%}, {written / elapsed:,.0f}/s)')
+            self.stdout.write('Reconstruindo o índice de busca...')
+
+        get_feed_cache().invalidate()
+        self.stdout.write(self.style.SUCCESS(
+            f'{total} posts de {len(authors)} usuários em {time.perf_counter() - started:.1f}s'
+        ))
+
+    @staticmethod
+    def _end(value):
+        if value is None:
+            return timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        end = parse_datetime(value)
+        if end is None:
+            raise CommandError(f'--end inválido: {value!r}')
+        return end if timezone.is_aware(end) else timezone.make_aware(end, datetime.timezone.utc)
+
+    def _seed_users(self, options, using):
+        """Creates the missing <prefix><n> users and returns (id, username) for all of them, in order"""
+        User = get_user_model()
+        prefix, count = options['user_prefix'], options['users']
+        usernames = [f'{prefix}{index}' for index in range(count)]
+        # One hash for everyone: hashing per user would dominate the run
+        password = make_password(options['password'])
+        for offset in range(0, count, options['batch_size']):
+            User.objects.using(using).bulk_create(
+                (
+                    User(
+                        username=username, email=f'{username}@example.com', password=password,
+                        first_name=FIRST_NAMES[index % len(FIRST_NAMES)],
+                        last_name=LAST_NAMES[index // len(FIRST_NAMES) % len(LAST_NAMES)],
+                    )
+                    for index, username in enumerate(usernames[offset:offset + options['batch_size']], offset)
+                ),
+                ignore_conflicts=True,
+            )
+        ids = {}
+        # Looked up in chunks to stay under SQLite's bound parameter limit
+        for offset in range(0, count, 500):
+            ids.update(
+                User.objects.using(using).filter(username__in=usernames[offset:offset + 500])
+                .values_list('username', 'id')
+            )
+        return [(ids[username], username) for username in usernames]
+
+    @staticmethod
+    def _posts(rng, authors, cum_weights, first, size, start, step, end, first_seq, options):
+        for (author_id, username), index in zip(
+            rng.choices(authors, cum_weights=cum_weights, k=size), range(first, first + size),
+        ):
+            created_at = start + step * (index + rng.random())
+            updated_at = created_at
+            if rng.random() < options['edited']:
+                updated_at = min(end, created_at + datetime.timedelta(seconds=rng.expovariate(1 / 86400)))
+            yield Post(
+                author_id=author_id,
+                username=username,
+                title=' '.join(rng.choices(WORDS, k=rng.randint(2, 8))).capitalize(),
+                content=' '.join(rng.choices(WORDS, k=rng.randint(options['min_words'], options['max_words']))),
+                created_at=created_at,
+                updated_at=updated_at,
+                change_seq=first_seq + index,
+            )
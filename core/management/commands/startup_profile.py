@@ -0,0 +1,142 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+DEFAULT_PROFILES = ('codeleap_backend_django.settings', 'codeleap_backend_django.settings_api')
+
+# Runs in a fresh interpreter: boots Django the way the WSGI server does and
+# answers one request, without a socket in between
+PROBE = '''
+import json, sys, time
+spawned_at, path, host = float(sys.argv[1]), sys.argv[2], sys.argv[3]
+started = time.perf_counter()
+from django.core.wsgi import get_wsgi_application
+application = get_wsgi_application()
+ready = time.perf_counter()
+from wsgiref.util import setup_testing_defaults
+environ = {'PATH_INFO': path, 'HTTP_HOST': host}
+setup_testing_defaults(environ)
+statuses = []
+b''.join(application(environ, lambda status, headers, exc_info=None: statuses.append(status)))
+answered = time.perf_counter()
+from django.conf import settings
+print(json.dumps({
+    'time_to_first_response_ms': (time.time() - spawned_at) * 1000,
+    'setup_ms': (ready - started) * 1000,
+    'first_request_ms': (answered - ready) * 1000,
+    'status': int(statuses[0].split()[0]),
+    'modules': len(sys.modules),
+    'apps': len(settings.INSTALLED_APPS),
+    'middleware': len(settings.MIDDLEWARE),
+}))
+'''
+
+
+def parse_importtime(text):
+    """`-X importtime` stderr -> [(module, self_us, cumulative_us)], in import order"""
+    entries = []
+    for line in text.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        self_us, cumulative_us, module = line[len('import time:'):].split('|')
+        if not self_us.strip().isdigit():
+            # The header line
+            continue
+        entries.append((module.strip(), int(self_us), int(cumulative_us)))
+    return entries
+
+
+def package_totals(entries, top):
+    """Self import time summed per top-level package, slowest first, in ms"""
+    totals = {}
+    for module, self_us, _ in entries:
+        package = module.split('.')[0]
+        totals[package] = totals.get(package, 0) + self_us
+    ranked = sorted(totals.items(), key=lambda item: item[1], reverse=True)[:top]
+    return {package: round(us / 1000, 1) for package, us in ranked}
+
+
+class Command(BaseCommand):
+    help = (
+        'Measures cold start per settings module: fresh interpreters boot Django as the WSGI server '
+        'does and answer one request. Reports time to first response, setup time and where import '
+        'time goes (from python -X importtime) as JSON, with the change against the first profile.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--settings-module', action='append', dest='profiles',
+                            help=f"repeatable (default: {' and '.join(DEFAULT_PROFILES)})")
+        parser.add_argument('--runs', type=int, default=5, help='timed runs per profile; the median is reported')
+        parser.add_argument('--path', default='/health/', help='path of the first request')
+        parser.add_argument('--top', type=int, default=15, help='packages listed by import time')
+        parser.add_argument('--output', help='also write the JSON report to this file')
+
+    def handle(self, *args, **options):
+        if options['runs'] < 1:
+            raise CommandError('--runs precisa ser ao menos 1')
+        profiles = options['profiles'] or list(DEFAULT_PROFILES)
+        report = {
+            'python': sys.version.split()[0],
+            'path': options['path'],
+            'runs': options['runs'],
+            'profiles': {},
+        }
+        for profile in profiles:
+            self.stderr.write(f"Medindo {profile} ({options['runs']} execuções)...")
+            # The first run also writes bytecode caches; it is not timed
+            self._probe(profile, options['path'])
+            runs = [self._probe(profile, options['path'])[0] for _ in range(options['runs'])]
+            last, imports = self._probe(profile, options['path'], importtime=True)
+            entries = parse_importtime(imports)
+            report['profiles'][profile] = {
+                'status': last['status'],
+                'apps': last['apps'],
+                'middleware': last['middleware'],
+                'modules': last['modules'],
+                **{
+                    key: round(statistics.median(run[key] for run in runs), 1)
+                    for key in ('time_to_first_response_ms', 'setup_ms', 'first_request_ms')
+                },
+                'import_ms': round(sum(self_us for _, self_us, _ in entries) / 1000, 1),
+                'top_packages': package_totals(entries, options['top']),
+            }
+
+        baseline = report['profiles'][profiles[0]]
+        for profile in profiles[1:]:
+            measured = report['profiles'][profile]
+            measured['vs_baseline'] = {
+                key: f'{(measured[key] - baseline[key]) / baseline[key]:+.1%}'
+                for key in ('time_to_first_response_ms', 'setup_ms', 'modules')
+                if baseline[key]
+            }
+
+        content = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                output.write(content + '\n')
+        self.stdout.write(content)
+
+    def _probe(self, profile, path, importtime=False):
+        """One cold start under `profile`: (probe result, importtime stderr)"""
+        host = settings.ALLOWED_HOSTS[0] if settings.ALLOWED_HOSTS and settings.ALLOWED_HOSTS[0] != '*' else 'localhost'
+        env = {
+            **os.environ,
+            'DJANGO_SETTINGS_MODULE': profile,
+            # Keeps the per-request log line out of the probe's output
+            'REQUEST_LOG_LEVEL': 'WARNING',
+        }
+        command = [sys.executable] + (['-X', 'importtime'] if importtime else []) + ['-c', PROBE]
+        result = subprocess.run(
+            command + [repr(time.time()), path, host],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+        )
+        lines = result.stdout.strip().splitlines()
+        if result.returncode != 0 or not lines:
+            raise CommandError(f'{profile} não inicializou:\n{result.stderr[-2000:]}')
+        return json.loads(lines[-1]), result.stderr
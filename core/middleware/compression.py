@@ -0,0 +1,152 @@
+import re
+import zlib
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+
+DEFAULTS = {
+    'MIN_SIZE': 1024,
+    'GZIP_LEVEL': 6,
+    'BROTLI_QUALITY': 4,
+    'CONTENT_TYPES': ('application/json', 'application/x-ndjson', 'text/'),
+}
+_CODING = re.compile(r'\s*([^\s;,]+)\s*(?:;\s*q\s*=\s*([0-9.]+))?')
+
+
+def choose_encoding(accept_encoding, brotli_available=None):
+    """Returns 'br', 'gzip' or None for an Accept-Encoding header, honouring q-values"""
+    if brotli_available is None:
+        brotli_available = brotli is not None
+    weights = {}
+    for part in accept_encoding.split(','):
+        match = _CODING.match(part)
+        if not match or not match.group(1):
+            continue
+        try:
+            weight = float(match.group(2)) if match.group(2) else 1.0
+        except ValueError:
+            continue
+        weights[match.group(1).lower()] = weight
+    wildcard = weights.get('*', 0)
+    # On equal weights the first candidate wins
+    candidates = ('br', 'gzip') if brotli_available else ('gzip',)
+    best = max(candidates, key=lambda coding: weights.get(coding, wildcard))
+    if weights.get(best, wildcard) <= 0:
+        return None
+    return best
+
+
+class _Compressor:
+    """One compression stream; every chunk is flushed so streamed rows reach the client as they are produced"""
+
+    def __init__(self, encoding, options):
+        self.encoding = encoding
+        if encoding == 'br':
+            self._brotli = brotli.Compressor(quality=options['BROTLI_QUALITY'])
+        else:
+            self._zlib = zlib.compressobj(options['GZIP_LEVEL'], zlib.DEFLATED, 31)
+
+    def chunk(self, data):
+        if self.encoding == 'br':
+            return self._brotli.process(data) + self._brotli.flush()
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        if self.encoding == 'br':
+            return self._brotli.finish()
+        return self._zlib.flush()
+
+    def whole(self, data):
+        if self.encoding == 'br':
+            return self._brotli.process(data) + self._brotli.finish()
+        return self._zlib.compress(data) + self._zlib.flush()
+
+
+class CompressionMiddleware:
+    """
+    Compresses API responses with brotli (when installed) or gzip, as the
+    client's Accept-Encoding allows. Bodies under MIN_SIZE bytes go out
+    as is; streaming responses are compressed chunk by chunk. Event
+    streams are never compressed, since the compressor would hold events back.
+    Strong ETags are weakened, as the compressed bytes differ from the
+    representation they validate.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.process_response(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.process_response(request, await self.get_response(request))
+
+    def process_response(self, request, response):
+        options = {**DEFAULTS, **getattr(settings, 'API_COMPRESSION', {})}
+        if not self._compressible(response, options):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding is None:
+            return response
+
+        compressor = _Compressor(encoding, options)
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = self._acompress(response.streaming_content, compressor)
+            else:
+                response.streaming_content = self._compress(response.streaming_content, compressor)
+            del response.headers['Content-Length']
+        else:
+            compressed = compressor.whole(response.content)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers['Content-Length'] = str(len(compressed))
+
+        etag = response.headers.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = encoding
+        return response
+
+    @staticmethod
+    def _compressible(response, options):
+        if response.has_header('Content-Encoding') or not 200 <= response.status_code < 300:
+            return False
+        if 'no-transform' in response.headers.get('Cache-Control', ''):
+            return False
+        content_type = response.headers.get('Content-Type', '')
+        if content_type.startswith('text/event-stream'):
+            return False
+        if not any(content_type.startswith(prefix) for prefix in options['CONTENT_TYPES']):
+            return False
+        return response.streaming or len(response.content) >= options['MIN_SIZE']
+
+    @staticmethod
+    def _compress(chunks, compressor):
+        for chunk in chunks:
+            if chunk:
+                yield compressor.chunk(chunk)
+        yield compressor.finish()
+
+    @staticmethod
+    async def _acompress(chunks, compressor):
+        async for chunk in chunks:
+            if chunk:
+                yield compressor.chunk(chunk)
+        yield compressor.finish()
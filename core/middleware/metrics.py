@@ -0,0 +1,82 @@
+import logging
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from ..utils.metrics import begin_request, end_request, get_metrics, get_options
+
+logger = logging.getLogger('core.requests')
+
+UNMATCHED_ROUTE = '<unmatched>'
+
+
+class RequestMetricsMiddleware:
+    """
+    Measures every request: wall time, ORM query count and time spent in
+    queries. The numbers go out in a Server-Timing header and a structured
+    log line, feed the per-endpoint histograms served at /metrics/, and a
+    statement repeated REPEATED_QUERY_THRESHOLD times is logged as a likely
+    N+1. Streaming bodies are measured up to the first byte.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        options = get_options()
+        if not options['ENABLED']:
+            return self.get_response(request)
+        start = time.perf_counter()
+        stats, token = begin_request()
+        try:
+            response = self.get_response(request)
+        finally:
+            end_request(token)
+        return self._finish(request, response, stats, time.perf_counter() - start, options)
+
+    async def __acall__(self, request):
+        options = get_options()
+        if not options['ENABLED']:
+            return await self.get_response(request)
+        start = time.perf_counter()
+        stats, token = begin_request()
+        try:
+            response = await self.get_response(request)
+        finally:
+            end_request(token)
+        return self._finish(request, response, stats, time.perf_counter() - start, options)
+
+    @staticmethod
+    def _finish(request, response, stats, duration, options):
+        match = getattr(request, 'resolver_match', None)
+        route = match.route if match else UNMATCHED_ROUTE
+        sql, repeats = stats.most_repeated()
+        repeated = repeats >= options['REPEATED_QUERY_THRESHOLD']
+        get_metrics().observe(request.method, route, response.status_code, duration, stats, repeated)
+
+        response['Server-Timing'] = (
+            f'app;dur={duration * 1000:.1f}, '
+            f'db;dur={stats.seconds * 1000:.1f};desc="{stats.count} queries"'
+        )
+        fields = {
+            'method': request.method,
+            'route': route,
+            'status': response.status_code,
+            'duration_ms': round(duration * 1000, 1),
+            'queries': stats.count,
+            'db_ms': round(stats.seconds * 1000, 1),
+        }
+        logger.info(' '.join(f'{name}={value}' for name, value in fields.items()), extra={'request_metrics': fields})
+        if repeated:
+            logger.warning(
+                f'Possível N+1 em {request.method} {route}: consulta repetida {repeats} vezes: {sql[:200]}',
+                extra={'request_metrics': {**fields, 'repeated_query': sql, 'repeats': repeats}},
+            )
+        return response
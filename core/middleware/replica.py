@@ -0,0 +1,101 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from ..utils.db_router import (
+    STICKY_COOKIE, begin_request, end_request, is_user_pinned, pin_user, read_databases, resume_request,
+)
+from ..utils.jwt_auth import token_user_id
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class ReplicaStickinessMiddleware:
+    """
+    Decides per request whether Post reads may use a replica. Unsafe methods
+    always read from the primary; after a request writes a post, that
+    client's next requests stay on the primary for POSTS_READ_STICKY_SECONDS,
+    long enough for the replicas to catch up.
+
+    The marker is a short-lived cookie and, for bearer token clients, an
+    entry for the token's user in the POSTS_READ_STICKY_CACHE alias: a
+    cross-origin SPA does not send SameSite=Lax cookies, nor any cookies
+    unless it opts into credentials, but it always sends its token.
+
+    Streaming bodies are produced after the view returns, and their
+    queries only pick a database on the first chunk, so the routing state
+    is made current again while the stream is consumed.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        user_id = self._user_id(request)
+        state, token = begin_request(self._pinned(request, user_id))
+        try:
+            response = self.get_response(request)
+        finally:
+            end_request(token)
+        return self._mark(response, state, user_id)
+
+    async def __acall__(self, request):
+        user_id = self._user_id(request)
+        state, token = begin_request(self._pinned(request, user_id))
+        try:
+            response = await self.get_response(request)
+        finally:
+            end_request(token)
+        return self._mark(response, state, user_id)
+
+    @staticmethod
+    def _user_id(request):
+        # Without replicas every read is on the primary; skip decoding the token
+        return token_user_id(request) if read_databases() else None
+
+    @staticmethod
+    def _pinned(request, user_id):
+        return (
+            request.method not in SAFE_METHODS
+            or STICKY_COOKIE in request.COOKIES
+            or (user_id is not None and is_user_pinned(user_id))
+        )
+
+    @staticmethod
+    def _mark(response, state, user_id):
+        if response.streaming:
+            response.streaming_content = _with_state(response.streaming_content, state)
+        if state.wrote:
+            seconds = getattr(settings, 'POSTS_READ_STICKY_SECONDS', 5)
+            response.set_cookie(
+                STICKY_COOKIE, '1', max_age=seconds, httponly=True, samesite='Lax',
+                secure=getattr(settings, 'SESSION_COOKIE_SECURE', False),
+            )
+            if user_id is not None:
+                pin_user(user_id, seconds)
+        return response
+
+
+def _with_state(content, state):
+    if hasattr(content, '__aiter__'):
+        async def stream():
+            token = resume_request(state)
+            try:
+                async for chunk in content:
+                    yield chunk
+            finally:
+                end_request(token)
+    else:
+        def stream():
+            token = resume_request(state)
+            try:
+                yield from content
+            finally:
+                end_request(token)
+    return stream()
@@ -0,0 +1,23 @@
+from django.db import migrations
+
+from core.utils.search import create_search_index, drop_search_index
+
+
+def create_index(apps, schema_editor):
+    create_search_index(schema_editor)
+
+
+def drop_index(apps, schema_editor):
+    drop_search_index(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_post_event'),
+    ]
+
+    operations = [
+        # SQLite only: other backends use the substring fallback in core.utils.search
+        migrations.RunPython(create_index, drop_index),
+    ]
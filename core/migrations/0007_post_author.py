@@ -0,0 +1,41 @@
+# Generated by Django 4.2.30 on 2026-10-18 16:24
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_author(apps, schema_editor):
+    Post = apps.get_model('core', 'Post')
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+    # One correlated UPDATE; posts whose username matches no user keep a NULL author
+    Post.objects.using(schema_editor.connection.alias).update(
+        author_id=models.Subquery(
+            User.objects.filter(username=models.OuterRef('username')).values('pk')[:1]
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('core', '0006_post_search'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='post',
+            name='post_author_idx',
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='author',
+            field=models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='posts', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.RunPython(backfill_author, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['author', '-created_at'], name='post_author_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_throttlebucket'),
+    ]
+
+    # A plain AddField with a default makes SQLite rebuild core_post, which
+    # rewrites every row and drops the search index triggers. ADD COLUMN with
+    # a constant default only touches the schema, whatever the table size.
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(
+                    'ALTER TABLE core_post ADD COLUMN version integer NOT NULL DEFAULT 1 CHECK (version >= 0)',
+                    'ALTER TABLE core_post DROP COLUMN version',
+                ),
+            ],
+            state_operations=[
+                migrations.AddField(
+                    model_name='post',
+                    name='version',
+                    field=models.PositiveIntegerField(default=1),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 4.2.30 on 2026-10-18 16:58
+
+import core.models.post
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_post_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostPurge',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('through_seq', models.BigIntegerField(db_index=True)),
+                ('purged', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.RemoveIndex(
+            model_name='post',
+            name='post_feed_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='post',
+            name='post_author_idx',
+        ),
+        # As for 0010: ADD COLUMN keeps SQLite from rebuilding core_post. Existing
+        # rows enter the change feed in id order.
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(
+                    'ALTER TABLE core_post ADD COLUMN change_seq bigint NOT NULL DEFAULT 0',
+                    'ALTER TABLE core_post DROP COLUMN change_seq',
+                ),
+                migrations.RunSQL('UPDATE core_post SET change_seq = id', migrations.RunSQL.noop),
+            ],
+            state_operations=[
+                migrations.AddField(
+                    model_name='post',
+                    name='change_seq',
+                    field=core.models.post.ChangeSeqField(default=core.models.post.NextChangeSeq, editable=False),
+                ),
+            ],
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['-created_at', '-id'], name='post_feed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['author', '-created_at'], name='post_author_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['change_seq', 'id'], name='post_changes_idx'),
+        ),
+    ]
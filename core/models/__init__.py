@@ -0,0 +1,5 @@
+from .post import Post
+from .event import PostEvent
+from .task import QueuedTask
+from .throttle import ThrottleBucket
+from .purge import PostPurge
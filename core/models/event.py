@@ -0,0 +1,9 @@
+from django.db import models
+class PostEvent(models.Model):
+    """Shared log of post events read by DatabaseHub streams"""
+    type = models.CharField(max_length=32)
+    data = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.id} {self.type}"
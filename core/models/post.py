@@ -1,9 +1,158 @@
-from django.db import models
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connections, models, router, transaction
+from django.db.models import F, Q, sql
+from django.utils import timezone
+
+from .purge import PostPurge
+
+
+class NextChangeSeq(models.Expression):
+    """
+    The next value of the post change sequence, computed inside the write
+    statement: one past the highest change_seq in core_post or purged from
+    it. The statement holds SQLite's write lock while evaluating it, so
+    sequence order is commit order and readers never see a gap get filled
+    later. Rows written by one multi-row statement may share a value.
+    """
+    output_field = models.BigIntegerField()
+
+    def as_sql(self, compiler, connection):
+        greatest = 'MAX' if connection.vendor == 'sqlite' else 'GREATEST'
+        post_table = connection.ops.quote_name(Post._meta.db_table)
+        purge_table = connection.ops.quote_name(PostPurge._meta.db_table)
+        return (
+            f'({greatest}('
+            f'COALESCE((SELECT MAX(change_seq) FROM {post_table}), 0), '
+            f'COALESCE((SELECT MAX(through_seq) FROM {purge_table}), 0)'
+            f') + 1)'
+        ), []
+
+
+class ChangeSeqField(models.BigIntegerField):
+    """Filled by NextChangeSeq on insert and read back with RETURNING"""
+    db_returning = True
+
+
+def can_update_returning(connection):
+    """UPDATE ... RETURNING: SQLite 3.35+ and PostgreSQL (MariaDB only returns from INSERT/DELETE)"""
+    if connection.vendor == 'sqlite':
+        return connection.Database.sqlite_version_info >= (3, 35)
+    return connection.vendor == 'postgresql'
+
+
+class _RowsChanged(Exception):
+    """Rolls back an update_returning() attempt that raced another write"""
+
+
+class PostQuerySet(models.QuerySet):
+    def update_returning(self, **values):
+        """
+        Runs UPDATE with this queryset's filters and returns the updated rows.
+        Where the database supports RETURNING (SQLite 3.35+, PostgreSQL) the
+        rows come back from the UPDATE statement itself; elsewhere they are
+        read back inside the same transaction. Like update(), auto_now fields
+        are not touched unless they are passed in `values`; change_seq always moves.
+        """
+        values.setdefault('change_seq', NextChangeSeq())
+        using = self._db or router.db_for_write(self.model)
+        if not can_update_returning(connections[using]):
+            return self._update_then_select(using, values)
+        query = self.query.chain(sql.UpdateQuery)
+        query.add_update_values(values)
+        statement, params = query.get_compiler(using).as_sql()
+        return list(self.model._base_manager.raw(f'{statement} RETURNING *', params, using=using))
+
+    def _update_then_select(self, using, values):
+        """
+        update_returning() without RETURNING. The matching pks are read first,
+        then one transaction updates those rows with this queryset's filters
+        still applied and reads them back while the UPDATE's locks are held.
+        The UPDATE comes first in the transaction so SQLite takes its write
+        lock up front rather than upgrading a read lock, which deadlocks
+        concurrent writers. If a row stopped matching in between, the attempt
+        is rolled back and retried, so only rows this call updated are returned.
+        """
+        while True:
+            pks = list(self.using(using).values_list('pk', flat=True))
+            if not pks:
+                return []
+            try:
+                with transaction.atomic(using=using):
+                    if self.using(using).filter(pk__in=pks).update(**values) != len(pks):
+                        raise _RowsChanged
+                    return list(self.model._base_manager.using(using).filter(pk__in=pks))
+            except _RowsChanged:
+                continue
+
+    async def aupdate_returning(self, **values):
+        # Raw queries have no async API; like Django's own a*() methods, run the sync one in a thread
+        return await sync_to_async(self.update_returning)(**values)
+
+    def soft_delete(self, **values):
+        """
+        Turns the matching rows into tombstones in one UPDATE and returns how
+        many there were. Title and content are cleared, which also drops the
+        rows from the search index through its update trigger.
+        """
+        return self.update(**self._tombstone_values(), **values)
+
+    async def asoft_delete(self, **values):
+        return await self.aupdate(**self._tombstone_values(), **values)
+
+    @staticmethod
+    def _tombstone_values():
+        now = timezone.now()
+        return {
+            'deleted_at': now, 'updated_at': now, 'title': '', 'content': '',
+            'version': F('version') + 1, 'change_seq': NextChangeSeq(),
+        }
+
+
+class PostManager(models.Manager.from_queryset(PostQuerySet)):
+    """Live posts only; tombstones are reached through Post.all_objects"""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_at__isnull=True)
+
+
+LIVE = Q(deleted_at__isnull=True)
+
+
 class Post(models.Model):
+    # Ownership; NULL for legacy rows whose username matched no user and for
+    # the tombstones of deleted users
+    author = models.ForeignKey(
+        settings.AUTH_USER_MODEL, null=True, on_delete=models.SET_NULL, related_name='posts',
+        # Covered by post_author_idx, whose leading column is author_id
+        db_index=False,
+    )
+    # Denormalized author name, kept for API compatibility
     username = models.CharField(max_length=150)
     title = models.CharField(max_length=255)
     content = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+    # Bumped by every edit; PATCH matches it against If-Match or a `version` field
+    version = models.PositiveIntegerField(default=1)
+    # Set on soft delete; the row stays behind as a tombstone for /posts/changes/
+    deleted_at = models.DateTimeField(null=True, blank=True)
+    # Position of the row's last create, edit or delete in the change feed
+    change_seq = ChangeSeqField(default=NextChangeSeq, editable=False)
+
+    objects = PostManager()
+    all_objects = PostQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Feed: ORDER BY created_at DESC, id DESC plus the keyset predicate.
+            # Partial, like the author index: reads through Post.objects never see tombstones.
+            models.Index(fields=['-created_at', '-id'], name='post_feed_idx', condition=LIVE),
+            # Per-author listings
+            models.Index(fields=['author', '-created_at'], name='post_author_idx', condition=LIVE),
+            # /posts/changes/: rows after a sequence number, tombstones included
+            models.Index(fields=['change_seq', 'id'], name='post_changes_idx'),
+        ]
 
     def __str__(self):
         return f"{self.title} by {self.username}"
@@ -0,0 +1,14 @@
+from django.db import models
+
+
+class PostPurge(models.Model):
+    """
+    A `manage.py purge_tombstones` run. /posts/changes/ clients that synced
+    before through_seq may have missed deletions and must start over.
+    """
+    through_seq = models.BigIntegerField(db_index=True)
+    purged = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.purged} tombstones through {self.through_seq}"
@@ -0,0 +1,14 @@
+from django.db import models
+
+
+class ThrottleBucket(models.Model):
+    """Token bucket state shared by every worker (core.utils.throttling.DatabaseBucketStore)"""
+    key = models.CharField(max_length=255, primary_key=True)
+    tokens = models.FloatField()
+    # Unix time of the last refill, as a float for sub-second refill math in SQL
+    updated_at = models.FloatField(db_index=True)
+    # Whether the last request against this bucket was let through
+    granted = models.BooleanField(default=True)
+
+    def __str__(self):
+        return f"{self.key} ({self.tokens:.2f})"
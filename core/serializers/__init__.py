@@ -3,3 +3,4 @@
 # Exemplo: post_serializer.py, user_serializer.py, etc.
 
 from .post_serializer import PostSerializer
+from .post_representation import POST_VALUES, post_rows, represent_post, represent_rows
@@ -0,0 +1,60 @@
+"""
+The canonical post representation returned by every post endpoint.
+
+Reads build it straight from `values_list()` rows, skipping model
+instantiation and per-field serializer work; writes, which already hold a
+Post instance, use represent_post(). Both produce the same shape.
+PostSerializer remains the input validator.
+"""
+
+# Column order of the rows consumed by represent_rows(); the author columns
+# come from a LEFT JOIN because author is nullable.
+POST_VALUES = (
+    'id', 'username', 'created_at', 'title', 'content', 'version',
+    'author_id', 'author__username', 'author__first_name', 'author__last_name',
+)
+
+
+def post_rows(queryset, named=False):
+    """`queryset` as POST_VALUES rows; named rows also expose .id and .created_at"""
+    return queryset.values_list(*POST_VALUES, named=named)
+
+
+def represent_rows(rows):
+    return [
+        {
+            'id': post_id,
+            'username': username,
+            'created_datetime': created_at,
+            'title': title,
+            'content': content,
+            'version': version,
+            'author': {
+                'id': author_id,
+                'username': author_username,
+                'first_name': author_first_name,
+                'last_name': author_last_name,
+            } if author_id is not None else None,
+        }
+        for (post_id, username, created_at, title, content, version,
+             author_id, author_username, author_first_name, author_last_name) in rows
+    ]
+
+
+def represent_post(post):
+    """Expects post.author to be loaded already (select_related or assigned)"""
+    author = post.author
+    return {
+        'id': post.id,
+        'username': post.username,
+        'created_datetime': post.created_at,
+        'title': post.title,
+        'content': post.content,
+        'version': post.version,
+        'author': {
+            'id': author.pk,
+            'username': author.username,
+            'first_name': author.first_name,
+            'last_name': author.last_name,
+        } if author is not None else None,
+    }
@@ -0,0 +1,79 @@
+from asgiref.sync import sync_to_async
+from django.urls import reverse
+from django.test import TestCase
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from rest_framework_simplejwt.tokens import RefreshToken
+from ..models.post import Post
+from ..utils.feed_cache import get_feed_cache
+
+User = get_user_model()
+
+
+class AsyncPostViewsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='user1', email='user1@email.com', password='pass1234')
+        self.other = User.objects.create_user(username='user2', email='user2@email.com', password='pass5678')
+        token = str(RefreshToken.for_user(self.user).access_token)
+        self.headers = {'Authorization': f'Bearer {token}'}
+        get_feed_cache().invalidate()
+
+    async def test_requires_token(self):
+        response = await self.async_client.get(reverse('async_listposts'))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    async def test_create_and_list(self):
+        response = await self.async_client.post(
+            reverse('async_listposts'), {'title': 'Async', 'content': 'Body'},
+            content_type='application/json', headers=self.headers,
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.json()['username'], 'user1')
+
+        response = await self.async_client.get(reverse('async_listposts'), headers=self.headers)
+        self.assertEqual([post['title'] for post in response.json()], ['Async'])
+
+        response = await self.async_client.get(
+            reverse('async_listposts'), headers={**self.headers, 'If-None-Match': response['ETag']},
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    async def test_paginated_list(self):
+        for i in range(3):
+            await Post.objects.acreate(author=self.user, username='user1', title=f'Post{i}', content='Body')
+        response = await self.async_client.get(reverse('async_listposts'), {'page_size': 2}, headers=self.headers)
+        self.assertEqual(len(response.json()['results']), 2)
+        response = await self.async_client.get(response.json()['next'], headers=self.headers)
+        self.assertEqual([post['title'] for post in response.json()['results']], ['Post0'])
+
+    async def test_edit(self):
+        post = await Post.objects.acreate(author=self.user, username='user1', title='Old', content='Old content')
+        response = await self.async_client.patch(
+            reverse('async_editpost', args=[post.id]), {'title': 'New'},
+            content_type='application/json', headers=self.headers,
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['title'], 'New')
+        await post.arefresh_from_db()
+        self.assertEqual(post.content, 'Old content')
+
+    async def test_edit_forbidden(self):
+        post = await Post.objects.acreate(author=self.other, username='user2', title='Other', content='Other content')
+        response = await self.async_client.patch(
+            reverse('async_editpost', args=[post.id]), {'title': 'Hack'},
+            content_type='application/json', headers=self.headers,
+        )
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    async def test_delete(self):
+        post = await Post.objects.acreate(author=self.user, username='user1', title='To delete', content='Delete me')
+        response = await self.async_client.delete(reverse('async_deletepost', args=[post.id]), headers=self.headers)
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(await Post.objects.filter(id=post.id).aexists())
+
+    async def test_delete_forbidden_and_missing(self):
+        post = await Post.objects.acreate(author=self.other, username='user2', title='Other', content='Other content')
+        response = await self.async_client.delete(reverse('async_deletepost', args=[post.id]), headers=self.headers)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        response = await self.async_client.delete(reverse('async_deletepost', args=[post.id + 100]), headers=self.headers)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -53,14 +53,14 @@ class PostTests(APITestCase):
         self.assertEqual(response.data['title'], 'Test Post')
 
     def test_list_posts(self):
-        Post.objects.create(username='user1', title='Post1', content='Content1')
+        Post.objects.create(author=self.user, username='user1', title='Post1', content='Content1')
         url = reverse('listposts')
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertGreaterEqual(len(response.data), 1)
 
     def test_edit_post(self):
-        post = Post.objects.create(username='user1', title='Old', content='Old content')
+        post = Post.objects.create(author=self.user, username='user1', title='Old', content='Old content')
         url = reverse('editpost', args=[post.id])
         data = {'title': 'New', 'content': 'New content'}
         response = self.client.patch(url, data, format='json')
@@ -68,14 +68,14 @@ class PostTests(APITestCase):
         self.assertEqual(response.data['title'], 'New')
 
     def test_delete_post(self):
-        post = Post.objects.create(username='user1', title='To delete', content='Delete me')
+        post = Post.objects.create(author=self.user, username='user1', title='To delete', content='Delete me')
         url = reverse('deletepost', args=[post.id])
         response = self.client.delete(url)
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
 
     def test_edit_post_forbidden(self):
         other = User.objects.create_user(username='user2', email='user2@email.com', password='pass5678')
-        post = Post.objects.create(username='user2', title='Other', content='Other content')
+        post = Post.objects.create(author=other, username='user2', title='Other', content='Other content')
         url = reverse('editpost', args=[post.id])
         data = {'title': 'Hack'}
         response = self.client.patch(url, data, format='json')
@@ -83,7 +83,7 @@ class PostTests(APITestCase):
 
     def test_delete_post_forbidden(self):
         other = User.objects.create_user(username='user2', email='user2@email.com', password='pass5678')
-        post = Post.objects.create(username='user2', title='Other', content='Other content')
+        post = Post.objects.create(author=other, username='user2', title='Other', content='Other content')
         url = reverse('deletepost', args=[post.id])
         response = self.client.delete(url)
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
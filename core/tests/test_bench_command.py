@@ -0,0 +1,37 @@
+from django.core.management.base import CommandError
+from django.test import SimpleTestCase
+
+from ..management.commands.bench import compare_reports, parse_mix
+from ..utils.loadgen import summarize
+
+
+class BenchCommandTests(SimpleTestCase):
+    def test_parse_mix(self):
+        self.assertEqual(parse_mix('list=10, create=2,delete=0'), {'list': 10, 'create': 2, 'delete': 0})
+
+    def test_parse_mix_rejects_bad_input(self):
+        for mix in ('list=10,upload=1', 'list=many', 'list=0'):
+            with self.subTest(mix=mix), self.assertRaises(CommandError):
+                parse_mix(mix)
+
+    def test_compare_reports(self):
+        baseline = {'throughput_rps': 100, 'p95_ms': 50, 'p99_ms': 80, 'error_rate': 0}
+        self.assertEqual(compare_reports({**baseline, 'throughput_rps': 95, 'p95_ms': 54}, baseline, 0.1), [])
+
+        regressions = compare_reports(
+            {'throughput_rps': 80, 'p95_ms': 50, 'p99_ms': 120, 'error_rate': 0.2}, baseline, 0.1,
+        )
+        self.assertEqual([line.split(':')[0] for line in regressions], ['throughput_rps', 'p99_ms', 'error_rate'])
+
+        # A run where every request failed has no throughput left to compare, which is the worst regression
+        regressions = compare_reports({**baseline, 'throughput_rps': 0, 'error_rate': 1}, baseline, 0.1)
+        self.assertEqual([line.split(':')[0] for line in regressions], ['throughput_rps', 'error_rate'])
+
+    def test_error_rates_count_requests_that_raised(self):
+        statuses = {'list': {200: 3, 500: 1}, 'create': {}}
+        report = summarize({'list': [0.01] * 4}, statuses, {'list': 4, 'create': 2}, elapsed=1)
+        self.assertEqual(report['operations']['list']['requests'], 8)
+        self.assertEqual(report['operations']['list']['error_rate'], 0.625)
+        self.assertEqual(report['operations']['create']['error_rate'], 1)
+        self.assertEqual((report['requests'], report['errors'], report['error_rate']), (10, 7, 0.7))
+        self.assertEqual(report['throughput_rps'], 4)
@@ -0,0 +1,98 @@
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from ..models.post import Post
+from ..utils.feed_cache import get_feed_cache
+
+User = get_user_model()
+
+
+class BulkPostsTests(APITestCase):
+    def setUp(self):
+        get_feed_cache().invalidate()
+        self.user = User.objects.create_user(username='bulkuser', password='testpass123')
+        self.other = User.objects.create_user(username='otheruser', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('bulk_posts')
+
+    # Counts the view's own queries, not the rate limit bucket's (see test_throttling)
+    @override_settings(API_THROTTLING={'ENABLED': False})
+    def test_bulk_create_in_a_handful_of_queries(self):
+        items = [{'title': f'Post {i}', 'content': 'Imported'} for i in range(1000)]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url, items, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['created'], 1000)
+        self.assertLessEqual(len(queries), 12)
+        self.assertEqual(Post.objects.filter(username='bulkuser').count(), 1000)
+        first = response.data['results'][0]
+        self.assertEqual(first['status'], 'created')
+        self.assertEqual(first['post']['title'], 'Post 0')
+        self.assertIsNotNone(first['post']['id'])
+
+    def test_bulk_create_ignores_client_username(self):
+        response = self.client.post(
+            self.url, {'posts': [{'title': 'Mine', 'content': 'x', 'username': 'otheruser'}]}, format='json',
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Post.objects.get().username, 'bulkuser')
+
+    def test_invalid_item_creates_nothing(self):
+        items = [{'title': 'Ok', 'content': 'x'}, {'content': 'no title'}]
+        response = self.client.post(self.url, items, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['results'][0], {'index': 0, 'status': 'valid'})
+        self.assertEqual(response.data['results'][1]['status'], 'invalid')
+        self.assertIn('title', response.data['results'][1]['errors'])
+        self.assertFalse(Post.objects.exists())
+
+    def test_rejects_non_list_and_oversized_bodies(self):
+        self.assertEqual(self.client.post(self.url, {'title': 'x'}, format='json').status_code, 400)
+        with self.settings(POSTS_BULK_MAX_ITEMS=2):
+            response = self.client.post(self.url, [{'title': 'x', 'content': 'y'}] * 3, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(API_THROTTLING={'ENABLED': False})
+    def test_bulk_delete_enforces_ownership(self):
+        mine = Post.objects.create(author=self.user, username='bulkuser', title='Mine', content='x')
+        theirs = Post.objects.create(author=self.other, username='otheruser', title='Theirs', content='x')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.delete(self.url, {'ids': [mine.id, theirs.id, 999999]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['deleted'], 1)
+        self.assertEqual(response.data['results'], [
+            {'id': mine.id, 'status': 'deleted'},
+            {'id': theirs.id, 'status': 'forbidden'},
+            {'id': 999999, 'status': 'not_found'},
+        ])
+        self.assertLessEqual(len(queries), 4)
+        self.assertFalse(Post.objects.filter(id=mine.id).exists())
+        self.assertTrue(Post.objects.filter(id=theirs.id).exists())
+
+    def test_bulk_delete_many_ids(self):
+        Post.objects.bulk_create(
+            Post(author=self.user, username='bulkuser', title=f'P{i}', content='x') for i in range(1200)
+        )
+        ids = list(Post.objects.values_list('id', flat=True))
+        response = self.client.delete(self.url, ids, format='json')
+        self.assertEqual(response.data['deleted'], 1200)
+        self.assertFalse(Post.objects.exists())
+
+    def test_bulk_delete_rejects_non_integer_ids(self):
+        response = self.client.delete(self.url, {'ids': ['1']}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_bulk_writes_invalidate_feed_cache(self):
+        self.client.get(reverse('listposts'))
+        self.client.post(self.url, [{'title': 'New', 'content': 'x'}], format='json')
+        response = self.client.get(reverse('listposts'))
+        self.assertEqual([post['title'] for post in response.data], ['New'])
+
+    def test_requires_authentication(self):
+        self.client.force_authenticate(user=None)
+        response = self.client.post(self.url, [{'title': 'x', 'content': 'y'}], format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
@@ -0,0 +1,115 @@
+import gzip
+import json
+from unittest import skipIf
+
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from ..middleware.compression import CompressionMiddleware, brotli, choose_encoding
+from ..models.post import Post
+from ..utils.feed_cache import get_feed_cache
+
+User = get_user_model()
+
+
+class ChooseEncodingTests(SimpleTestCase):
+    def test_prefers_brotli_when_available(self):
+        self.assertEqual(choose_encoding('gzip, deflate, br', brotli_available=True), 'br')
+        self.assertEqual(choose_encoding('gzip, deflate, br', brotli_available=False), 'gzip')
+
+    def test_honours_q_values(self):
+        self.assertEqual(choose_encoding('br;q=0.5, gzip', brotli_available=True), 'gzip')
+        self.assertEqual(choose_encoding('br;q=0, gzip;q=0', brotli_available=True), None)
+        self.assertEqual(choose_encoding('*', brotli_available=False), 'gzip')
+        self.assertEqual(choose_encoding('*, gzip;q=0', brotli_available=False), None)
+
+    def test_identity_only(self):
+        self.assertIsNone(choose_encoding('', brotli_available=True))
+        self.assertIsNone(choose_encoding('identity', brotli_available=True))
+
+
+class CompressionMiddlewareTests(SimpleTestCase):
+    def setUp(self):
+        self.request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING='gzip')
+
+    def _process(self, response):
+        return CompressionMiddleware(lambda request: response)(self.request)
+
+    def test_small_bodies_are_sent_as_is(self):
+        response = self._process(HttpResponse(b'{"ok":true}', content_type='application/json'))
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(response.content, b'{"ok":true}')
+
+    def test_large_json_is_gzipped(self):
+        body = json.dumps([{'title': f'Post {i}'} for i in range(200)]).encode()
+        response = self._process(HttpResponse(body, content_type='application/json'))
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        self.assertEqual(int(response['Content-Length']), len(response.content))
+        self.assertEqual(gzip.decompress(response.content), body)
+
+    @override_settings(API_COMPRESSION={'MIN_SIZE': 0})
+    def test_other_content_types_are_skipped(self):
+        response = self._process(HttpResponse(b'\x89PNG' * 1000, content_type='image/png'))
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_event_streams_are_not_compressed(self):
+        response = self._process(StreamingHttpResponse(iter([b'data: x\n\n']), content_type='text/event-stream'))
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_strong_etag_is_weakened(self):
+        body = b'{"title":"Post"}' * 200
+        response = HttpResponse(body, content_type='application/json')
+        response['ETag'] = '"abc"'
+        self.assertEqual(self._process(response)['ETag'], 'W/"abc"')
+
+    def test_streaming_chunks_are_flushed(self):
+        chunks = [b'{"id":%d}\n' % i for i in range(3)]
+        response = self._process(StreamingHttpResponse(iter(chunks), content_type='application/x-ndjson'))
+        self.assertFalse(response.has_header('Content-Length'))
+        parts = list(response.streaming_content)
+        # Every input chunk yields decodable output before the stream ends
+        self.assertTrue(all(parts[:len(chunks)]))
+        self.assertEqual(gzip.decompress(b''.join(parts)), b''.join(chunks))
+
+
+class CompressedEndpointTests(APITestCase):
+    def setUp(self):
+        get_feed_cache().invalidate()
+        self.user = User.objects.create_user(username='user1', password='pass1234')
+        self.client.force_authenticate(user=self.user)
+        Post.objects.bulk_create(
+            Post(author=self.user, username='user1', title=f'Post {i}', content='Lorem ipsum ' * 20)
+            for i in range(30)
+        )
+
+    def test_feed_is_gzipped_and_revalidates(self):
+        url = reverse('listposts')
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(len(json.loads(gzip.decompress(response.content))), 30)
+        self.assertTrue(response['ETag'].startswith('W/'))
+
+        revalidated = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(revalidated.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_uncompressed_without_accept_encoding(self):
+        response = self.client.get(reverse('listposts'))
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(response['Vary'].count('Accept-Encoding'), 1)
+
+    def test_streamed_export_is_gzipped(self):
+        response = self.client.get(reverse('export_posts'), {'output': 'ndjson'}, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        lines = gzip.decompress(b''.join(response.streaming_content)).splitlines()
+        self.assertEqual(len(lines), 30)
+
+    @skipIf(brotli is None, 'Brotli is not installed')
+    def test_brotli_is_preferred(self):
+        response = self.client.get(reverse('listposts'), HTTP_ACCEPT_ENCODING='gzip, br')
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(len(json.loads(brotli.decompress(response.content))), 30)
@@ -0,0 +1,73 @@
+import time
+from datetime import timedelta
+
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date
+from rest_framework.test import APITestCase
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from ..models.post import Post
+from ..utils.changes import purge_tombstones
+
+User = get_user_model()
+
+
+class ConditionalFeedTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='user1', email='user1@email.com', password='pass1234')
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('listposts')
+        self.post = Post.objects.create(author=self.user, username='user1', title='Post', content='Content')
+
+    def test_validators_are_sent(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('ETag', response)
+        # Whole-second dates cannot tell two writes in one second apart
+        self.assertNotIn('Last-Modified', response)
+        self.assertIn('no-cache', response['Cache-Control'])
+
+    def test_if_none_match_returns_304_without_rows(self):
+        etag = self.client.get(self.url)['ETag']
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b'')
+
+    def test_if_modified_since_alone_never_returns_a_stale_304(self):
+        newest = Post.objects.create(author=self.user, username='user1', title='Newest', content='Content')
+        self.client.get(self.url)
+        # Deleting the newest post leaves the newest live updated_at where it was
+        self.client.delete(reverse('deletepost', args=[newest.id]))
+        response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=http_date(time.time() + 60))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([post['title'] for post in response.data], ['Post'])
+
+    def test_purge_does_not_bring_back_an_old_etag(self):
+        newest = Post.objects.create(author=self.user, username='user1', title='Newest', content='Content')
+        before_delete = self.client.get(self.url)['ETag']
+        self.client.delete(reverse('deletepost', args=[newest.id]))
+        purge_tombstones(timezone.now() + timedelta(seconds=1))
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=before_delete)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_edit_changes_validator(self):
+        etag = self.client.get(self.url)['ETag']
+        self.client.patch(reverse('editpost', args=[self.post.id]), {'title': 'Edited'}, format='json')
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_delete_changes_validator(self):
+        Post.objects.create(author=self.user, username='user1', title='Other', content='Content')
+        etag = self.client.get(self.url)['ETag']
+        self.client.delete(reverse('deletepost', args=[self.post.id]))
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_pages_have_distinct_validators(self):
+        Post.objects.create(author=self.user, username='user1', title='Other', content='Content')
+        first = self.client.get(self.url, {'page_size': 1})
+        second = self.client.get(first.data['next'])
+        self.assertNotEqual(first['ETag'], second['ETag'])
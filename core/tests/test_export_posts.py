@@ -0,0 +1,127 @@
+import datetime
+import json
+import tracemalloc
+import warnings
+
+from django.core.handlers.asgi import ASGIHandler
+from django.core.signals import request_finished, request_started
+from django.db import close_old_connections
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from rest_framework_simplejwt.tokens import RefreshToken
+from ..models.post import Post
+
+User = get_user_model()
+
+
+class ExportPostsTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='exporter', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('export_posts')
+
+    def _create_posts(self, count, start=0):
+        Post.objects.bulk_create(
+            Post(author=self.user, username='exporter', title=f'Post {i}', content='Lorem ipsum ' * 10)
+            for i in range(start, start + count)
+        )
+
+    def _peak_streaming_memory(self, **params):
+        response = self.client.get(self.url, params)
+        tracemalloc.start()
+        try:
+            size = sum(len(chunk) for chunk in response.streaming_content)
+            return size, tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+            response.close()
+
+    def test_json_array(self):
+        self._create_posts(3)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        posts = json.loads(b''.join(response.streaming_content))
+        self.assertEqual([post['title'] for post in posts], ['Post 0', 'Post 1', 'Post 2'])
+        self.assertEqual(set(posts[0]), {'id', 'username', 'created_datetime', 'title', 'content', 'version', 'author'})
+
+    def test_empty_table_is_an_empty_array(self):
+        response = self.client.get(self.url)
+        self.assertEqual(json.loads(b''.join(response.streaming_content)), [])
+
+    def test_ndjson(self):
+        self._create_posts(5)
+        with self.settings(POSTS_EXPORT_CHUNK_SIZE=2):
+            response = self.client.get(self.url, {'output': 'ndjson'})
+            lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertEqual([json.loads(line)['title'] for line in lines], [f'Post {i}' for i in range(5)])
+
+    def test_since_filters_on_created_at(self):
+        self._create_posts(2)
+        old = timezone.now() - datetime.timedelta(days=10)
+        Post.objects.filter(title='Post 0').update(created_at=old)
+        since = (old + datetime.timedelta(days=1)).date().isoformat()
+        response = self.client.get(self.url, {'since': since})
+        posts = json.loads(b''.join(response.streaming_content))
+        self.assertEqual([post['title'] for post in posts], ['Post 1'])
+
+    def test_rejects_bad_parameters(self):
+        self.assertEqual(self.client.get(self.url, {'since': 'yesterday'}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(self.url, {'output': 'xml'}).status_code, status.HTTP_400_BAD_REQUEST)
+
+    async def _asgi_get(self, path, query_string=b''):
+        """Runs a request through the real ASGI handler and returns the messages it sent"""
+        token = str(RefreshToken.for_user(self.user).access_token)
+        scope = {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+            'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'query_string': query_string,
+            'headers': [(b'host', b'testserver'), (b'authorization', f'Bearer {token}'.encode())],
+            'client': ('127.0.0.1', 1234), 'server': ('testserver', 80),
+        }
+        messages = []
+
+        async def receive():
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+        async def send(message):
+            messages.append(message)
+
+        # Keep the test transaction's connection open, like the test client does
+        request_started.disconnect(close_old_connections)
+        request_finished.disconnect(close_old_connections)
+        try:
+            await ASGIHandler()(scope, receive, send)
+        finally:
+            request_started.connect(close_old_connections)
+            request_finished.connect(close_old_connections)
+        return messages
+
+    async def test_asgi_streams_from_an_async_iterator(self):
+        with self.settings(POSTS_EXPORT_CHUNK_SIZE=2):
+            await Post.objects.abulk_create(
+                Post(author=self.user, username='exporter', title=f'Post {i}', content='x') for i in range(5)
+            )
+            with warnings.catch_warnings():
+                warnings.filterwarnings('error', message='StreamingHttpResponse must consume')
+                messages = await self._asgi_get(self.url, b'output=ndjson')
+        self.assertEqual(messages[0]['status'], 200)
+        chunks = [message['body'] for message in messages[1:] if message.get('body')]
+        # One chunk per database batch, not the whole table in one go
+        self.assertEqual(len(chunks), 3)
+        lines = b''.join(chunks).decode().splitlines()
+        self.assertEqual([json.loads(line)['title'] for line in lines], [f'Post {i}' for i in range(5)])
+
+    def test_memory_stays_flat_as_the_table_grows(self):
+        with self.settings(POSTS_EXPORT_CHUNK_SIZE=200):
+            self._create_posts(1000)
+            small_size, small_peak = self._peak_streaming_memory(output='ndjson')
+            self._create_posts(9000, start=1000)
+            large_size, large_peak = self._peak_streaming_memory(output='ndjson')
+        self.assertGreater(large_size, small_size * 9)
+        # Ten times the rows must not mean anywhere near ten times the memory
+        self.assertLess(large_peak, small_peak * 2)
+        self.assertLess(large_peak, large_size / 5)
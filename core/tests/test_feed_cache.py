@@ -0,0 +1,119 @@
+from unittest import mock
+
+from django.urls import reverse
+from django.test import SimpleTestCase, override_settings
+from rest_framework.test import APITestCase
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from rest_framework_simplejwt.tokens import RefreshToken
+from ..models.post import Post
+from ..utils.feed_cache import FeedCache, LocalLRUBackend, get_feed_cache
+
+User = get_user_model()
+
+
+class LocalLRUBackendTests(SimpleTestCase):
+    def test_evicts_least_recently_used(self):
+        backend = LocalLRUBackend(max_entries=2, timeout=60)
+        backend.set('a', 1)
+        backend.set('b', 2)
+        backend.get('a')
+        backend.set('c', 3)
+        self.assertEqual(backend.get('a'), 1)
+        self.assertEqual(backend.get('c'), 3)
+        self.assertEqual(len(backend), 2)
+
+    def test_entries_expire(self):
+        backend = LocalLRUBackend(max_entries=2, timeout=10)
+        with mock.patch('core.utils.feed_cache.time.monotonic', return_value=100):
+            backend.set('a', 1)
+        with mock.patch('core.utils.feed_cache.time.monotonic', return_value=111):
+            self.assertEqual(len(backend), 1)
+            backend.get('a')
+        self.assertEqual(len(backend), 0)
+
+    def test_counters(self):
+        cache = FeedCache(LocalLRUBackend(max_entries=4, timeout=60))
+        compute = mock.Mock(return_value=['page'])
+        cache.get_or_set(None, None, compute)
+        cache.get_or_set(None, None, compute)
+        cache.invalidate()
+        cache.get_or_set(None, None, compute)
+        self.assertEqual(compute.call_count, 2)
+        self.assertEqual(cache.stats(), {'hits': 1, 'misses': 2, 'entries': 1})
+
+
+class FeedCacheViewTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='user1', email='user1@email.com', password='pass1234')
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('listposts')
+        get_feed_cache().invalidate()
+
+    def _assert_write_invalidates(self, write):
+        self.client.get(self.url)
+        # Only the conditional GET validator query is left on a cache hit
+        with self.assertNumQueries(1):
+            self.client.get(self.url)
+        write()
+        response = self.client.get(self.url)
+        return response
+
+    def test_create_invalidates(self):
+        response = self._assert_write_invalidates(
+            lambda: self.client.post(reverse('createpost'), {'title': 'New', 'content': 'Body'})
+        )
+        self.assertEqual([post['title'] for post in response.data], ['New'])
+
+    def test_patch_invalidates(self):
+        post = Post.objects.create(author=self.user, username='user1', title='Old', content='Old content')
+        response = self._assert_write_invalidates(
+            lambda: self.client.patch(reverse('editpost', args=[post.id]), {'title': 'Edited'}, format='json')
+        )
+        self.assertEqual(response.data[0]['title'], 'Edited')
+
+    def test_delete_invalidates(self):
+        post = Post.objects.create(author=self.user, username='user1', title='Old', content='Old content')
+        response = self._assert_write_invalidates(
+            lambda: self.client.delete(reverse('deletepost', args=[post.id]))
+        )
+        self.assertEqual(response.data, [])
+
+    def test_pages_are_cached_per_cursor(self):
+        for i in range(3):
+            Post.objects.create(author=self.user, username='user1', title=f'Post{i}', content='Body')
+        first = self.client.get(self.url, {'page_size': 2})
+        second = self.client.get(first.data['next'])
+        with self.assertNumQueries(2):
+            self.assertEqual(self.client.get(self.url, {'page_size': 2}).data, first.data)
+            self.assertEqual(self.client.get(first.data['next']).data, second.data)
+
+    @override_settings(
+        CACHES={'shared': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'feed-tests'}},
+        POSTS_FEED_CACHE={'BACKEND': 'django', 'ALIAS': 'shared', 'TIMEOUT': 60},
+    )
+    def test_django_cache_backend(self):
+        self.client.get(self.url)
+        self.client.get(self.url)
+        self.client.post(reverse('createpost'), {'title': 'New', 'content': 'Body'})
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 1)
+        self.assertEqual(get_feed_cache().stats()['hits'], 1)
+        self.assertEqual(get_feed_cache().stats()['misses'], 2)
+
+    def test_write_in_another_worker_is_not_served_stale(self):
+        # This process' cache never sees the invalidation of the worker that wrote
+        worker = FeedCache(LocalLRUBackend(max_entries=4, timeout=60))
+        # The async view only accepts bearer tokens
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.user).access_token}')
+        Post.objects.create(author=self.user, username='user1', title='Old', content='Body')
+        for view in ('core.views.views', 'core.views.async_views'):
+            with self.subTest(view=view), mock.patch(f'{view}.get_feed_cache', return_value=worker):
+                url = self.url if view.endswith('.views') else reverse('async_listposts')
+                etag = self.client.get(url)['ETag']
+                Post.objects.create(author=self.user, username='user1', title=f'New {view}', content='Body')
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertNotEqual(response['ETag'], etag)
+                self.assertEqual(response.json()[0]['title'], f'New {view}')
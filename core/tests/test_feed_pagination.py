@@ -0,0 +1,71 @@
+from django.urls import reverse
+from django.utils import timezone
+from django.test import override_settings
+from rest_framework.test import APITestCase
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from ..models.post import Post
+from ..utils.feed_cache import get_feed_cache
+
+User = get_user_model()
+
+
+class FeedPaginationTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='user1', email='user1@email.com', password='pass1234')
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('listposts')
+        for i in range(7):
+            Post.objects.create(author=self.user, username='user1', title=f'Post{i}', content=f'Content{i}')
+        # Same timestamp for every row so the id tie-breaker is exercised
+        Post.objects.update(created_at=timezone.now())
+        get_feed_cache().invalidate()
+        self.expected = list(Post.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+
+    def _ids(self, response):
+        return [post['id'] for post in response.data['results']]
+
+    def test_no_cursor_keeps_legacy_list(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsInstance(response.data, list)
+        self.assertEqual([post['id'] for post in response.data], self.expected)
+
+    @override_settings(POSTS_FEED_LEGACY_RESPONSE=False)
+    def test_legacy_flag_off_paginates_by_default(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('results', response.data)
+
+    def test_walk_forward_and_back(self):
+        response = self.client.get(self.url, {'page_size': 3})
+        self.assertEqual(self._ids(response), self.expected[:3])
+        self.assertIsNone(response.data['previous'])
+
+        response = self.client.get(response.data['next'])
+        self.assertEqual(self._ids(response), self.expected[3:6])
+
+        last = self.client.get(response.data['next'])
+        self.assertEqual(self._ids(last), self.expected[6:])
+        self.assertIsNone(last.data['next'])
+
+        response = self.client.get(response.data['previous'])
+        self.assertEqual(self._ids(response), self.expected[:3])
+        self.assertIsNone(response.data['previous'])
+
+    @override_settings(POSTS_MAX_PAGE_SIZE=5)
+    def test_page_size_is_bounded(self):
+        response = self.client.get(self.url, {'page_size': 1000})
+        self.assertEqual(len(response.data['results']), 5)
+
+    def test_invalid_cursor(self):
+        response = self.client.get(self.url, {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_query_has_no_offset(self):
+        first = self.client.get(self.url, {'page_size': 2})
+        with self.assertNumQueries(2) as ctx:
+            self.client.get(first.data['next'])
+        sql = ctx.captured_queries[-1]['sql'].upper()
+        self.assertNotIn('OFFSET', sql)
+        self.assertIn('LIMIT 3', sql)
@@ -0,0 +1,180 @@
+import datetime
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.x509.oid import NameOID
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from google.auth import crypt, jwt
+from rest_framework import status
+from rest_framework.test import APITestCase
+from django.contrib.auth import get_user_model
+from ..utils.google_certs import GoogleCertsCache
+
+User = get_user_model()
+
+CLIENT_ID = 'test-client.apps.googleusercontent.com'
+
+
+def make_key_pair():
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, 'stub')])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder().subject_name(name).issuer_name(name)
+        .public_key(key.public_key()).serial_number(1)
+        .not_valid_before(now - datetime.timedelta(days=1))
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .sign(key, hashes.SHA256())
+    )
+    private_pem = key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption(),
+    )
+    return private_pem, cert.public_bytes(serialization.Encoding.PEM).decode()
+
+
+class StubCertsServer:
+    """Serves a Google-style certs document and counts how often it is fetched"""
+
+    def __init__(self, certs, max_age=3600, delay=0.0):
+        self.certs = certs
+        self.max_age = max_age
+        self.delay = delay
+        self.hits = 0
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stub.hits += 1
+                time.sleep(stub.delay)
+                body = json.dumps(stub.certs).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Cache-Control', f'public, max-age={stub.max_age}, must-revalidate')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.server.server_port}/oauth2/v1/certs'
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def make_token(private_pem, key_id, **claims):
+    now = int(time.time())
+    payload = {
+        'iss': 'https://accounts.google.com', 'aud': CLIENT_ID, 'iat': now, 'exp': now + 3600,
+        'email': 'google.user@example.com', 'given_name': 'Google', 'family_name': 'User',
+        **claims,
+    }
+    return jwt.encode(crypt.RSASigner.from_string(private_pem, key_id), payload).decode()
+
+
+class GoogleCertsCacheTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.private_pem, cls.cert_pem = make_key_pair()
+
+    def test_warm_verifications_do_not_fetch(self):
+        with StubCertsServer({'kid1': self.cert_pem}) as stub:
+            certs = GoogleCertsCache(url=stub.url)
+            for _ in range(5):
+                idinfo = certs.verify_oauth2_token(make_token(self.private_pem, 'kid1'), CLIENT_ID)
+            self.assertEqual(idinfo['email'], 'google.user@example.com')
+            self.assertEqual(stub.hits, 1)
+
+    def test_concurrent_cold_refreshes_are_coalesced(self):
+        with StubCertsServer({'kid1': self.cert_pem}, delay=0.2) as stub:
+            certs = GoogleCertsCache(url=stub.url)
+            threads = [threading.Thread(target=certs.get_certs) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertEqual(stub.hits, 1)
+
+    def test_honors_max_age(self):
+        with StubCertsServer({'kid1': self.cert_pem}, max_age=600) as stub:
+            certs = GoogleCertsCache(url=stub.url, refresh_margin=0)
+            certs.get_certs()
+            now = time.monotonic()
+            with mock.patch('core.utils.google_certs.time.monotonic', return_value=now + 599):
+                certs.get_certs()
+            self.assertEqual(stub.hits, 1)
+            with mock.patch('core.utils.google_certs.time.monotonic', return_value=now + 601):
+                certs.get_certs()
+            self.assertEqual(stub.hits, 2)
+
+    def test_refreshes_in_background_before_expiry(self):
+        with StubCertsServer({'kid1': self.cert_pem}, max_age=600) as stub:
+            certs = GoogleCertsCache(url=stub.url, refresh_margin=100)
+            certs.get_certs()
+            with mock.patch('core.utils.google_certs.time.monotonic', return_value=time.monotonic() + 550):
+                self.assertIsNotNone(certs.get_certs())
+            deadline = time.monotonic() + 5
+            while stub.hits < 2 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            self.assertEqual(stub.hits, 2)
+
+    def test_unknown_key_id_forces_one_refresh(self):
+        other_private_pem, other_cert_pem = make_key_pair()
+        with StubCertsServer({'kid1': self.cert_pem}) as stub:
+            certs = GoogleCertsCache(url=stub.url, min_forced_refresh_interval=0)
+            certs.get_certs()
+            stub.certs = {'kid1': self.cert_pem, 'kid2': other_cert_pem}
+            idinfo = certs.verify_oauth2_token(make_token(other_private_pem, 'kid2'), CLIENT_ID)
+            self.assertEqual(idinfo['aud'], CLIENT_ID)
+            self.assertEqual(stub.hits, 2)
+
+    def test_rejects_wrong_issuer_and_audience(self):
+        with StubCertsServer({'kid1': self.cert_pem}) as stub:
+            certs = GoogleCertsCache(url=stub.url)
+            with self.assertRaises(ValueError):
+                certs.verify_oauth2_token(make_token(self.private_pem, 'kid1', iss='evil.example.com'), CLIENT_ID)
+            with self.assertRaises(ValueError):
+                certs.verify_oauth2_token(make_token(self.private_pem, 'kid1'), 'another-client')
+
+
+class GoogleLoginJWTTests(APITestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.private_pem, cls.cert_pem = make_key_pair()
+
+    def test_warm_logins_make_no_outbound_calls(self):
+        with StubCertsServer({'kid1': self.cert_pem}) as stub, \
+                override_settings(GOOGLE_CERTS_URL=stub.url), \
+                mock.patch.dict(os.environ, {'GOOGLE_CLIENT_ID': CLIENT_ID}):
+            for _ in range(3):
+                response = self.client.post(
+                    reverse('google_login'), {'token': make_token(self.private_pem, 'kid1')}, format='json',
+                )
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(stub.hits, 1)
+        self.assertEqual(response.data['user']['email'], 'google.user@example.com')
+        self.assertTrue(User.objects.filter(email='google.user@example.com').exists())
+
+    def test_invalid_token(self):
+        with StubCertsServer({'kid1': self.cert_pem}) as stub, \
+                override_settings(GOOGLE_CERTS_URL=stub.url), \
+                mock.patch.dict(os.environ, {'GOOGLE_CLIENT_ID': CLIENT_ID}):
+            response = self.client.post(reverse('google_login'), {'token': 'not-a-jwt'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
@@ -0,0 +1,127 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+from ..models.post import Post
+from ..utils.feed_cache import get_feed_cache
+from ..utils.jwt_auth import ActiveUserCache, UserRefreshToken, get_active_user_cache
+
+User = get_user_model()
+
+
+class TokenUserAuthenticationTests(APITestCase):
+    def setUp(self):
+        get_feed_cache().invalidate()
+        get_active_user_cache().invalidate()
+        self.user = User.objects.create_user(
+            username='user1', email='user1@email.com', password='pass1234', first_name='Ana', last_name='Lima',
+        )
+        Post.objects.create(author=self.user, username='user1', title='Post', content='Content')
+        self._authorize(UserRefreshToken.for_user(self.user).access_token)
+
+    def _authorize(self, token):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def _auth_queries(self, method, url, **kwargs):
+        with CaptureQueriesContext(connection) as queries:
+            response = getattr(self.client, method)(url, **kwargs)
+        return response, [query['sql'] for query in queries if 'auth_user' in query['sql']]
+
+    def test_issued_tokens_carry_the_username(self):
+        response = self.client.post(reverse('register'), {
+            'username': 'newuser', 'email': 'new@example.com', 'password': 'pass5678',
+        })
+        self.assertEqual(AccessToken(response.data['access'])['username'], 'newuser')
+
+        response = self.client.post(reverse('login'), {'email': 'new@example.com', 'password': 'pass5678'})
+        self.assertEqual(AccessToken(response.data['access'])['username'], 'newuser')
+
+    def test_feed_reads_make_no_auth_queries(self):
+        self.client.get(reverse('listposts'))
+        response, auth_queries = self._auth_queries('get', reverse('listposts'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(auth_queries, [])
+
+    def test_writes_load_the_author_once(self):
+        response, auth_queries = self._auth_queries(
+            'post', reverse('createpost'), data={'title': 'New', 'content': 'Body'}, format='json',
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['author']['first_name'], 'Ana')
+        self.assertEqual(Post.objects.get(id=response.data['id']).author, self.user)
+
+        post_id = response.data['id']
+        response, auth_queries = self._auth_queries(
+            'patch', reverse('editpost', args=[post_id]), data={'title': 'Edited'}, format='json',
+        )
+        self.assertEqual(response.data['author']['last_name'], 'Lima')
+        self.assertEqual(len(auth_queries), 1)
+
+        response, auth_queries = self._auth_queries('delete', reverse('deletepost', args=[post_id]))
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(auth_queries, [])
+
+    def test_deactivated_user_is_rejected(self):
+        self.assertEqual(self.client.get(reverse('listposts')).status_code, status.HTTP_200_OK)
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get(reverse('listposts')).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deleted_user_is_rejected(self):
+        self.user.delete()
+        self.assertEqual(self.client.get(reverse('listposts')).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_tokens_without_username_still_work(self):
+        self._authorize(RefreshToken.for_user(self.user).access_token)
+        self.assertEqual(self.client.get(reverse('listposts')).status_code, status.HTTP_200_OK)
+
+    def test_staff_flag_comes_from_the_database(self):
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, status.HTTP_403_FORBIDDEN)
+        User.objects.filter(id=self.user.id).update(is_staff=True)
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, status.HTTP_200_OK)
+
+
+class AsyncTokenUserTests(TestCase):
+    def setUp(self):
+        get_feed_cache().invalidate()
+        get_active_user_cache().invalidate()
+        self.user = User.objects.create_user(username='user1', password='pass1234', first_name='Ana')
+        token = UserRefreshToken.for_user(self.user).access_token
+        self.headers = {'Authorization': f'Bearer {token}'}
+
+    async def test_create_and_reject_inactive(self):
+        response = await self.async_client.post(
+            reverse('async_listposts'), {'title': 'Async', 'content': 'Body'},
+            content_type='application/json', headers=self.headers,
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.json()['author']['first_name'], 'Ana')
+
+        self.user.is_active = False
+        await self.user.asave()
+        response = await self.async_client.get(reverse('async_listposts'), headers=self.headers)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class ActiveUserCacheTests(TestCase):
+    def test_caches_until_invalidated(self):
+        user = User.objects.create_user(username='user1', password='pass1234')
+        cache = ActiveUserCache(timeout=60, max_entries=10)
+        self.assertTrue(cache.is_active(user.id))
+        User.objects.filter(id=user.id).update(is_active=False)
+        with self.assertNumQueries(0):
+            self.assertTrue(cache.is_active(user.id))
+        cache.invalidate(user.id)
+        self.assertFalse(cache.is_active(user.id))
+        self.assertIsNone(cache.is_active(user.id + 1))
+
+    def test_expired_entries_are_reloaded(self):
+        user = User.objects.create_user(username='user1', password='pass1234')
+        cache = ActiveUserCache(timeout=0, max_entries=10)
+        cache.is_active(user.id)
+        with self.assertNumQueries(1):
+            cache.is_active(user.id)
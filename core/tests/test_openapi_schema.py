@@ -0,0 +1,55 @@
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import Client, SimpleTestCase, override_settings
+from django.urls import reverse
+
+from ..utils import openapi
+
+
+class OpenAPISchemaTests(SimpleTestCase):
+    def setUp(self):
+        self.static_root = tempfile.TemporaryDirectory()
+        self.addCleanup(self.static_root.cleanup)
+
+    def test_generate_schema_writes_hashed_artifacts(self):
+        call_command('generate_schema', '--output-dir', self.static_root.name, stdout=StringIO())
+        directory = os.path.join(self.static_root.name, 'openapi')
+        with open(os.path.join(directory, 'manifest.json')) as manifest:
+            paths = json.load(manifest)
+        self.assertRegex(paths['json'], r'^openapi/schema\.[0-9a-f]{12}\.json$')
+        with open(os.path.join(self.static_root.name, paths['json']), 'rb') as schema:
+            document = schema.read()
+        self.assertIn('/createpost/', json.loads(document)['paths'])
+        # Precompressed for WhiteNoise, plus a stable alias for tools
+        for name in (f"{paths['json']}.gz", 'openapi/schema.json', paths['yaml']):
+            self.assertTrue(os.path.exists(os.path.join(self.static_root.name, name)), name)
+
+    def test_docs_use_the_static_schema(self):
+        call_command('generate_schema', '--output-dir', self.static_root.name, stdout=StringIO())
+        with override_settings(STATIC_ROOT=self.static_root.name):
+            # A new client loads WhiteNoise, which scans STATIC_ROOT when it starts
+            client = Client()
+            url = openapi.schema_url()
+            self.assertRegex(url, r'^/static/openapi/schema\.[0-9a-f]{12}\.json$')
+            for page in ('schema-swagger-ui', 'schema-redoc'):
+                self.assertContains(client.get(reverse(page)), url)
+            response = client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertIn('immutable', response['Cache-Control'])
+
+    def test_fallback_is_built_once_per_process(self):
+        with override_settings(STATIC_ROOT=self.static_root.name), \
+                mock.patch.object(openapi, 'build_schema', wraps=openapi.build_schema) as build:
+            self.assertEqual(openapi.schema_url(), reverse('openapi_schema'))
+            self.assertContains(self.client.get(reverse('schema-swagger-ui')), reverse('openapi_schema'))
+            response = self.client.get(reverse('openapi_schema'))
+            self.assertIn('/createpost/', response.json()['paths'])
+            response = self.client.get(reverse('openapi_schema'), HTTP_IF_NONE_MATCH=response['ETag'])
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(self.client.get(reverse('openapi_schema_yaml'))['Content-Type'], 'application/yaml')
+            self.assertEqual(build.call_count, 2)
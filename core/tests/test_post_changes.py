@@ -0,0 +1,129 @@
+import datetime
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from ..models.post import Post
+from ..models.purge import PostPurge
+from ..utils.feed_cache import get_feed_cache
+from ..utils.jwt_auth import UserRefreshToken
+
+User = get_user_model()
+
+
+class PostChangesTests(APITestCase):
+    def setUp(self):
+        get_feed_cache().invalidate()
+        self.user = User.objects.create_user(username='user1', password='pass1234')
+        self.client.force_authenticate(user=self.user)
+
+    def _changes(self, since=0, **params):
+        return self.client.get(reverse('post_changes'), {'since': since, **params})
+
+    def _create(self, title):
+        return self.client.post(reverse('createpost'), {'title': title, 'content': 'Content'}).data['id']
+
+    def test_created_edited_and_deleted_since(self):
+        first, second, third = (self._create(title) for title in ('a', 'b', 'c'))
+        response = self._changes()
+        self.assertEqual([post['id'] for post in response.data['results']], [first, second, third])
+        self.assertFalse(response.data['has_more'])
+        until = response.data['until']
+
+        self.assertEqual(self._changes(until).data['results'], [])
+
+        self.client.patch(reverse('editpost', args=[second]), {'title': 'b2'}, format='json')
+        self.client.delete(reverse('deletepost', args=[first]))
+        response = self._changes(until)
+        edited, deleted = response.data['results']
+        self.assertEqual((edited['id'], edited['title'], edited['deleted']), (second, 'b2', False))
+        self.assertEqual(set(deleted), {'id', 'deleted', 'deleted_at', 'change_seq'})
+        self.assertEqual((deleted['id'], deleted['deleted']), (first, True))
+        self.assertGreater(deleted['change_seq'], edited['change_seq'])
+        self.assertEqual(response.data['until'], deleted['change_seq'])
+
+        # Tombstones are gone from every other read
+        self.assertEqual([post['id'] for post in self.client.get(reverse('listposts')).data], [third, second])
+        self.assertEqual(self.client.delete(reverse('deletepost', args=[first])).status_code,
+                         status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.client.get(reverse('search_posts'), {'q': 'a'}).data['results'], [])
+
+    def test_pages_never_split_a_bulk_write(self):
+        self._create('single')
+        self.client.post(reverse('bulk_posts'), [{'title': f'p{i}', 'content': 'c'} for i in range(3)], format='json')
+        self._create('last')
+
+        response = self._changes(limit=2)
+        self.assertEqual(len(response.data['results']), 4)
+        self.assertTrue(response.data['has_more'])
+        response = self._changes(response.data['until'], limit=2)
+        self.assertEqual([post['title'] for post in response.data['results']], ['last'])
+        self.assertFalse(response.data['has_more'])
+
+    def test_bulk_delete_leaves_tombstones(self):
+        ids = [self._create(title) for title in ('a', 'b')]
+        until = self._changes().data['until']
+        response = self.client.delete(reverse('bulk_posts'), {'ids': ids}, format='json')
+        self.assertEqual(response.data['deleted'], 2)
+        self.assertEqual([post['deleted'] for post in self._changes(until).data['results']], [True, True])
+
+    def test_purge_expires_older_cursors(self):
+        kept, purged = self._create('kept'), self._create('purged')
+        before_delete = self._changes().data['until']
+        self.client.delete(reverse('deletepost', args=[purged]))
+        after_delete = self._changes().data['until']
+        Post.all_objects.filter(id=purged).update(deleted_at=timezone.now() - datetime.timedelta(days=31))
+
+        call_command('purge_tombstones', '--dry-run', stdout=StringIO())
+        self.assertTrue(Post.all_objects.filter(id=purged).exists())
+        call_command('purge_tombstones', stdout=StringIO())
+        self.assertFalse(Post.all_objects.filter(id=purged).exists())
+        self.assertEqual(PostPurge.objects.get().through_seq, after_delete)
+
+        response = self._changes(before_delete)
+        self.assertEqual(response.status_code, status.HTTP_410_GONE)
+        self.assertEqual(response.data['horizon'], after_delete)
+        self.assertEqual(self._changes(after_delete).status_code, status.HTTP_200_OK)
+        response = self._changes(0)
+        self.assertEqual([post['id'] for post in response.data['results']], [kept])
+        self.assertEqual(response.data['until'], after_delete)
+        # The sequence never goes back below what was purged
+        self.assertGreater(Post.objects.get(id=self._create('new')).change_seq, after_delete)
+
+    def test_deleted_user_leaves_tombstones(self):
+        earlier = self._create('gone')
+        self.client.delete(reverse('deletepost', args=[earlier]))
+        post_id = self._create('mine')
+        until = self._changes().data['until']
+        User.objects.filter(pk=self.user.pk).delete()
+
+        other = User.objects.create_user(username='user2', password='pass1234')
+        self.client.force_authenticate(user=other)
+        tombstone, = self._changes(until).data['results']
+        self.assertEqual((tombstone['id'], tombstone['deleted']), (post_id, True))
+        # Tombstones from before the user was deleted survive too, detached
+        self.assertEqual(
+            sorted(Post.all_objects.filter(author=None).values_list('id', flat=True)), [earlier, post_id],
+        )
+
+    def test_invalid_params(self):
+        for params in ({'since': -1}, {'since': 'x'}, {'limit': 0}):
+            self.assertEqual(self.client.get(reverse('post_changes'), params).status_code,
+                             status.HTTP_400_BAD_REQUEST)
+
+
+class AsyncDeleteTests(TestCase):
+    async def test_async_delete_is_soft(self):
+        user = await User.objects.acreate(username='user1')
+        post = await Post.objects.acreate(author=user, username='user1', title='Post', content='c')
+        headers = {'Authorization': f'Bearer {UserRefreshToken.for_user(user).access_token}'}
+        response = await self.async_client.delete(reverse('async_deletepost', args=[post.id]), headers=headers)
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        tombstone = await Post.all_objects.aget(id=post.id)
+        self.assertIsNotNone(tombstone.deleted_at)
+        self.assertGreater(tombstone.change_seq, post.change_seq)
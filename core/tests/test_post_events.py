@@ -0,0 +1,129 @@
+import asyncio
+import json
+
+from asgiref.sync import sync_to_async
+
+from django.urls import reverse
+from django.test import SimpleTestCase, TestCase
+from rest_framework.test import APITestCase
+from django.contrib.auth import get_user_model
+from rest_framework_simplejwt.tokens import RefreshToken
+from ..models.post import Post
+from ..utils.post_events import (
+    POST_CREATED, POST_DELETED, POST_UPDATED, STREAM_RESET, DatabaseHub, InProcessHub, get_event_hub,
+)
+
+User = get_user_model()
+
+
+async def take(events, count):
+    return [await asyncio.wait_for(events.__anext__(), timeout=2) for _ in range(count)]
+
+
+class InProcessHubTests(SimpleTestCase):
+    def test_live_fan_out(self):
+        async def scenario():
+            hub = InProcessHub()
+            first, second = hub.subscribe(), hub.subscribe()
+            pending = [asyncio.ensure_future(take(stream, 1)) for stream in (first, second)]
+            # Let both streams start and register before publishing
+            await asyncio.sleep(0.05)
+            # Publishers are sync views running in worker threads
+            await asyncio.get_running_loop().run_in_executor(None, hub.publish, POST_CREATED, {'id': 1})
+            results = await asyncio.gather(*pending)
+            await first.aclose()
+            await second.aclose()
+            return results
+        results = asyncio.run(scenario())
+        self.assertEqual([events[0].type for events in results], [POST_CREATED, POST_CREATED])
+
+    def test_resume_from_last_event_id(self):
+        async def scenario():
+            hub = InProcessHub()
+            for i in range(1, 4):
+                hub.publish(POST_UPDATED, {'id': i})
+            stream = hub.subscribe(last_event_id=1)
+            events = await take(stream, 2)
+            await stream.aclose()
+            return events
+        events = asyncio.run(scenario())
+        self.assertEqual([event.id for event in events], [2, 3])
+        self.assertEqual(json.loads(events[0].data), {'id': 2})
+
+    def test_gap_sends_reset(self):
+        async def scenario():
+            hub = InProcessHub(buffer_size=2)
+            for i in range(5):
+                hub.publish(POST_DELETED, {'id': i})
+            stream = hub.subscribe(last_event_id=1)
+            events = await take(stream, 1)
+            await stream.aclose()
+            return events
+        self.assertEqual(asyncio.run(scenario())[0].type, STREAM_RESET)
+
+
+class DatabaseHubTests(TestCase):
+    async def test_resume_across_hub_instances(self):
+        publisher, subscriber = DatabaseHub(poll_interval=0.01), DatabaseHub(poll_interval=0.01)
+        first = await self._publish(publisher, {'id': 1})
+        await self._publish(publisher, {'id': 2})
+        stream = subscriber.subscribe(last_event_id=first.id)
+        events = await take(stream, 1)
+        await stream.aclose()
+        self.assertEqual(json.loads(events[0].data), {'id': 2})
+
+    async def _publish(self, hub, data):
+        return await sync_to_async(hub.publish)(POST_CREATED, data)
+
+
+class PostEventsEndpointTests(APITestCase):
+    def setUp(self):
+        # A fresh hub per test so event ids start from 1
+        overrides = self.settings(
+            POSTS_EVENT_HUB={'BACKEND': 'core.utils.post_events.InProcessHub'},
+            POSTS_EVENT_HEARTBEAT_SECONDS=1,
+        )
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        self.user = User.objects.create_user(username='user1', email='user1@email.com', password='pass1234')
+        self.token = str(RefreshToken.for_user(self.user).access_token)
+        self.client.force_authenticate(user=self.user)
+
+    def test_writes_publish_events(self):
+        created = self.client.post(reverse('createpost'), {'title': 'New', 'content': 'Body'})
+        post_id = created.data['id']
+        self.client.patch(reverse('editpost', args=[post_id]), {'title': 'Edited'}, format='json')
+        self.client.delete(reverse('deletepost', args=[post_id]))
+
+        async def scenario():
+            stream = get_event_hub().subscribe(last_event_id=0)
+            events = await take(stream, 3)
+            await stream.aclose()
+            return events
+        events = asyncio.run(scenario())
+        self.assertEqual([event.type for event in events], [POST_CREATED, POST_UPDATED, POST_DELETED])
+        self.assertEqual(json.loads(events[1].data)['title'], 'Edited')
+        self.assertEqual(json.loads(events[2].data), {'id': post_id})
+
+    def test_requires_token(self):
+        response = self.client_class().get(reverse('post_events'))
+        self.assertEqual(response.status_code, 401)
+
+    def test_requires_asgi(self):
+        response = self.client_class().get(reverse('post_events'), {'token': self.token})
+        self.assertEqual(response.status_code, 501)
+
+    async def test_sse_stream_resumes(self):
+        hub = get_event_hub()
+        await asyncio.to_thread(hub.publish, POST_CREATED, {'id': 1})
+        await asyncio.to_thread(hub.publish, POST_CREATED, {'id': 2})
+        response = await self.async_client.get(
+            reverse('post_events'), {'token': self.token}, headers={'Last-Event-ID': '1'},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        chunks = response.streaming_content
+        self.assertTrue((await chunks.__anext__()).startswith(b'retry:'))
+        chunk = (await chunks.__anext__()).decode()
+        self.assertIn('id: 2\nevent: post.created\n', chunk)
+        await chunks.aclose()
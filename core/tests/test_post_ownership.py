@@ -0,0 +1,67 @@
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from ..models.post import Post
+from ..utils.feed_cache import get_feed_cache
+
+User = get_user_model()
+
+
+class PostOwnershipTests(APITestCase):
+    def setUp(self):
+        get_feed_cache().invalidate()
+        self.user = User.objects.create_user(username='user1', password='pass1234', first_name='Ana')
+        self.other = User.objects.create_user(username='user2', password='pass5678')
+        self.client.force_authenticate(user=self.user)
+
+    def test_edit_is_one_query(self):
+        post = Post.objects.create(author=self.user, username='user1', title='Old', content='Old content')
+        with self.assertNumQueries(1):
+            response = self.client.patch(reverse('editpost', args=[post.id]), {'title': 'New'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['title'], 'New')
+        self.assertEqual(response.data['content'], 'Old content')
+        self.assertEqual(response.data['author']['first_name'], 'Ana')
+        post.refresh_from_db()
+        self.assertEqual(post.title, 'New')
+        self.assertGreater(post.updated_at, post.created_at)
+
+    def test_delete_is_one_query(self):
+        post = Post.objects.create(author=self.user, username='user1', title='Bye', content='x')
+        with self.assertNumQueries(1):
+            response = self.client.delete(reverse('deletepost', args=[post.id]))
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(Post.objects.exists())
+
+    def test_foreign_and_missing_posts(self):
+        post = Post.objects.create(author=self.other, username='user2', title='Theirs', content='x')
+        response = self.client.patch(reverse('editpost', args=[post.id]), {'title': 'Mine'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        response = self.client.delete(reverse('deletepost', args=[post.id]))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        response = self.client.delete(reverse('deletepost', args=[999999]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        post.refresh_from_db()
+        self.assertEqual(post.title, 'Theirs')
+
+    def test_matching_username_alone_does_not_grant_ownership(self):
+        post = Post.objects.create(username='user1', title='Legacy', content='x')
+        response = self.client.delete(reverse('deletepost', args=[post.id]))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_feed_joins_authors_in_one_query(self):
+        for i in range(10):
+            author = self.user if i % 2 else self.other
+            Post.objects.create(author=author, username=author.username, title=f'Post{i}', content='Body')
+        # Validators plus the feed query itself, however many authors there are
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('listposts'))
+        self.assertEqual(response.data[0]['author']['username'], 'user1')
+        self.assertEqual(response.data[1]['author']['id'], self.other.id)
+
+    def test_create_sets_author(self):
+        response = self.client.post(reverse('createpost'), {'title': 'T', 'content': 'C'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Post.objects.get().author, self.user)
+        self.assertEqual(response.data['author']['id'], self.user.id)
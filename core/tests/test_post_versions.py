@@ -0,0 +1,208 @@
+import shutil
+import tempfile
+import threading
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import connections
+from django.db.models import F
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from ..models.post import Post
+from ..utils.conditional import expected_versions
+from ..utils.feed_cache import get_feed_cache
+from ..utils.jwt_auth import UserRefreshToken
+
+User = get_user_model()
+
+
+class PostVersionTests(APITestCase):
+    def setUp(self):
+        get_feed_cache().invalidate()
+        self.user = User.objects.create_user(username='user1', password='pass1234')
+        self.client.force_authenticate(user=self.user)
+        self.post = Post.objects.create(author=self.user, username='user1', title='Post', content='v1')
+        self.url = reverse('editpost', args=[self.post.id])
+
+    def _patch(self, data, **headers):
+        return self.client.patch(self.url, data, format='json', headers=headers)
+
+    def test_edits_bump_the_version(self):
+        self.assertEqual(self.client.get(reverse('listposts')).data[0]['version'], 1)
+        with self.assertNumQueries(1):
+            response = self._patch({'content': 'v2'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['version'], 2)
+        self.assertEqual(response['ETag'], '"v2"')
+
+    def test_if_match(self):
+        response = self._patch({'content': 'v2'}, **{'If-Match': '"v1"'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response = self._patch({'content': 'lost'}, **{'If-Match': '"v1"'})
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        self.assertEqual(response.data['version'], 2)
+        self.assertEqual(response['ETag'], '"v2"')
+        self.assertEqual(Post.objects.get(id=self.post.id).content, 'v2')
+
+        # ETags weakened by the compression middleware and '*' are accepted
+        self.assertEqual(self._patch({'content': 'v3'}, **{'If-Match': 'W/"v2"'}).status_code, status.HTTP_200_OK)
+        self.assertEqual(self._patch({'content': 'v4'}, **{'If-Match': '*'}).status_code, status.HTTP_200_OK)
+        self.assertEqual(self._patch({'content': 'x'}, **{'If-Match': '"garbage"'}).status_code,
+                         status.HTTP_412_PRECONDITION_FAILED)
+
+    def test_version_in_body(self):
+        self.assertEqual(self._patch({'content': 'v2', 'version': 1}).status_code, status.HTTP_200_OK)
+        self.assertEqual(self._patch({'content': 'lost', 'version': 1}).status_code,
+                         status.HTTP_412_PRECONDITION_FAILED)
+        response = self._patch({'content': 'x', 'version': 'abc'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('version', response.data)
+
+    def test_ownership_is_checked_before_the_version(self):
+        other = User.objects.create_user(username='user2', password='pass1234')
+        self.client.force_authenticate(user=other)
+        self.assertEqual(self._patch({'content': 'x'}, **{'If-Match': '"v9"'}).status_code, status.HTTP_403_FORBIDDEN)
+        response = self.client.patch(reverse('editpost', args=[999]), {'content': 'x'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_fallback_without_returning_keeps_the_conditions(self):
+        with mock.patch('core.models.post.can_update_returning', return_value=False):
+            self.assertEqual(self._patch({'content': 'lost', 'version': 2}).status_code, status.HTTP_412_PRECONDITION_FAILED)
+            response = self._patch({'content': 'v2', 'version': 1})
+            self.assertEqual((response.status_code, response.data['version']), (status.HTTP_200_OK, 2))
+            self.assertEqual(response.data['content'], 'v2')
+            self.client.force_authenticate(user=User.objects.create_user(username='user2', password='pass1234'))
+            self.assertEqual(self._patch({'content': 'x'}).status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(Post.objects.get(id=self.post.id).content, 'v2')
+
+    def test_editors_sharing_a_stale_version_lose_no_updates(self):
+        """
+        Editors that read the same version take turns submitting against
+        it: exactly one wins, the others get 412 and retry on the version
+        it returns. Every append survives. ConcurrentEditTests runs the
+        same race from real threads.
+        """
+        editors = [f'e{index}' for index in range(8)]
+        pending = {editor: 1 for editor in editors}
+        content = {editor: 'v1' for editor in editors}
+        rounds = 0
+        while pending:
+            rounds += 1
+            winners = 0
+            # Everyone submits against what they last saw, in turn, before re-reading
+            for editor, version in list(pending.items()):
+                response = self._patch({'content': f'{content[editor]} {editor}', 'version': version})
+                if response.status_code == status.HTTP_200_OK:
+                    winners += 1
+                    del pending[editor]
+                else:
+                    self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+            self.assertEqual(winners, 1)
+            current = Post.objects.get(id=self.post.id)
+            for editor in pending:
+                pending[editor], content[editor] = current.version, current.content
+        post = Post.objects.get(id=self.post.id)
+        self.assertEqual(post.version, len(editors) + 1)
+        self.assertEqual(sorted(post.content.split()[1:]), editors)
+        self.assertEqual(rounds, len(editors))
+
+
+class ConcurrentEditTests(SimpleTestCase):
+    """
+    Editors racing from real threads, each on its own connection. SQLite's
+    shared-cache in-memory test database fails concurrent writers outright
+    instead of making them wait, so they share a temporary database file.
+    """
+
+    databases = '__all__'
+    alias = 'test_concurrent_edits'
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.mkdtemp()
+        connections.settings[cls.alias] = {
+            **connections['default'].settings_dict, 'NAME': f'{cls.tmp}/edits.sqlite3',
+        }
+        call_command('migrate', database=cls.alias, verbosity=0)
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections[cls.alias].close()
+        del connections[cls.alias]
+        del connections.settings[cls.alias]
+        shutil.rmtree(cls.tmp)
+
+    def setUp(self):
+        Post.all_objects.using(self.alias).all().delete()
+        User.objects.db_manager(self.alias).all().delete()
+
+    @override_settings(POSTS_PRIMARY_DATABASE=alias, POSTS_READ_DATABASES=[])
+    def test_threaded_editors_lose_no_updates(self):
+        user = User.objects.db_manager(self.alias).create_user(username='user1', password='pass1234')
+        post = Post.objects.using(self.alias).create(author=user, username='user1', title='Post', content='v1')
+        editors = [f'e{index}' for index in range(8)]
+        start = threading.Barrier(len(editors))
+        failures = []
+
+        def edit(name):
+            posts = Post.objects.using(self.alias)
+            try:
+                start.wait()
+                while True:
+                    current = posts.get(id=post.id)
+                    # The conditional write the edit views make
+                    updated = posts.filter(id=post.id, author_id=user.id, version=current.version).update_returning(
+                        content=f'{current.content} {name}', version=F('version') + 1,
+                    )
+                    if updated:
+                        return
+            except Exception as e:
+                failures.append(e)
+            finally:
+                connections[self.alias].close()
+
+        threads = [threading.Thread(target=edit, args=(name,)) for name in editors]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(failures, [])
+        post = Post.objects.using(self.alias).get(id=post.id)
+        self.assertEqual(post.version, len(editors) + 1)
+        self.assertEqual(sorted(post.content.split()[1:]), editors)
+
+
+class AsyncPostVersionTests(TestCase):
+    async def test_stale_if_match(self):
+        user = await User.objects.acreate(username='user1')
+        post = await Post.objects.acreate(author=user, username='user1', title='Post', content='v1')
+        headers = {'Authorization': f'Bearer {UserRefreshToken.for_user(user).access_token}'}
+        url = reverse('async_editpost', args=[post.id])
+        response = await self.async_client.patch(
+            url, {'content': 'v2'}, content_type='application/json', headers={**headers, 'If-Match': '"v1"'},
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['ETag'], '"v2"')
+        response = await self.async_client.patch(
+            url, {'content': 'lost'}, content_type='application/json', headers={**headers, 'If-Match': '"v1"'},
+        )
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        self.assertEqual(response.json()['version'], 2)
+
+
+class ExpectedVersionsTests(TestCase):
+    def test_parsing(self):
+        self.assertIsNone(expected_versions(None, None))
+        self.assertIsNone(expected_versions('*', None))
+        self.assertEqual(expected_versions('"v1", W/"v3"', None), {1, 3})
+        self.assertEqual(expected_versions('"v1"', '1'), {1})
+        self.assertEqual(expected_versions('"v1"', 2), set())
+        for invalid in (0, -1, True, 'x', 1.5):
+            with self.assertRaises(ValueError):
+                expected_versions(None, invalid)
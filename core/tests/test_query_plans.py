@@ -0,0 +1,53 @@
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+from ..models.post import Post
+from ..utils.pagination import FEED_ORDERING, encode_cursor, keyset_queryset
+
+
+@skipUnless(connection.vendor == 'sqlite', 'EXPLAIN QUERY PLAN is SQLite specific')
+class QueryPlanTests(TestCase):
+    """The hot-path Post queries must be served by an index, never a full scan or a sort"""
+
+    def _plan(self, queryset):
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+            return [row[-1] for row in cursor.fetchall()]
+
+    def assertIndexPlan(self, queryset, index_name, seek=True):
+        plan = self._plan(queryset)
+        detail = ' | '.join(plan)
+        self.assertTrue(any(index_name in step for step in plan), detail)
+        self.assertFalse(any('TEMP B-TREE' in step for step in plan), detail)
+        self.assertFalse(any(step == 'SCAN core_post' for step in plan), detail)
+        if seek:
+            self.assertTrue(any(step.startswith('SEARCH') for step in plan), detail)
+
+    def _keyset_queryset(self, direction):
+        cursor = encode_cursor(timezone.now(), 10, direction)
+        queryset, _ = keyset_queryset(Post.objects.all(), cursor)
+        return queryset[:21]
+
+    def test_first_feed_page(self):
+        self.assertIndexPlan(Post.objects.order_by(*FEED_ORDERING)[:21], 'post_feed_idx', seek=False)
+
+    def test_next_feed_page(self):
+        self.assertIndexPlan(self._keyset_queryset('next'), 'post_feed_idx')
+
+    def test_previous_feed_page(self):
+        self.assertIndexPlan(self._keyset_queryset('previous'), 'post_feed_idx')
+
+    def test_feed_with_authors(self):
+        queryset = Post.objects.select_related('author').order_by(*FEED_ORDERING)[:21]
+        self.assertIndexPlan(queryset, 'post_feed_idx', seek=False)
+
+    def test_author_posts(self):
+        queryset = Post.objects.filter(author_id=1).order_by('-created_at')[:20]
+        self.assertIndexPlan(queryset, 'post_author_idx')
+
+    def test_ownership_check(self):
+        plan = self._plan(Post.objects.filter(id=1, author_id=1))
+        self.assertTrue(any('PRIMARY KEY' in step for step in plan), plan)
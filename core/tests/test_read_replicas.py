@@ -0,0 +1,120 @@
+import json
+import shutil
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connections
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APISimpleTestCase
+
+from ..models.post import Post
+from ..utils.db_router import STICKY_COOKIE, sticky_cache
+from ..utils.jwt_auth import UserRefreshToken
+from ..utils.feed_cache import get_feed_cache
+
+User = get_user_model()
+
+PRIMARY, REPLICA = 'test_primary', 'test_replica'
+
+
+class ReadReplicaTests(APISimpleTestCase):
+    """Two SQLite files stand in for a primary and a (never replicated) replica"""
+
+    databases = '__all__'
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.mkdtemp()
+        for alias in (PRIMARY, REPLICA):
+            connections.settings[alias] = {
+                **connections['default'].settings_dict, 'NAME': f'{cls.tmp}/{alias}.sqlite3',
+            }
+            call_command('migrate', database=alias, verbosity=0)
+        super().setUpClass()
+        # Posts reference their author, so the user lives in the primary file too
+        cls.user = User.objects.db_manager(PRIMARY).create_user(username='replicauser', password='testpass123')
+        cls.routing = override_settings(POSTS_PRIMARY_DATABASE=PRIMARY, POSTS_READ_DATABASES=[REPLICA])
+        cls.routing.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.routing.disable()
+        super().tearDownClass()
+        for alias in (PRIMARY, REPLICA):
+            connections[alias].close()
+            del connections[alias]
+            del connections.settings[alias]
+        shutil.rmtree(cls.tmp)
+
+    def setUp(self):
+        get_feed_cache().invalidate()
+        sticky_cache().clear()
+        for alias in (PRIMARY, REPLICA):
+            Post.objects.using(alias).all().delete()
+        self.client.force_authenticate(user=self.user)
+
+    def _feed_titles(self):
+        response = self.client.get(reverse('listposts'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [post['title'] for post in response.data]
+
+    def test_feed_search_and_export_read_from_replica(self):
+        Post.objects.using(REPLICA).create(username='replicauser', title='Replica only', content='replicated')
+        self.assertEqual(self._feed_titles(), ['Replica only'])
+        response = self.client.get(reverse('search_posts'), {'q': 'replicated'})
+        self.assertEqual([post['title'] for post in response.data['results']], ['Replica only'])
+        response = self.client.get(reverse('export_posts'))
+        self.assertEqual(len(json.loads(b''.join(response.streaming_content))), 1)
+
+    def test_writes_go_to_primary(self):
+        response = self.client.post(reverse('createpost'), {'title': 'New', 'content': 'x'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(Post.objects.using(PRIMARY).filter(title='New').exists())
+        self.assertFalse(Post.objects.using(REPLICA).exists())
+
+    def test_writer_reads_its_own_writes_until_marker_expires(self):
+        response = self.client.post(reverse('createpost'), {'title': 'Mine', 'content': 'x'}, format='json')
+        self.assertEqual(response.cookies[STICKY_COOKIE]['max-age'], 5)
+        # The replica has not caught up, yet the writer sees the new post
+        self.assertEqual(self._feed_titles(), ['Mine'])
+        del self.client.cookies[STICKY_COOKIE]
+        get_feed_cache().invalidate()
+        self.assertEqual(self._feed_titles(), [])
+
+    def test_token_client_without_cookies_reads_its_own_writes(self):
+        # A cross-origin SPA: it sends its bearer token but never the SameSite=Lax cookie
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {UserRefreshToken.for_user(self.user).access_token}')
+        self.client.post(reverse('createpost'), {'title': 'Mine', 'content': 'x'}, format='json')
+        del self.client.cookies[STICKY_COOKIE]
+        self.assertEqual(self._feed_titles(), ['Mine'])
+        sticky_cache().clear()
+        get_feed_cache().invalidate()
+        self.assertEqual(self._feed_titles(), [])
+
+    def test_streamed_export_follows_the_pin(self):
+        self.client.post(reverse('createpost'), {'title': 'Mine', 'content': 'x'}, format='json')
+        # The export's rows are only queried once the response body is consumed
+        response = self.client.get(reverse('export_posts'))
+        self.assertEqual([post['title'] for post in json.loads(b''.join(response.streaming_content))], ['Mine'])
+
+    def test_reads_are_not_marked(self):
+        response = self.client.get(reverse('listposts'))
+        self.assertNotIn(STICKY_COOKIE, response.cookies)
+
+    def test_edit_and_delete_look_up_posts_on_primary(self):
+        post = Post.objects.using(PRIMARY).create(author=self.user, username='replicauser', title='Lagging', content='x')
+        response = self.client.patch(reverse('editpost', args=[post.id]), {'title': 'Edited'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.delete(reverse('deletepost', args=[post.id]))
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(Post.objects.using(PRIMARY).exists())
+
+    def test_bulk_writes_use_primary_transaction(self):
+        response = self.client.post(reverse('bulk_posts'), [{'title': 'A', 'content': 'x'}] * 3, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Post.objects.using(PRIMARY).count(), 3)
+        self.assertIn(STICKY_COOKIE, response.cookies)
+
@@ -0,0 +1,71 @@
+import datetime
+import decimal
+import json
+import uuid
+from unittest import mock, skipIf
+
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.renderers import JSONRenderer
+from django.contrib.auth import get_user_model
+from ..models.post import Post
+from ..serializers import post_rows, represent_post, represent_rows
+from ..utils import renderers
+from ..utils.renderers import ORJSONRenderer, dumps
+
+User = get_user_model()
+
+SAMPLE = {
+    'aware': datetime.datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=datetime.timezone.utc),
+    'whole_second': timezone.make_aware(datetime.datetime(2024, 5, 1, 12, 30)),
+    'offset': datetime.datetime(2024, 5, 1, 9, 0, tzinfo=datetime.timezone(datetime.timedelta(hours=-3))),
+    'naive': datetime.datetime(2024, 5, 1, 12, 30),
+    'date': datetime.date(2024, 5, 1),
+    'decimal': decimal.Decimal('1.5'),
+    'uuid': uuid.UUID(int=1),
+    'lazy': gettext_lazy('Não encontrado.'),
+    'text': 'Olá\u2028mundo\u2029',
+    'nested': [{'id': 1, 'tuple': (1, 2)}, None, True, 1.25],
+    'huge': 2 ** 70,
+    1: 'int key',
+}
+
+
+class RendererTests(SimpleTestCase):
+    def test_matches_drf_json_renderer(self):
+        self.assertEqual(ORJSONRenderer().render(SAMPLE), JSONRenderer().render(SAMPLE))
+
+    @skipIf(renderers.orjson is None, 'orjson is not installed')
+    def test_uses_orjson_for_plain_data(self):
+        with mock.patch.object(renderers.orjson, 'dumps', wraps=renderers.orjson.dumps) as orjson_dumps:
+            dumps({'id': 1})
+        orjson_dumps.assert_called_once()
+
+    def test_falls_back_without_orjson(self):
+        with mock.patch.object(renderers, 'orjson', None):
+            self.assertEqual(dumps(SAMPLE), JSONRenderer().render(SAMPLE))
+
+    def test_indented_output_goes_through_drf(self):
+        rendered = ORJSONRenderer().render({'a': 1}, 'application/json; indent=2')
+        self.assertEqual(rendered, b'{\n  "a": 1\n}')
+
+    def test_none_renders_empty(self):
+        self.assertEqual(ORJSONRenderer().render(None), b'')
+
+
+class PostRepresentationTests(TestCase):
+    def test_rows_and_instances_have_the_same_representation(self):
+        user = User.objects.create_user(username='user1', password='pass1234', first_name='Ana', last_name='Lima')
+        Post.objects.create(author=user, username='user1', title='Mine', content='x')
+        Post.objects.create(username='legacy', title='Orphan', content='y')
+        queryset = Post.objects.order_by('id')
+        with self.assertNumQueries(1):
+            from_rows = represent_rows(post_rows(queryset))
+        from_instances = [represent_post(post) for post in queryset.select_related('author')]
+        self.assertEqual(from_rows, from_instances)
+        self.assertEqual(
+            from_rows[0]['author'], {'id': user.id, 'username': 'user1', 'first_name': 'Ana', 'last_name': 'Lima'},
+        )
+        self.assertIsNone(from_rows[1]['author'])
+        self.assertEqual(json.loads(dumps(from_rows))[0]['title'], 'Mine')
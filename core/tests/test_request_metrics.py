@@ -0,0 +1,97 @@
+import re
+
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from rest_framework_simplejwt.tokens import RefreshToken
+from ..middleware.metrics import RequestMetricsMiddleware
+from ..models.post import Post
+from ..utils.feed_cache import get_feed_cache
+from ..utils.metrics import Histogram, get_metrics
+
+User = get_user_model()
+
+SERVER_TIMING = re.compile(r'app;dur=[\d.]+, db;dur=[\d.]+;desc="(\d+) queries"')
+
+
+@override_settings(REQUEST_METRICS={})
+class RequestMetricsTests(APITestCase):
+    def setUp(self):
+        get_feed_cache().invalidate()
+        self.user = User.objects.create_user(username='user1', password='pass1234')
+        self.client.force_authenticate(user=self.user)
+        Post.objects.create(author=self.user, username='user1', title='Post', content='Content')
+
+    def test_server_timing_counts_queries(self):
+        response = self.client.get(reverse('listposts'))
+        match = SERVER_TIMING.fullmatch(response['Server-Timing'])
+        self.assertIsNotNone(match)
+        self.assertGreaterEqual(int(match.group(1)), 1)
+
+    def test_request_log_line(self):
+        with self.assertLogs('core.requests', 'INFO') as logs:
+            self.client.get(reverse('listposts'))
+        self.assertIn('method=GET route=listposts/ status=200', logs.output[0])
+        self.assertEqual(logs.records[0].request_metrics['route'], 'listposts/')
+
+    def test_metrics_endpoint_is_admin_only(self):
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_metrics_endpoint_exposes_histograms(self):
+        self.client.get(reverse('listposts'))
+        self.client.get(reverse('editpost', args=[999]))
+        admin = User.objects.create_user(username='admin', password='pass1234', is_staff=True)
+        self.client.force_authenticate(user=admin)
+
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        body = response.content.decode()
+        self.assertIn('http_requests_total{method="GET",route="listposts/",status="200"} 1', body)
+        self.assertIn('http_request_duration_seconds_count{method="GET",route="listposts/"} 1', body)
+        self.assertIn('http_request_queries_bucket{method="GET",route="listposts/",le="+Inf"} 1', body)
+        self.assertIn('route="editpost/<int:post_id>/"', body)
+        self.assertIn(f"feed_cache_misses_total {get_feed_cache().stats()['misses']}\n", body)
+
+
+@override_settings(REQUEST_METRICS={'REPEATED_QUERY_THRESHOLD': 3})
+class NPlusOneTests(TestCase):
+    def _view(self, lookups):
+        def view(request):
+            for post_id in range(lookups):
+                Post.objects.filter(id=post_id).exists()
+            return HttpResponse('ok')
+        return RequestMetricsMiddleware(view)
+
+    def test_repeated_statement_is_reported(self):
+        with self.assertLogs('core.requests', 'WARNING') as logs:
+            response = self._view(3)(RequestFactory().get('/'))
+        self.assertIn('repetida 3 vezes', logs.output[0])
+        self.assertIn('desc="3 queries"', response['Server-Timing'])
+        self.assertIn('http_request_n_plus_one_total{method="GET",route="<unmatched>"} 1', get_metrics().render())
+
+    def test_below_threshold_is_not_reported(self):
+        self._view(2)(RequestFactory().get('/'))
+        self.assertNotIn('http_request_n_plus_one_total{', get_metrics().render())
+
+
+@override_settings(REQUEST_METRICS={})
+class AsyncRequestMetricsTests(TestCase):
+    async def test_async_view_queries_are_counted(self):
+        user = await User.objects.acreate(username='user1')
+        headers = {'Authorization': f'Bearer {RefreshToken.for_user(user).access_token}'}
+        response = await self.async_client.get(reverse('async_listposts'), headers=headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertGreaterEqual(int(SERVER_TIMING.fullmatch(response['Server-Timing']).group(1)), 1)
+
+
+class HistogramTests(TestCase):
+    def test_cumulative_buckets(self):
+        histogram = Histogram((1, 5))
+        for value in (0, 1, 3, 10):
+            histogram.observe(value)
+        self.assertEqual(list(histogram.cumulative()), [(1, 2), (5, 3), ('+Inf', 4)])
+        self.assertEqual((histogram.sum, histogram.count), (14, 4))
@@ -0,0 +1,96 @@
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from ..models.post import Post
+from ..utils.search import _fallback_search, match_expression
+
+User = get_user_model()
+
+
+class SearchPostsTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='searcher', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('search_posts')
+
+    def _search(self, q, **params):
+        response = self.client.get(self.url, {'q': q, **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def _titles(self, data):
+        return [post['title'] for post in data['results']]
+
+    def test_title_matches_rank_above_content_matches(self):
+        Post.objects.create(author=self.user, username='searcher', title='Weekend plans', content='Going hiking with django fans')
+        Post.objects.create(author=self.user, username='searcher', title='Django tips', content='Use select_related')
+        Post.objects.create(author=self.user, username='searcher', title='Unrelated', content='Nothing to see')
+        data = self._search('django')
+        self.assertEqual(self._titles(data), ['Django tips', 'Weekend plans'])
+        self.assertLess(data['results'][0]['rank'], data['results'][1]['rank'])
+
+    def test_highlights_and_snippets(self):
+        Post.objects.create(author=self.user, username='searcher', title='Café in São Paulo', content='The best coffee in town')
+        result = self._search('sao coffee')['results'][0]
+        self.assertEqual(result['title_highlight'], 'Café in <mark>São</mark> Paulo')
+        self.assertIn('<mark>coffee</mark>', result['snippet'])
+
+    def test_highlights_escape_post_html(self):
+        Post.objects.create(
+            author=self.user, username='searcher', title='<img src=x onerror=alert(1)> alert',
+            content='<script>alert("x")</script> & more',
+        )
+        result = self._search('alert')['results'][0]
+        self.assertEqual(
+            result['title_highlight'], '&lt;img src=x onerror=<mark>alert</mark>(1)&gt; <mark>alert</mark>',
+        )
+        self.assertEqual(
+            result['snippet'], '&lt;script&gt;<mark>alert</mark>(&quot;x&quot;)&lt;/script&gt; &amp; more',
+        )
+
+    def test_last_word_matches_as_prefix(self):
+        Post.objects.create(author=self.user, username='searcher', title='Performance tuning', content='x')
+        self.assertEqual(self._titles(self._search('perf')), ['Performance tuning'])
+
+    def test_query_syntax_is_not_interpreted(self):
+        Post.objects.create(author=self.user, username='searcher', title='NEAR and OR', content='x')
+        self.assertEqual(match_expression('"near" OR -x*'), '"near" "OR" "x"*')
+        self.assertEqual(self._titles(self._search('"near" OR')), ['NEAR and OR'])
+        self.assertEqual(self._search('*"(')['results'], [])
+
+    def test_cursor_pagination_walks_every_match_once(self):
+        Post.objects.bulk_create(
+            Post(author=self.user, username='searcher', title=f'Post {i}', content='common ' * (i % 4 + 1))
+            for i in range(25)
+        )
+        seen = []
+        data = self._search('common', page_size=10)
+        seen += self._titles(data)
+        while data['next']:
+            data = self.client.get(data['next']).data
+            seen += self._titles(data)
+        self.assertEqual(len(seen), 25)
+        self.assertEqual(len(set(seen)), 25)
+
+    def test_index_follows_edits_and_deletes(self):
+        post = Post.objects.create(author=self.user, username='searcher', title='Original title', content='x')
+        response = self.client.patch(reverse('editpost', args=[post.id]), {'title': 'Renamed'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self._search('original')['results'], [])
+        self.assertEqual(self._titles(self._search('renamed')), ['Renamed'])
+        Post.objects.filter(id=post.id).delete()
+        self.assertEqual(self._search('renamed')['results'], [])
+
+    def test_rejects_missing_query_and_bad_cursor(self):
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(self.url, {'q': 'x', 'cursor': 'garbage'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_fallback_matches_substrings_newest_first(self):
+        Post.objects.create(author=self.user, username='searcher', title='First django post', content='x')
+        Post.objects.create(author=self.user, username='searcher', title='Second', content='about Django')
+        posts, next_cursor = _fallback_search('django', None, 10)
+        self.assertEqual([post.title for post in posts], ['Second', 'First django post'])
+        self.assertIsNone(posts[0].rank)
+        self.assertIsNone(next_cursor)
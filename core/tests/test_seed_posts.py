@@ -0,0 +1,75 @@
+import datetime
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from ..models.post import Post
+from ..utils.search import search_posts
+
+User = get_user_model()
+
+END = '2024-06-01T00:00:00+00:00'
+
+
+class SeedPostsCommandTests(TestCase):
+    def _seed(self, **options):
+        options = {'posts': 60, 'users': 5, 'end': END, 'batch_size': 7, 'transaction_size': 25, **options}
+        output = StringIO()
+        call_command('seed_posts', stdout=output, **options)
+        return output.getvalue()
+
+    def _snapshot(self):
+        return list(Post.objects.order_by('id').values_list('username', 'title', 'content', 'created_at', 'updated_at'))
+
+    def test_seeds_users_and_posts(self):
+        output = self._seed(days=10)
+        self.assertEqual(User.objects.filter(username__startswith='seed').count(), 5)
+        self.assertEqual(Post.objects.count(), 60)
+        self.assertIn('60/60 posts (100%', output)
+
+        created = list(Post.objects.order_by('id').values_list('created_at', flat=True))
+        end = datetime.datetime(2024, 6, 1, tzinfo=datetime.timezone.utc)
+        self.assertEqual(created, sorted(created))
+        self.assertGreaterEqual(created[0], end - datetime.timedelta(days=10))
+        self.assertLessEqual(created[-1], end)
+        self.assertFalse(Post.objects.filter(author__isnull=True).exists())
+        self.assertTrue(all(post.username == post.author.username for post in Post.objects.select_related('author')))
+
+    def test_is_deterministic(self):
+        self._seed(seed=7)
+        first = self._snapshot()
+        Post.objects.all().delete()
+        self._seed(seed=7)
+        self.assertEqual(self._snapshot(), first)
+
+    def test_reuses_existing_users(self):
+        self._seed(posts=10)
+        self._seed(posts=10, users=6)
+        self.assertEqual(User.objects.filter(username__startswith='seed').count(), 6)
+        self.assertEqual(Post.objects.count(), 20)
+
+    def test_zipf_favours_the_first_users(self):
+        self._seed(posts=500, users=20, skew=1.5)
+        top = Post.objects.filter(username='seed0').count()
+        bottom = Post.objects.filter(username='seed19').count()
+        self.assertGreater(top, 5 * max(bottom, 1))
+
+    def test_search_index_is_rebuilt(self):
+        self._seed(posts=30)
+        self.assertTrue(search_posts('lorem', None, 50)[0])
+        user = User.objects.get(username='seed0')
+        Post.objects.create(author=user, username='seed0', title='Zebra', content='listrada')
+        self.assertEqual([post.title for post in search_posts('zebra', None, 20)[0]], ['Zebra'])
+
+    def test_auto_now_is_restored(self):
+        self._seed(posts=5)
+        self.assertTrue(Post._meta.get_field('updated_at').auto_now)
+        self.assertTrue(Post._meta.get_field('created_at').auto_now_add)
+
+    def test_rejects_bad_options(self):
+        with self.assertRaises(CommandError):
+            self._seed(users=0)
+        with self.assertRaises(CommandError):
+            self._seed(min_words=10, max_words=5)
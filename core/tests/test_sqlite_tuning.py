@@ -0,0 +1,44 @@
+import os
+import tempfile
+
+from django.db import connection
+from django.db.backends.sqlite3.base import DatabaseWrapper
+from django.test import SimpleTestCase, TestCase
+
+from ..utils.sqlite import DEFAULT_PRAGMAS
+
+
+def read_pragma(db_connection, name):
+    with db_connection.cursor() as cursor:
+        cursor.execute(f'PRAGMA {name}')
+        return cursor.fetchone()[0]
+
+
+class ConnectionPragmaTests(TestCase):
+    def test_test_database_connection_is_tuned(self):
+        self.assertEqual(read_pragma(connection, 'synchronous'), 1)
+        self.assertEqual(read_pragma(connection, 'busy_timeout'), DEFAULT_PRAGMAS['busy_timeout'])
+        self.assertEqual(read_pragma(connection, 'cache_size'), DEFAULT_PRAGMAS['cache_size'])
+
+
+class FileDatabasePragmaTests(SimpleTestCase):
+    def test_new_file_connection_switches_to_wal(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            wrapper = DatabaseWrapper(
+                {**connection.settings_dict, 'NAME': os.path.join(tmp, 'tuned.sqlite3')}, alias='tuning',
+            )
+            try:
+                self.assertEqual(read_pragma(wrapper, 'journal_mode'), 'wal')
+                self.assertEqual(read_pragma(wrapper, 'mmap_size'), DEFAULT_PRAGMAS['mmap_size'])
+            finally:
+                wrapper.close()
+
+    def test_pragmas_can_be_disabled(self):
+        with tempfile.TemporaryDirectory() as tmp, self.settings(SQLITE_PRAGMAS={}):
+            wrapper = DatabaseWrapper(
+                {**connection.settings_dict, 'NAME': os.path.join(tmp, 'plain.sqlite3')}, alias='plain',
+            )
+            try:
+                self.assertEqual(read_pragma(wrapper, 'journal_mode'), 'delete')
+            finally:
+                wrapper.close()
@@ -0,0 +1,50 @@
+import json
+import subprocess
+import sys
+from io import StringIO
+
+from django.conf import settings
+from django.core.management import call_command
+from django.test import SimpleTestCase
+
+from ..management.commands.startup_profile import package_totals, parse_importtime
+
+IMPORTTIME = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |     yaml.error
+import time:       300 |        420 |   yaml
+import time:      2000 |       2000 |   django.db
+import time:       500 |       2920 | django
+"""
+
+
+class StartupProfileTests(SimpleTestCase):
+    def test_parse_importtime(self):
+        entries = parse_importtime(IMPORTTIME + 'unrelated stderr line\n')
+        self.assertEqual(entries[0], ('yaml.error', 120, 120))
+        self.assertEqual(len(entries), 4)
+        self.assertEqual(package_totals(entries, top=1), {'django': 2.5})
+
+    def test_api_profile_answers_with_fewer_apps(self):
+        output = StringIO()
+        call_command(
+            'startup_profile', '--settings-module', 'codeleap_backend_django.settings_api', '--runs', '1',
+            stdout=output, stderr=StringIO(),
+        )
+        profile = json.loads(output.getvalue())['profiles']['codeleap_backend_django.settings_api']
+        self.assertEqual(profile['status'], 200)
+        self.assertLess(profile['apps'], len(settings.INSTALLED_APPS))
+        self.assertGreater(profile['time_to_first_response_ms'], 0)
+
+    def test_google_libraries_load_on_first_use(self):
+        # A fresh interpreter: this test process may have imported them already
+        loaded = subprocess.run(
+            [sys.executable, '-c', (
+                'import django, sys; django.setup(); '
+                'from django.urls import get_resolver; get_resolver().url_patterns; '
+                "print(sorted(name for name in sys.modules if name.startswith('google.')))"
+            )],
+            cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+            env={'DJANGO_SETTINGS_MODULE': 'codeleap_backend_django.settings', 'PATH': ''},
+        ).stdout.strip().splitlines()[-1]
+        self.assertEqual(loaded, '[]')
@@ -0,0 +1,158 @@
+import datetime
+import io
+import threading
+
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from ..models.task import QueuedTask
+from ..utils.tasks import claim_task, task
+
+User = get_user_model()
+
+calls = []
+
+
+@task(max_retries=2, retry_backoff=0.01)
+def flaky(key, failures):
+    calls.append(key)
+    if calls.count(key) <= failures:
+        raise RuntimeError(f'falha {calls.count(key)}')
+
+
+@task(max_retries=1, retry_backoff=60)
+def always_fails():
+    raise RuntimeError('sempre falha')
+
+
+def run_tasks(*args):
+    call_command('run_tasks', '--once', *args, stdout=io.StringIO())
+
+
+class TaskBackendTests(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    @override_settings(TASK_QUEUE={'BACKEND': 'core.utils.tasks.ImmediateBackend'})
+    def test_immediate_backend_retries_inline(self):
+        with self.assertLogs('core.utils.tasks', 'WARNING') as logs:
+            flaky.enqueue('a', failures=2)
+        self.assertEqual(calls, ['a', 'a', 'a'])
+        self.assertIn('tentativa 2', logs.output[-1])
+        with self.assertLogs('core.utils.tasks', 'ERROR'):
+            flaky.enqueue('b', failures=5)
+        self.assertEqual(calls.count('b'), 3)
+
+    @override_settings(TASK_QUEUE={'BACKEND': 'core.utils.tasks.ImmediateBackend'})
+    def test_arguments_must_be_json(self):
+        with self.assertRaises(TypeError):
+            flaky.enqueue(object(), failures=0)
+
+    @override_settings(TASK_QUEUE={'BACKEND': 'core.utils.tasks.ThreadPoolBackend', 'WORKERS': 2})
+    def test_thread_pool_runs_after_commit_and_retries(self):
+        done = threading.Event()
+        original = flaky.func
+
+        def tracked(key, failures):
+            original(key, failures)
+            done.set()
+
+        flaky.func = tracked
+        try:
+            with self.assertLogs('core.utils.tasks', 'WARNING'):
+                with self.captureOnCommitCallbacks(execute=True):
+                    flaky.enqueue('c', failures=1)
+                    self.assertEqual(calls, [])
+                self.assertTrue(done.wait(5))
+        finally:
+            flaky.func = original
+        self.assertEqual(calls, ['c', 'c'])
+
+
+@override_settings(TASK_QUEUE={'BACKEND': 'core.utils.tasks.DatabaseBackend'})
+class DatabaseQueueTests(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_worker_runs_and_deletes_rows(self):
+        flaky.enqueue('d', failures=0)
+        row = QueuedTask.objects.get()
+        self.assertEqual((row.name, row.status, row.max_attempts), ('core.tests.test_tasks.flaky', 'pending', 3))
+        self.assertEqual(calls, [])
+        run_tasks()
+        self.assertEqual(calls, ['d'])
+        self.assertFalse(QueuedTask.objects.exists())
+
+    def test_failures_back_off_then_give_up(self):
+        always_fails.enqueue()
+        with self.assertLogs('core.utils.tasks', 'WARNING'):
+            run_tasks()
+        row = QueuedTask.objects.get()
+        self.assertEqual((row.status, row.attempts), ('pending', 1))
+        self.assertIn('sempre falha', row.last_error)
+        self.assertGreater(row.run_at, timezone.now() + datetime.timedelta(seconds=50))
+
+        run_tasks()
+        self.assertEqual(QueuedTask.objects.get().attempts, 1)
+
+        QueuedTask.objects.update(run_at=timezone.now())
+        with self.assertLogs('core.utils.tasks', 'ERROR'):
+            run_tasks()
+        row = QueuedTask.objects.get()
+        self.assertEqual((row.status, row.attempts), ('failed', 2))
+
+        run_tasks('--retry-failed', '--max-tasks', '0')
+        self.assertEqual(QueuedTask.objects.get().status, 'pending')
+
+    def test_expired_leases_are_claimed_again(self):
+        flaky.enqueue('e', failures=0)
+        self.assertIsNotNone(claim_task('worker-1', lease_seconds=60))
+        self.assertIsNone(claim_task('worker-2', lease_seconds=60))
+        QueuedTask.objects.update(locked_at=timezone.now() - datetime.timedelta(seconds=61))
+        row = claim_task('worker-2', lease_seconds=60)
+        self.assertEqual((row.locked_by, row.attempts), ('worker-2', 2))
+
+
+@override_settings(
+    EMAIL_BACKEND='core.utils.mail.QueuedEmailBackend',
+    QUEUED_EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+)
+class QueuedEmailTests(TestCase):
+    def _send(self):
+        message = mail.EmailMultiAlternatives('Confirme seu email', 'Texto', 'no-reply@example.com', ['a@example.com'])
+        message.attach_alternative('<p>Texto</p>', 'text/html')
+        message.attach('nota.txt', 'anexo', 'text/plain')
+        return message.send()
+
+    @override_settings(TASK_QUEUE={'BACKEND': 'core.utils.tasks.DatabaseBackend'})
+    def test_mail_is_delivered_by_the_worker(self):
+        self.assertEqual(self._send(), 1)
+        self.assertEqual(mail.outbox, [])
+        run_tasks()
+        self.assertEqual(len(mail.outbox), 1)
+        sent = mail.outbox[0]
+        self.assertEqual((sent.subject, sent.to), ('Confirme seu email', ['a@example.com']))
+        self.assertEqual(sent.alternatives, [('<p>Texto</p>', 'text/html')])
+        self.assertEqual(sent.attachments, [('nota.txt', 'anexo', 'text/plain')])
+
+    @override_settings(TASK_QUEUE={'BACKEND': 'core.utils.tasks.ImmediateBackend'})
+    def test_mail_is_delivered_inline_by_the_immediate_backend(self):
+        self._send()
+        self.assertEqual(len(mail.outbox), 1)
+
+
+@override_settings(TASK_QUEUE={'BACKEND': 'core.utils.tasks.ImmediateBackend'})
+class AuthAuditTests(APITestCase):
+    def test_register_is_audited(self):
+        with self.assertLogs('core.audit', 'INFO') as logs:
+            response = self.client.post(reverse('register'), {
+                'username': 'newuser', 'email': 'new@example.com', 'password': 'pass5678',
+            }, REMOTE_ADDR='10.0.0.1')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertIn(f"event=register user_id={response.data['user']['id']} ip=10.0.0.1", logs.output[0])
+        self.assertIsNotNone(User.objects.get(username='newuser').last_login)
@@ -0,0 +1,126 @@
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+from rest_framework.settings import api_settings
+from django.contrib.auth import get_user_model
+from ..models.throttle import ThrottleBucket
+from ..utils.jwt_auth import UserRefreshToken
+from ..utils.feed_cache import get_feed_cache
+from ..utils.throttling import DatabaseBucketStore, LocalBucketStore, get_throttle_store, parse_rate
+
+User = get_user_model()
+
+
+def rates(**overrides):
+    return override_settings(REST_FRAMEWORK={
+        **api_settings.user_settings,
+        'DEFAULT_THROTTLE_RATES': {**api_settings.DEFAULT_THROTTLE_RATES, **overrides},
+    })
+
+
+class ThrottledEndpointTests(APITestCase):
+    def setUp(self):
+        get_feed_cache().invalidate()
+        self.user = User.objects.create_user(username='user1', email='user1@email.com', password='pass1234')
+
+    @rates(rest_login='2/min')
+    def test_login_gets_429_with_retry_after(self):
+        credentials = {'email': 'user1@email.com', 'password': 'wrong'}
+        for _ in range(2):
+            self.assertEqual(self.client.post(reverse('login'), credentials).status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.post(reverse('login'), credentials)
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(response['Retry-After'], '30')
+
+        # Buckets are per client IP
+        response = self.client.post(reverse('login'), credentials, REMOTE_ADDR='10.0.0.2')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @rates(createpost='1/min')
+    def test_create_is_limited_per_user(self):
+        self.client.force_authenticate(user=self.user)
+        payload = {'title': 'Post', 'content': 'Content'}
+        self.assertEqual(self.client.post(reverse('createpost'), payload).status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.client.post(reverse('createpost'), payload).status_code,
+                         status.HTTP_429_TOO_MANY_REQUESTS)
+        # Reads are not rated per endpoint
+        self.assertEqual(self.client.get(reverse('listposts')).status_code, status.HTTP_200_OK)
+
+        other = User.objects.create_user(username='user2', password='pass1234')
+        self.client.force_authenticate(user=other)
+        self.assertEqual(self.client.post(reverse('createpost'), payload).status_code, status.HTTP_201_CREATED)
+
+    @rates(createpost='2/min')
+    def test_every_create_endpoint_spends_one_bucket(self):
+        # The async view authenticates bearer tokens only
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {UserRefreshToken.for_user(self.user).access_token}')
+        payload = {'title': 'Post', 'content': 'Content'}
+        self.assertEqual(self.client.post(reverse('createpost'), payload).status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.client.post(reverse('listposts'), payload).status_code, status.HTTP_201_CREATED)
+        for url in ('createpost', 'listposts'):
+            self.assertEqual(self.client.post(reverse(url), payload).status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        response = self.client.post(reverse('async_listposts'), payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(response['Retry-After'], '30')
+
+    @rates(bulk_posts='5/min')
+    def test_bulk_requests_spend_one_token_per_item(self):
+        self.client.force_authenticate(user=self.user)
+        items = [{'title': 'Post', 'content': 'Content'}] * 3
+        response = self.client.post(reverse('bulk_posts'), items, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        response = self.client.post(reverse('bulk_posts'), {'posts': items}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        # Two tokens are left, and a one-item request spends only one of them
+        response = self.client.delete(reverse('bulk_posts'), [1], format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    @rates(rest_login='1/min')
+    def test_forwarded_for_is_ignored_without_trusted_proxies(self):
+        credentials = {'email': 'user1@email.com', 'password': 'wrong'}
+        self.client.post(reverse('login'), credentials, HTTP_X_FORWARDED_FOR='203.0.113.1')
+        response = self.client.post(reverse('login'), credentials, HTTP_X_FORWARDED_FOR='203.0.113.2')
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    @rates(ip='2/min')
+    def test_ip_scope_covers_every_endpoint(self):
+        self.client.force_authenticate(user=self.user)
+        self.client.get(reverse('listposts'))
+        self.client.post(reverse('createpost'), {'title': 'Post', 'content': 'Content'})
+        self.assertEqual(self.client.get(reverse('listposts')).status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    @rates(rest_login='1/min')
+    @override_settings(API_THROTTLING={'ENABLED': False})
+    def test_disabled(self):
+        for _ in range(3):
+            response = self.client.post(reverse('login'), {'email': 'user1@email.com', 'password': 'wrong'})
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(ThrottleBucket.objects.exists())
+
+
+class BucketStoreTests(TestCase):
+    def _check_refill(self, store):
+        capacity, rate = parse_rate('3/min')
+        results = [store.consume('k', capacity, rate, now=1000)[0] for _ in range(4)]
+        self.assertEqual(results, [True, True, True, False])
+        # One token comes back every 20 seconds
+        self.assertFalse(store.consume('k', capacity, rate, now=1019)[0])
+        granted, tokens = store.consume('k', capacity, rate, now=1021)
+        self.assertTrue(granted)
+        self.assertAlmostEqual(tokens, 0.05)
+        # Never more than the capacity, however long the bucket sat idle
+        results = [store.consume('k', capacity, rate, now=5000)[0] for _ in range(4)]
+        self.assertEqual(results, [True, True, True, False])
+
+    def test_database_store(self):
+        store = DatabaseBucketStore()
+        self._check_refill(store)
+        self.assertEqual(ThrottleBucket.objects.get(key='k').granted, False)
+        self.assertEqual(store.purge(6000), 1)
+
+    def test_local_store(self):
+        self._check_refill(LocalBucketStore())
+
+    def test_database_store_is_the_default(self):
+        self.assertIsInstance(get_throttle_store(), DatabaseBucketStore)
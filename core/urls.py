@@ -1,14 +1,21 @@
 from django.urls import path
 from .utils.csrf import get_csrf_token
 
+from .views.async_views import async_delete_post, async_edit_post, async_posts
+from .views.changes import PostChangesView
+from .views.events import post_events
+from .views.export import ExportPostsView
+from .views.metrics import MetricsView
+from .views.search import SearchPostsView
 from .views.views import (
-    PostsRouterView, PatchPostView, DeletePostView,
+    PostsRouterView, PatchPostView, DeletePostView, BulkPostsView,
     GoogleLoginJWT, RegisterView, LoginView, CreatePostView, health_check
 )
 
 urlpatterns = [
     path('csrf/', get_csrf_token, name='get_csrf_token'),
     path('health/', health_check, name='health_check'),
+    path('metrics/', MetricsView.as_view(), name='metrics'),
     path('auth/register/', RegisterView.as_view(), name='register'),
     path('auth/login/', LoginView.as_view(), name='login'),
     path('auth/google/', GoogleLoginJWT.as_view(), name='google_login'),
@@ -16,4 +23,12 @@ urlpatterns = [
     path('createpost/', CreatePostView.as_view(), name='createpost'),
     path('editpost/<int:post_id>/', PatchPostView.as_view(), name='editpost'),
     path('deletepost/<int:post_id>/', DeletePostView.as_view(), name='deletepost'),
+    path('posts/bulk/', BulkPostsView.as_view(), name='bulk_posts'),
+    path('posts/export/', ExportPostsView.as_view(), name='export_posts'),
+    path('posts/changes/', PostChangesView.as_view(), name='post_changes'),
+    path('posts/search/', SearchPostsView.as_view(), name='search_posts'),
+    path('posts/events/', post_events, name='post_events'),
+    path('async/listposts/', async_posts, name='async_listposts'),
+    path('async/editpost/<int:post_id>/', async_edit_post, name='async_editpost'),
+    path('async/deletepost/<int:post_id>/', async_delete_post, name='async_deletepost'),
 ]
@@ -0,0 +1,39 @@
+import logging
+
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .tasks import task
+
+logger = logging.getLogger(__name__)
+# Audit lines get their own logger so they can be routed apart from errors
+audit_logger = logging.getLogger('core.audit')
+
+LOGIN = 'login'
+REGISTER = 'register'
+GOOGLE_LOGIN = 'google_login'
+
+
+@task
+def record_auth_event(event, user_id, ip=None, user_agent='', at=None):
+    """Stamps last_login and writes the audit line for a sign-in or sign-up"""
+    at = parse_datetime(at) if at else timezone.now()
+    get_user_model()._default_manager.filter(pk=user_id).update(last_login=at)
+    audit_logger.info(
+        f'event={event} user_id={user_id} ip={ip or "-"} at={at.isoformat()} user_agent="{user_agent[:200]}"',
+        extra={'audit': {'event': event, 'user_id': user_id, 'ip': ip, 'at': at.isoformat()}},
+    )
+
+
+def audit_auth_event(request, event, user):
+    """Queues record_auth_event for `user` without ever failing the sign-in itself"""
+    try:
+        record_auth_event.enqueue(
+            event, user.pk,
+            ip=request.META.get('REMOTE_ADDR'),
+            user_agent=request.META.get('HTTP_USER_AGENT', ''),
+            at=timezone.now().isoformat(),
+        )
+    except Exception as e:
+        logger.error(f"Erro ao enfileirar auditoria de {event}: {str(e)}", exc_info=True)
@@ -0,0 +1,119 @@
+"""
+Helpers shared by the bench command and the scripts in benchmarks/: a
+throwaway seeded database and servers started against it, so the project's
+db.sqlite3 is never touched.
+"""
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from contextlib import contextmanager
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+
+BENCH_PASSWORD = 'bench-pass-123'
+
+# Runs after `manage.py seed_posts`; prints each seeded user's token and some of its post ids
+ACCOUNTS_SCRIPT = """
+import json
+from django.contrib.auth import get_user_model
+from core.utils.jwt_auth import UserRefreshToken
+users = get_user_model().objects.filter(username__startswith='bench').order_by('id')
+print(json.dumps([
+    {{
+        'username': user.username,
+        'email': user.email,
+        'token': str(UserRefreshToken.for_user(user).access_token),
+        'posts': list(user.posts.order_by('id').values_list('id', flat=True)[:{sample}]),
+    }}
+    for user in users
+]))
+"""
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_up(base_url, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(f'{base_url}/health/', timeout=1)
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f'Server at {base_url} did not come up')
+
+
+def manage(env, *args):
+    return subprocess.run(
+        [sys.executable, 'manage.py', *args], cwd=BASE_DIR, env=env,
+        check=True, capture_output=True, text=True,
+    ).stdout
+
+
+def bench_env(database_path, **extra):
+    return {
+        **os.environ,
+        'SQLITE_PATH': str(database_path),
+        'DEBUG': 'False',
+        'SECRET_KEY': 'benchmark-secret-key-with-enough-length-for-hs256',
+        'ALLOWED_HOSTS': '127.0.0.1,localhost',
+        # Every client shares one IP and a few accounts; limits would only measure 429s
+        'API_THROTTLING_ENABLED': 'False',
+        **extra,
+    }
+
+
+def seed_accounts(env, users, posts, sample=0):
+    """
+    Migrates and seeds the database in `env` with `users` users and `posts`
+    posts spread across them. Returns one dict per user with its username,
+    email, an access token and the ids of up to `sample` of its posts.
+    """
+    manage(env, 'migrate', '--noinput')
+    manage(
+        env, 'seed_posts', '--users', str(users), '--posts', str(posts), '--user-prefix', 'bench',
+        '--password', BENCH_PASSWORD, '--distribution', 'uniform', '--seed', '1',
+    )
+    script = ACCOUNTS_SCRIPT.format(sample=sample)
+    return json.loads(manage(env, 'shell', '-c', script).strip().splitlines()[-1])
+
+
+def seed_database(env, posts):
+    """Migrates and seeds the database in `env`; returns an access token for the seeded user"""
+    return seed_accounts(env, 1, posts)[0]['token']
+
+
+@contextmanager
+def running_server(command, env, port):
+    """Starts `command` and yields its base URL once /health/ answers"""
+    base_url = f'http://127.0.0.1:{port}'
+    server = subprocess.Popen(command, cwd=BASE_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_until_up(base_url)
+        yield base_url
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+
+def gunicorn_command(port, workers, threads=1):
+    return [
+        'gunicorn', 'codeleap_backend_django.wsgi', '-b', f'127.0.0.1:{port}',
+        '-w', str(workers), '--threads', str(threads),
+    ]
+
+
+def uvicorn_command(port, workers):
+    return [
+        'uvicorn', 'codeleap_backend_django.asgi:application', '--port', str(port),
+        '--workers', str(workers), '--no-access-log',
+    ]
@@ -0,0 +1,120 @@
+"""
+Incremental sync over the post change sequence.
+
+Every insert, edit and soft delete of a post stamps it with the next
+change_seq (see core.models.post.NextChangeSeq), so "everything that changed
+after N" is one range scan of post_changes_idx. Deleted posts stay behind as
+tombstones until `manage.py purge_tombstones` removes them; each purge is
+recorded in PostPurge, and clients whose last sync predates one are told to
+start over because the tombstones they needed are gone.
+"""
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models.signals import pre_delete
+from django.dispatch import receiver
+
+from ..models.post import Post
+from ..models.purge import PostPurge
+from ..serializers import POST_VALUES, represent_rows
+
+CHANGE_VALUES = POST_VALUES + ('change_seq', 'deleted_at')
+
+
+class ChangesExpired(Exception):
+    """`since` predates a purge; the client has to sync again from 0"""
+
+    def __init__(self, horizon):
+        super().__init__(horizon)
+        self.horizon = horizon
+
+
+def change_marks(using):
+    """
+    (high_water, horizon) in one query: the highest sequence number handed
+    out so far, counting purged ones, and the highest purged one.
+    """
+    connection = connections[using]
+    post_table = connection.ops.quote_name(Post._meta.db_table)
+    purge_table = connection.ops.quote_name(PostPurge._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT (SELECT MAX(change_seq) FROM {post_table}), '
+            f'(SELECT MAX(through_seq) FROM {purge_table})'
+        )
+        last_seq, horizon = cursor.fetchone()
+    return max(last_seq or 0, horizon or 0), horizon or 0
+
+
+def changes_page(since, limit, using):
+    """
+    Posts changed after `since` in change order: at most `limit` of them,
+    except that rows sharing a sequence number (one bulk statement) are never
+    split across pages. Returns (rows, until, has_more); the next call should
+    pass `until` as its `since`. Raises ChangesExpired when `since` is older
+    than the last purge; since=0 is a full sync and always allowed.
+
+    The marks are read before the rows. A write that commits in between gets
+    a sequence number above high_water, so it is either in this page or
+    picked up by the next one.
+    """
+    high_water, horizon = change_marks(using)
+    if 0 < since < horizon:
+        raise ChangesExpired(horizon)
+    queryset = Post.all_objects.using(using).order_by('change_seq', 'id')
+    rows = list(queryset.filter(change_seq__gt=since).values_list(*CHANGE_VALUES, named=True)[:limit + 1])
+    has_more = len(rows) > limit
+    if has_more:
+        rows, extra = rows[:limit], rows[limit]
+        last = rows[-1]
+        if extra.change_seq == last.change_seq:
+            rows += queryset.filter(change_seq=last.change_seq, id__gt=last.id).values_list(*CHANGE_VALUES, named=True)
+        return rows, last.change_seq, True
+    until = max(since, high_water, rows[-1].change_seq if rows else 0)
+    return rows, until, False
+
+
+def represent_changes(rows):
+    """Live posts in the usual representation, deleted ones as tombstones"""
+    results = []
+    for row in rows:
+        if row.deleted_at is not None:
+            results.append({'id': row.id, 'deleted': True, 'deleted_at': row.deleted_at, 'change_seq': row.change_seq})
+        else:
+            post, = represent_rows([row[:len(POST_VALUES)]])
+            results.append({**post, 'deleted': False, 'change_seq': row.change_seq})
+    return results
+
+
+def purge_tombstones(before, batch_size=1000, using='default', dry_run=False):
+    """
+    Removes tombstones deleted before `before`, oldest changes first, in
+    transactions of `batch_size` rows. Each batch moves the purge horizon
+    forward in the same transaction, so a client can never miss a deletion
+    without being told to resync. Returns how many were (or would be) removed.
+    """
+    tombstones = Post.all_objects.using(using).filter(deleted_at__lt=before)
+    if dry_run:
+        return tombstones.count()
+    purge, purged = None, 0
+    while True:
+        with transaction.atomic(using=using):
+            batch = list(tombstones.order_by('change_seq', 'id').values_list('id', 'change_seq')[:batch_size])
+            if not batch:
+                return purged
+            Post.all_objects.using(using).filter(id__in=[post_id for post_id, _ in batch]).delete()
+            purged += len(batch)
+            through_seq = max(seq for _, seq in batch)
+            if purge is None:
+                purge = PostPurge.objects.using(using).create(through_seq=through_seq, purged=purged)
+            else:
+                PostPurge.objects.using(using).filter(pk=purge.pk).update(through_seq=through_seq, purged=purged)
+
+
+@receiver(pre_delete, sender=settings.AUTH_USER_MODEL)
+def _detach_deleted_users_posts(sender, instance, using, **kwargs):
+    """
+    A deleted user's posts leave the feed as tombstones, so /posts/changes/
+    reports them. The author FK is SET_NULL, so the rows survive the delete
+    and are detached from the user afterwards.
+    """
+    Post.objects.using(using).filter(author_id=instance.pk).soft_delete()
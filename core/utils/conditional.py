@@ -0,0 +1,74 @@
+import hashlib
+
+from asgiref.sync import sync_to_async
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, parse_etags, quote_etag
+
+from .changes import change_marks
+
+
+def feed_validators(queryset, variant=''):
+    """
+    The ETag of a feed read through `queryset`, without materializing rows.
+
+    It is built from the change sequence high-water mark of the queryset's
+    database: every create, edit and soft delete moves it forward and a
+    purge never moves it back. `variant` separates representations of the
+    same data, e.g. different pages of the feed. There is no Last-Modified:
+    HTTP dates have one-second resolution, so If-Modified-Since alone would
+    miss a second write within the same second.
+    """
+    high_water, _ = change_marks(queryset.db)
+    return _etag(high_water, variant)
+
+
+async def afeed_validators(queryset, variant=''):
+    high_water, _ = await sync_to_async(change_marks)(queryset.db)
+    return _etag(high_water, variant)
+
+
+def _etag(high_water, variant):
+    marker = f'{high_water}:{variant}'
+    return quote_etag(hashlib.md5(marker.encode(), usedforsecurity=False).hexdigest())
+
+
+def not_modified_response(request, etag, last_modified=None):
+    """Returns a 304 (or 412) response when the request's validators match, else None"""
+    return get_conditional_response(request, etag=etag, last_modified=last_modified)
+
+
+def set_validators(response, etag, last_modified=None):
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    # Browsers may keep the body but must revalidate it on every poll
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def version_etag(version):
+    """Strong ETag of a post at `version`; PATCH accepts it back in If-Match"""
+    return quote_etag(f'v{version}')
+
+
+def expected_versions(if_match, body_version):
+    """
+    Versions of the post an edit may apply to, from the If-Match header
+    and/or a `version` field in the body: None when neither constrains the
+    edit, otherwise a set that is empty when nothing can match. Raises
+    ValueError for a body version that is not a positive integer.
+    """
+    versions = None
+    if if_match and if_match.strip() != '*':
+        versions = set()
+        for etag in parse_etags(if_match):
+            # CompressionMiddleware sends our ETags weakened; the version is the same
+            tag = etag.removeprefix('W/').strip('"')
+            if tag[:1] == 'v' and tag[1:].isdigit():
+                versions.add(int(tag[1:]))
+    if body_version is not None:
+        if isinstance(body_version, bool) or not str(body_version).isdigit() or int(body_version) < 1:
+            raise ValueError('A versão precisa ser um inteiro positivo.')
+        body = {int(body_version)}
+        versions = body if versions is None else versions & body
+    return versions
@@ -0,0 +1,101 @@
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+STICKY_COOKIE = 'posts_primary'
+STICKY_KEY_PREFIX = 'posts-primary:user'
+
+
+class RoutingState:
+    """Per-request routing flags, shared by reference with threads the request spawns"""
+
+    def __init__(self, pinned=False):
+        self.pinned = pinned
+        self.wrote = False
+
+
+_state = ContextVar('posts_routing_state', default=None)
+
+
+def begin_request(pinned):
+    state = RoutingState(pinned)
+    return state, _state.set(state)
+
+
+def resume_request(state):
+    """Makes `state` current again, e.g. while a streaming response body is produced"""
+    return _state.set(state)
+
+
+def end_request(token):
+    _state.reset(token)
+
+
+def pin_to_primary():
+    """Sends the rest of the current request's reads to the primary and marks it as a writer"""
+    state = _state.get()
+    if state is not None:
+        state.pinned = True
+        state.wrote = True
+
+
+def is_pinned():
+    state = _state.get()
+    return state is not None and state.pinned
+
+
+def pin_user(user_id, seconds):
+    """Keeps reads of the token user `user_id` on the primary for `seconds`, in every worker"""
+    sticky_cache().set(f'{STICKY_KEY_PREFIX}:{user_id}', 1, seconds)
+
+
+def is_user_pinned(user_id):
+    return sticky_cache().get(f'{STICKY_KEY_PREFIX}:{user_id}') is not None
+
+
+def sticky_cache():
+    return caches[getattr(settings, 'POSTS_READ_STICKY_CACHE', 'default')]
+
+
+def primary_database():
+    return getattr(settings, 'POSTS_PRIMARY_DATABASE', 'default')
+
+
+def read_databases():
+    return getattr(settings, 'POSTS_READ_DATABASES', [])
+
+
+class PostReplicaRouter:
+    """
+    Sends Post reads to a random alias in POSTS_READ_DATABASES and Post
+    writes to POSTS_PRIMARY_DATABASE. Reads stay on the primary while the
+    request is pinned: unsafe methods, and requests that carry the sticky
+    marker set after a write, so a client always sees its own writes even
+    if the replicas lag. Other models keep Django's default routing.
+    """
+
+    def _routes(self, model):
+        from ..models.post import Post
+        return model is Post
+
+    def db_for_read(self, model, **hints):
+        if not self._routes(model):
+            return None
+        replicas = read_databases()
+        if not replicas or is_pinned():
+            return primary_database()
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        if not self._routes(model):
+            return None
+        return primary_database()
+
+    def allow_relation(self, obj1, obj2, **hints):
+        aliases = {primary_database(), *read_databases()}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
@@ -0,0 +1,205 @@
+import threading
+import time
+from collections import OrderedDict
+
+from asgiref.sync import sync_to_async
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+
+KEY_PREFIX = 'posts-feed'
+VERSION_KEY = f'{KEY_PREFIX}:version'
+DEFAULTS = {
+    'ENABLED': True,
+    'BACKEND': 'local',
+    'ALIAS': 'default',
+    'MAX_ENTRIES': 256,
+    'TIMEOUT': 60,
+}
+_MISSING = object()
+
+
+class LocalLRUBackend:
+    """Per-process LRU with a TTL. The feed version lives in process memory."""
+
+    def __init__(self, max_entries, timeout):
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._version = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return _MISSING
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return _MISSING
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.timeout, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_version(self):
+        return self._version
+
+    # Everything is in memory, so the async API never leaves the event loop
+    async def aget(self, key):
+        return self.get(key)
+
+    async def aset(self, key, value):
+        self.set(key, value)
+
+    async def aget_version(self):
+        return self._version
+
+    def bump_version(self):
+        with self._lock:
+            self._version += 1
+            # Entries of older versions can never be read again
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class DjangoCacheBackend:
+    """
+    Stores pages and the feed version in a Django cache alias so several
+    gunicorn workers share them (e.g. FileBasedCache or DatabaseCache).
+    Size bounds and eviction come from the alias' own MAX_ENTRIES/CULL options.
+    """
+
+    def __init__(self, alias, timeout):
+        from django.core.cache import caches
+        self.cache = caches[alias]
+        self.timeout = timeout
+
+    def get(self, key):
+        return self.cache.get(key, _MISSING)
+
+    def set(self, key, value):
+        self.cache.set(key, value, self.timeout)
+
+    def get_version(self):
+        version = self.cache.get(VERSION_KEY)
+        if version is None:
+            version = time.time_ns()
+            if not self.cache.add(VERSION_KEY, version, None):
+                version = self.cache.get(VERSION_KEY, version)
+        return version
+
+    async def aget(self, key):
+        return await self.cache.aget(key, _MISSING)
+
+    async def aset(self, key, value):
+        await self.cache.aset(key, value, self.timeout)
+
+    async def aget_version(self):
+        version = await self.cache.aget(VERSION_KEY)
+        if version is None:
+            version = await sync_to_async(self.get_version)()
+        return version
+
+    def bump_version(self):
+        # A fresh timestamp instead of incr(): file and DB caches do not incr
+        # atomically, and two racing bumps must never collapse into one value.
+        self.cache.set(VERSION_KEY, time.time_ns(), None)
+
+    def __len__(self):
+        return 0
+
+
+class FeedCache:
+    """
+    Read-through cache for feed pages. Keys combine the global feed version
+    with the page cursor, so a write only has to bump the version to make
+    every cached page unreachable.
+
+    The version only moves in the process that wrote when the backend is
+    local, so callers also pass a `marker` read from the database (the feed
+    ETag): a page cached before another worker's write is then never served
+    under the validators of the data after it.
+    """
+
+    def __init__(self, backend, enabled=True):
+        self.backend = backend
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get_or_set(self, cursor, page_size, compute, marker=''):
+        if not self.enabled:
+            return compute()
+        key = self._key(self.backend.get_version(), marker, cursor, page_size)
+        value = self.backend.get(key)
+        if value is not _MISSING:
+            self._count(hit=True)
+            return value
+        self._count(hit=False)
+        value = compute()
+        self.backend.set(key, value)
+        return value
+
+    async def aget_or_set(self, cursor, page_size, acompute, marker=''):
+        if not self.enabled:
+            return await acompute()
+        key = self._key(await self.backend.aget_version(), marker, cursor, page_size)
+        value = await self.backend.aget(key)
+        if value is not _MISSING:
+            self._count(hit=True)
+            return value
+        self._count(hit=False)
+        value = await acompute()
+        await self.backend.aset(key, value)
+        return value
+
+    @staticmethod
+    def _key(version, marker, cursor, page_size):
+        return f'{KEY_PREFIX}:v{version}:{marker}:{page_size or "all"}:{cursor or ""}'
+
+    def invalidate(self):
+        self.backend.bump_version()
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'entries': len(self.backend)}
+
+    def _count(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+
+_feed_cache = None
+
+
+def get_feed_cache():
+    global _feed_cache
+    if _feed_cache is None:
+        options = {**DEFAULTS, **getattr(settings, 'POSTS_FEED_CACHE', {})}
+        if options['BACKEND'] == 'django':
+            backend = DjangoCacheBackend(options['ALIAS'], options['TIMEOUT'])
+        else:
+            backend = LocalLRUBackend(options['MAX_ENTRIES'], options['TIMEOUT'])
+        _feed_cache = FeedCache(backend, enabled=options['ENABLED'])
+    return _feed_cache
+
+
+@receiver(setting_changed)
+def _reset_feed_cache(*, setting, **kwargs):
+    global _feed_cache
+    if setting in ('POSTS_FEED_CACHE', 'CACHES'):
+        _feed_cache = None
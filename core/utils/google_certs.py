@@ -0,0 +1,136 @@
+import logging
+import re
+import threading
+import time
+from concurrent.futures import Future
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+
+logger = logging.getLogger(__name__)
+
+GOOGLE_CERTS_URL = 'https://www.googleapis.com/oauth2/v1/certs'
+GOOGLE_ISSUERS = ('accounts.google.com', 'https://accounts.google.com')
+_MAX_AGE = re.compile(r'max-age=(\d+)')
+
+
+class GoogleCertsCache:
+    """
+    Process-wide cache of Google's ID token signing certificates.
+
+    Certificates are kept for the max-age of the certs response and fetched
+    through a single pooled HTTP session. Reads inside `refresh_margin`
+    seconds of expiry trigger a background refresh so logins never wait on
+    Google while the cache is warm, and concurrent refreshes are coalesced
+    into one fetch.
+    """
+
+    def __init__(self, url=GOOGLE_CERTS_URL, refresh_margin=300, default_max_age=300, timeout=10,
+                 min_forced_refresh_interval=60):
+        self.url = url
+        self.refresh_margin = refresh_margin
+        self.default_max_age = default_max_age
+        self.timeout = timeout
+        self.min_forced_refresh_interval = min_forced_refresh_interval
+        self._session = None
+        self._certs = None
+        self._expires_at = 0.0
+        self._fetched_at = float('-inf')
+        self._inflight = None
+        self._lock = threading.Lock()
+
+    def get_certs(self):
+        now = time.monotonic()
+        certs, expires_at = self._certs, self._expires_at
+        if certs is not None and now < expires_at:
+            if now >= expires_at - self.refresh_margin:
+                self._refresh_in_background()
+            return certs
+        return self.refresh()
+
+    def refresh(self):
+        """Fetches the certificates, joining a fetch already in flight"""
+        with self._lock:
+            future = self._inflight
+            leader = future is None
+            if leader:
+                future = self._inflight = Future()
+        if leader:
+            try:
+                certs, max_age = self._fetch()
+                self._fetched_at = time.monotonic()
+                self._certs, self._expires_at = certs, self._fetched_at + max_age
+                future.set_result(certs)
+            except Exception as e:
+                future.set_exception(e)
+            finally:
+                with self._lock:
+                    self._inflight = None
+        return future.result(timeout=self.timeout)
+
+    def verify_oauth2_token(self, token, audience, clock_skew_in_seconds=0):
+        """
+        Local equivalent of google.oauth2.id_token.verify_oauth2_token.
+        Raises ValueError for any token that does not verify.
+        """
+        from google.auth import jwt
+
+        certs = self.get_certs()
+        try:
+            idinfo = jwt.decode(token, certs=certs, audience=audience, clock_skew_in_seconds=clock_skew_in_seconds)
+        except ValueError as e:
+            # An unknown key id usually means Google rotated its keys. Forced
+            # refreshes are rate limited so bogus key ids cannot make every
+            # login hit Google.
+            recently_fetched = time.monotonic() - self._fetched_at < self.min_forced_refresh_interval
+            if 'Certificate for key id' not in str(e) or recently_fetched:
+                raise
+            idinfo = jwt.decode(token, certs=self.refresh(), audience=audience, clock_skew_in_seconds=clock_skew_in_seconds)
+        if idinfo.get('iss') not in GOOGLE_ISSUERS:
+            raise ValueError(f"Wrong issuer. 'iss' should be one of {GOOGLE_ISSUERS}")
+        return idinfo
+
+    def _refresh_in_background(self):
+        if self._inflight is None:
+            threading.Thread(target=self._refresh_quietly, daemon=True).start()
+
+    def _refresh_quietly(self):
+        try:
+            self.refresh()
+        except Exception as e:
+            logger.warning(f"Erro ao atualizar certificados do Google: {str(e)}")
+
+    def _fetch(self):
+        response = self._get_session().get(self.url, timeout=self.timeout)
+        response.raise_for_status()
+        match = _MAX_AGE.search(response.headers.get('Cache-Control', ''))
+        max_age = int(match.group(1)) if match else self.default_max_age
+        return response.json(), max_age
+
+    def _get_session(self):
+        if self._session is None:
+            import requests
+            self._session = requests.Session()
+        return self._session
+
+
+_google_certs = None
+
+
+def get_google_certs():
+    global _google_certs
+    if _google_certs is None:
+        _google_certs = GoogleCertsCache(
+            url=getattr(settings, 'GOOGLE_CERTS_URL', GOOGLE_CERTS_URL),
+            refresh_margin=getattr(settings, 'GOOGLE_CERTS_REFRESH_MARGIN', 300),
+        )
+    return _google_certs
+
+
+@receiver(setting_changed)
+def _reset_google_certs(*, setting, **kwargs):
+    global _google_certs
+    if setting in ('GOOGLE_CERTS_URL', 'GOOGLE_CERTS_REFRESH_MARGIN'):
+        _google_certs = None
@@ -0,0 +1,263 @@
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.signals import setting_changed
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils.functional import cached_property
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+
+USERNAME_CLAIM = 'username'
+DEFAULTS = {
+    'TIMEOUT': 30,
+    'MAX_ENTRIES': 10000,
+}
+_MISSING = object()
+
+
+class UserRefreshToken(RefreshToken):
+    """Refresh token whose claims, and those of its access tokens, include the username"""
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token[USERNAME_CLAIM] = user.get_username()
+        return token
+
+
+class UserTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """Lets dj_rest_auth issue the same tokens as the core auth views"""
+    token_class = UserRefreshToken
+
+
+class LazyTokenUser(TokenUser):
+    """
+    request.user built from the access token: `id` and `username` come from
+    its claims. Anything else, including is_staff and permissions, loads the
+    User row on first access, once per request.
+    """
+
+    @cached_property
+    def user(self):
+        return get_user_model()._default_manager.get(**{api_settings.USER_ID_FIELD: self.id})
+
+    def __str__(self):
+        return self.username
+
+    def __getattr__(self, attr):
+        # Never triggers a query for dunder lookups (copy, pickle, hasattr probes)
+        if attr.startswith('__') or attr in ('token', 'user'):
+            raise AttributeError(attr)
+        return getattr(self.user, attr)
+
+    @cached_property
+    def is_staff(self):
+        return self.user.is_staff
+
+    @cached_property
+    def is_superuser(self):
+        return self.user.is_superuser
+
+    @property
+    def groups(self):
+        return self.user.groups
+
+    @property
+    def user_permissions(self):
+        return self.user.user_permissions
+
+    def get_group_permissions(self, obj=None):
+        return self.user.get_group_permissions(obj)
+
+    def get_all_permissions(self, obj=None):
+        return self.user.get_all_permissions(obj)
+
+    def has_perm(self, perm, obj=None):
+        return self.user.has_perm(perm, obj)
+
+    def has_perms(self, perm_list, obj=None):
+        return self.user.has_perms(perm_list, obj)
+
+    def has_module_perms(self, module):
+        return self.user.has_module_perms(module)
+
+
+def user_instance(user):
+    """The User model instance behind request.user, loading it for a LazyTokenUser"""
+    return user.user if isinstance(user, LazyTokenUser) else user
+
+
+async def auser_instance(user):
+    if not isinstance(user, LazyTokenUser):
+        return user
+    if 'user' not in user.__dict__:
+        user.__dict__['user'] = await get_user_model()._default_manager.aget(
+            **{api_settings.USER_ID_FIELD: user.id}
+        )
+    return user.user
+
+
+class ActiveUserCache:
+    """
+    Per-process TTL memo of User.is_active by id (None for missing users), so
+    authenticating a token does not read the users table on every request.
+    Saving or deleting a user drops its entry in this process; other
+    processes pick the change up within TIMEOUT seconds. Ids are keyed as
+    strings, the form token claims carry them in.
+    """
+
+    def __init__(self, timeout, max_entries):
+        self.timeout = timeout
+        self.max_entries = max_entries
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def is_active(self, user_id):
+        value = self._get(user_id)
+        if value is _MISSING:
+            value = self._set(user_id, self._queryset(user_id).first())
+        return value
+
+    async def ais_active(self, user_id):
+        value = self._get(user_id)
+        if value is _MISSING:
+            value = self._set(user_id, await self._queryset(user_id).afirst())
+        return value
+
+    def invalidate(self, user_id=None):
+        with self._lock:
+            if user_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(str(user_id), None)
+
+    @staticmethod
+    def _queryset(user_id):
+        return get_user_model()._default_manager.filter(
+            **{api_settings.USER_ID_FIELD: user_id}
+        ).values_list('is_active', flat=True)
+
+    def _get(self, user_id):
+        with self._lock:
+            entry = self._entries.get(str(user_id))
+        if entry is None or entry[0] <= time.monotonic():
+            return _MISSING
+        return entry[1]
+
+    def _set(self, user_id, value):
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                self._entries.clear()
+            self._entries[str(user_id)] = (time.monotonic() + self.timeout, value)
+        return value
+
+
+_active_users = None
+
+
+def get_active_user_cache():
+    global _active_users
+    if _active_users is None:
+        options = {**DEFAULTS, **getattr(settings, 'JWT_ACTIVE_USER_CACHE', {})}
+        _active_users = ActiveUserCache(options['TIMEOUT'], options['MAX_ENTRIES'])
+    return _active_users
+
+
+@receiver(setting_changed)
+def _reset_active_user_cache(*, setting, **kwargs):
+    global _active_users
+    if setting == 'JWT_ACTIVE_USER_CACHE':
+        _active_users = None
+
+
+# Bound to the user model only: any post_delete receiver for Post would
+# turn its single-statement deletes into SELECT + DELETE
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def _forget_user(sender, instance, **kwargs):
+    if _active_users is not None:
+        _active_users.invalidate(getattr(instance, api_settings.USER_ID_FIELD))
+
+
+class CachedTokenUserAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication without the per-request user query. Tokens that carry
+    the username claim authenticate as a LazyTokenUser after an is_active
+    check served from ActiveUserCache; older tokens load the user as before.
+    """
+
+    def get_user(self, validated_token):
+        if USERNAME_CLAIM not in validated_token:
+            return super().get_user(validated_token)
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken('O token não contém identificação de usuário')
+        is_active = get_active_user_cache().is_active(user_id)
+        if is_active is None:
+            raise AuthenticationFailed('Usuário não encontrado', code='user_not_found')
+        if not is_active:
+            raise AuthenticationFailed('Usuário inativo', code='user_inactive')
+        return api_settings.TOKEN_USER_CLASS(validated_token)
+
+
+async def aauthenticate_jwt(request, allow_query_token=False):
+    """
+    Resolves the user behind the request's bearer token for plain async
+    Django views that do not go through DRF. Returns a LazyTokenUser for
+    tokens with the username claim and the User row for older ones, or
+    None when the token is missing or invalid or the user is inactive.
+
+    `allow_query_token` also accepts `?token=`, for clients such as
+    EventSource that cannot set an Authorization header.
+    """
+    validated_token = _validated_token(JWTAuthentication(), request, allow_query_token)
+    if validated_token is None:
+        return None
+    try:
+        user_id = validated_token[api_settings.USER_ID_CLAIM]
+    except KeyError:
+        return None
+    if USERNAME_CLAIM in validated_token:
+        if not await get_active_user_cache().ais_active(user_id):
+            return None
+        return api_settings.TOKEN_USER_CLASS(validated_token)
+    User = get_user_model()
+    try:
+        user = await User.objects.aget(**{api_settings.USER_ID_FIELD: user_id})
+    except User.DoesNotExist:
+        return None
+    return user if user.is_active else None
+
+
+def token_user_id(request):
+    """
+    The user id claim of the request's bearer token, or None when there is
+    no valid one. Only checks the token itself; the user is not loaded.
+    """
+    validated_token = _validated_token(JWTAuthentication(), request, False)
+    if validated_token is None:
+        return None
+    return validated_token.get(api_settings.USER_ID_CLAIM)
+
+
+def _validated_token(authentication, request, allow_query_token):
+    header = authentication.get_header(request)
+    raw_token = authentication.get_raw_token(header) if header is not None else None
+    if raw_token is None and allow_query_token:
+        raw_token = request.GET.get('token') or None
+    if raw_token is None:
+        return None
+    try:
+        return authentication.get_validated_token(raw_token)
+    except InvalidToken:
+        return None
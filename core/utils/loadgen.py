@@ -0,0 +1,169 @@
+import http.client
+import json
+import random
+import threading
+import time
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+
+class Operation:
+    """
+    One weighted kind of request in a load mix. `build(worker)` returns
+    (method, path, body) or None to skip a turn; `on_response` lets an
+    operation keep state, e.g. ids of posts it created.
+    """
+
+    def __init__(self, name, weight, build, on_response=None):
+        self.name = name
+        self.weight = weight
+        self.build = build
+        self.on_response = on_response
+
+
+class Worker:
+    def __init__(self, index, base_url, headers, rng):
+        parts = urlsplit(base_url)
+        self.index = index
+        self.random = rng
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.headers = dict(headers)
+        self.state = {}
+        self.connection = None
+
+    def request(self, method, path, body=None, headers=None):
+        payload = json.dumps(body).encode() if body is not None else None
+        request_headers = {**self.headers, **(headers or {})}
+        if payload is not None:
+            request_headers['Content-Type'] = 'application/json'
+        for attempt in range(2):
+            if self.connection is None:
+                self.connection = http.client.HTTPConnection(self.host, self.port, timeout=30)
+            try:
+                self.connection.request(method, path, body=payload, headers=request_headers)
+                response = self.connection.getresponse()
+                return response.status, response.read()
+            except (http.client.HTTPException, ConnectionError, OSError):
+                # The server closed a keep-alive connection; retry once on a new one
+                self.close()
+                if attempt:
+                    raise
+        return None
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarize(latencies, statuses, errors, elapsed):
+    """
+    Error rates are over attempted requests: those that got a response plus
+    those that raised (connection refused, reset, timeout) and so have no latency.
+    """
+    completed = sum(len(values) for values in latencies.values())
+    attempted = completed + sum(errors.values())
+    report = {
+        'requests': attempted,
+        'elapsed_seconds': round(elapsed, 3),
+        'throughput_rps': round(completed / elapsed, 2) if elapsed else 0,
+        'operations': {},
+    }
+    for name in sorted(set(latencies) | set(errors)):
+        values = sorted(latencies.get(name, []))
+        sent = len(values) + errors.get(name, 0)
+        failed = errors.get(name, 0) + sum(
+            count for code, count in statuses[name].items() if code >= 400
+        )
+        report['operations'][name] = {
+            'requests': sent,
+            'errors': failed,
+            'error_rate': round(failed / sent, 4) if sent else 0,
+            'statuses': {str(code): count for code, count in sorted(statuses[name].items())},
+            'p50_ms': _ms(percentile(values, 0.50)),
+            'p95_ms': _ms(percentile(values, 0.95)),
+            'p99_ms': _ms(percentile(values, 0.99)),
+        }
+    all_values = sorted(value for values in latencies.values() for value in values)
+    all_errors = sum(op['errors'] for op in report['operations'].values())
+    report.update({
+        'errors': all_errors,
+        'error_rate': round(all_errors / attempted, 4) if attempted else 0,
+        'p50_ms': _ms(percentile(all_values, 0.50)),
+        'p95_ms': _ms(percentile(all_values, 0.95)),
+        'p99_ms': _ms(percentile(all_values, 0.99)),
+    })
+    return report
+
+
+def run_load(base_url, operations, concurrency=10, duration=None, requests=None,
+             headers_for_worker=None, seed=None):
+    """
+    Drives `operations` against `base_url` from `concurrency` threads, each
+    with its own keep-alive connection, until `duration` seconds elapsed or
+    `requests` requests were sent. Returns the summary report as a dict.
+    """
+    if duration is None and requests is None:
+        raise ValueError('Either duration or requests is required')
+    weights = [operation.weight for operation in operations]
+    latencies, errors = defaultdict(list), defaultdict(int)
+    statuses = defaultdict(lambda: defaultdict(int))
+    lock = threading.Lock()
+    budget = {'remaining': requests}
+    start = time.perf_counter()
+    deadline = start + duration if duration is not None else None
+
+    def take_turn():
+        with lock:
+            if budget['remaining'] is None:
+                return True
+            if budget['remaining'] <= 0:
+                return False
+            budget['remaining'] -= 1
+            return True
+
+    def drive(index):
+        rng = random.Random(None if seed is None else seed + index)
+        headers = headers_for_worker(index) if headers_for_worker else {}
+        worker = Worker(index, base_url, headers, rng)
+        try:
+            while (deadline is None or time.perf_counter() < deadline) and take_turn():
+                operation = rng.choices(operations, weights)[0]
+                planned = operation.build(worker)
+                if planned is None:
+                    continue
+                method, path, body = planned
+                sent = time.perf_counter()
+                try:
+                    status, content = worker.request(method, path, body)
+                except Exception:
+                    with lock:
+                        errors[operation.name] += 1
+                    continue
+                latency = time.perf_counter() - sent
+                with lock:
+                    latencies[operation.name].append(latency)
+                    statuses[operation.name][status] += 1
+                if operation.on_response is not None:
+                    operation.on_response(worker, status, content)
+        finally:
+            worker.close()
+
+    threads = [threading.Thread(target=drive, args=(index,), daemon=True) for index in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return summarize(latencies, statuses, errors, time.perf_counter() - start)
+
+
+def _ms(seconds):
+    return None if seconds is None else round(seconds * 1000, 2)
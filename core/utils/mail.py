@@ -0,0 +1,82 @@
+import base64
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+
+from .tasks import task
+
+
+def serialize_message(message):
+    """JSON-safe form of an EmailMessage, or None when it carries MIME objects that cannot be rebuilt"""
+    attachments = []
+    for attachment in message.attachments:
+        if not isinstance(attachment, tuple):
+            return None
+        filename, content, mimetype = attachment
+        if isinstance(content, str):
+            content = content.encode()
+        attachments.append([filename, base64.b64encode(content).decode('ascii'), mimetype])
+    return {
+        'subject': message.subject,
+        'body': message.body,
+        'from_email': message.from_email,
+        'to': list(message.to),
+        'cc': list(message.cc),
+        'bcc': list(message.bcc),
+        'reply_to': list(message.reply_to),
+        'headers': dict(message.extra_headers),
+        'content_subtype': message.content_subtype,
+        'alternatives': [list(alternative) for alternative in getattr(message, 'alternatives', [])],
+        'attachments': attachments,
+    }
+
+
+def deserialize_message(data):
+    message = EmailMultiAlternatives(
+        subject=data['subject'], body=data['body'], from_email=data['from_email'],
+        to=data['to'], cc=data['cc'], bcc=data['bcc'], reply_to=data['reply_to'],
+        headers=data['headers'], alternatives=[tuple(alternative) for alternative in data['alternatives']],
+    )
+    message.content_subtype = data['content_subtype']
+    for filename, content, mimetype in data['attachments']:
+        message.attach(filename, base64.b64decode(content), mimetype)
+    return message
+
+
+def delivery_connection(**kwargs):
+    backend = getattr(settings, 'QUEUED_EMAIL_BACKEND', 'django.core.mail.backends.smtp.EmailBackend')
+    return get_connection(backend=backend, **kwargs)
+
+
+@task(max_retries=5, retry_backoff=30)
+def send_queued_email(messages):
+    """Delivers serialized messages through QUEUED_EMAIL_BACKEND; failures are retried by the queue"""
+    delivery_connection(fail_silently=False).send_messages([deserialize_message(data) for data in messages])
+
+
+class QueuedEmailBackend(BaseEmailBackend):
+    """
+    EMAIL_BACKEND that returns right away and leaves delivery to the task
+    queue, so a slow SMTP server no longer holds up the request that sent the
+    mail (allauth's verification emails, for instance). The real backend is
+    QUEUED_EMAIL_BACKEND. Messages with attachments that are MIME objects
+    cannot be queued and are delivered inline.
+    """
+
+    def send_messages(self, email_messages):
+        queued, inline = [], []
+        for message in email_messages:
+            if not message.recipients():
+                continue
+            data = serialize_message(message)
+            if data is None:
+                inline.append(message)
+            else:
+                queued.append(data)
+        if queued:
+            send_queued_email.enqueue(queued)
+        if inline:
+            delivery_connection(fail_silently=self.fail_silently).send_messages(inline)
+        return len(queued) + len(inline)
+
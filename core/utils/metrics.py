@@ -0,0 +1,190 @@
+import contextvars
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+
+DEFAULTS = {
+    'ENABLED': True,
+    # The same statement running this many times in one request is logged as a likely N+1
+    'REPEATED_QUERY_THRESHOLD': 10,
+    'DURATION_BUCKETS': (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+    'QUERY_BUCKETS': (0, 1, 2, 5, 10, 20, 50, 100),
+}
+
+_current = contextvars.ContextVar('request_queries', default=None)
+
+
+def get_options():
+    return {**DEFAULTS, **getattr(settings, 'REQUEST_METRICS', {})}
+
+
+class QueryStats:
+    """ORM queries run on behalf of one request: count, total time and repeats per statement"""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.statements = Counter()
+
+    def add(self, sql, seconds):
+        self.count += 1
+        self.seconds += seconds
+        self.statements[sql] += 1
+
+    def most_repeated(self):
+        """(sql, count) of the statement run most often, or (None, 0)"""
+        return self.statements.most_common(1)[0] if self.statements else (None, 0)
+
+
+def begin_request():
+    stats = QueryStats()
+    return stats, _current.set(stats)
+
+
+def end_request(token):
+    _current.reset(token)
+
+
+def record_query(execute, sql, params, many, context):
+    """
+    Execute wrapper installed on every connection. It only times queries
+    while a request is being measured; sync_to_async copies the context,
+    so queries from async views are attributed to their request too.
+    """
+    stats = _current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.add(sql, time.perf_counter() - start)
+
+
+@receiver(connection_created)
+def install_query_recorder(sender, connection, **kwargs):
+    # execute_wrappers outlives reconnects of the same connection object
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        index = len(self.buckets)
+        for position, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = position
+                break
+        self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        """(le, cumulative count) pairs, ending with +Inf"""
+        total = 0
+        for bound, count in zip(self.buckets + ('+Inf',), self.counts):
+            total += count
+            yield bound, total
+
+
+class RequestMetrics:
+    """
+    Per-endpoint request metrics of this process, rendered in the Prometheus
+    text format. With several workers each one reports its own numbers.
+    """
+
+    def __init__(self, duration_buckets, query_buckets):
+        self.duration_buckets = duration_buckets
+        self.query_buckets = query_buckets
+        self.requests = Counter()
+        self.n_plus_one = Counter()
+        self.durations = {}
+        self.queries = {}
+        self.db_seconds = {}
+        self._lock = threading.Lock()
+
+    def observe(self, method, route, status_code, duration, stats, repeated):
+        endpoint = (method, route)
+        with self._lock:
+            self.requests[(method, route, str(status_code))] += 1
+            self._histogram(self.durations, endpoint, self.duration_buckets).observe(duration)
+            self._histogram(self.queries, endpoint, self.query_buckets).observe(stats.count)
+            self._histogram(self.db_seconds, endpoint, self.duration_buckets).observe(stats.seconds)
+            if repeated:
+                self.n_plus_one[endpoint] += 1
+
+    @staticmethod
+    def _histogram(histograms, endpoint, buckets):
+        if endpoint not in histograms:
+            histograms[endpoint] = Histogram(buckets)
+        return histograms[endpoint]
+
+    def render(self, extra=()):
+        """Prometheus text exposition; `extra` adds (name, type, help, value) samples"""
+        lines = []
+        with self._lock:
+            self._counter(lines, 'http_requests_total', 'Requests by endpoint and status.',
+                          self.requests, ('method', 'route', 'status'))
+            self._histograms(lines, 'http_request_duration_seconds', 'Request wall time.', self.durations)
+            self._histograms(lines, 'http_request_queries', 'ORM queries per request.', self.queries)
+            self._histograms(lines, 'http_request_db_seconds', 'Time spent in ORM queries per request.',
+                             self.db_seconds)
+            self._counter(lines, 'http_request_n_plus_one_total', 'Requests that repeated one statement '
+                          'at least REPEATED_QUERY_THRESHOLD times.', self.n_plus_one, ('method', 'route'))
+        for name, kind, help_text, value in extra:
+            lines += [f'# HELP {name} {help_text}', f'# TYPE {name} {kind}', f'{name} {value}']
+        return '\n'.join(lines) + '\n'
+
+    @staticmethod
+    def _counter(lines, name, help_text, counter, label_names):
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} counter']
+        for labels, value in sorted(counter.items()):
+            lines.append(f'{name}{_labels(zip(label_names, labels))} {value}')
+
+    @staticmethod
+    def _histograms(lines, name, help_text, histograms):
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} histogram']
+        for (method, route), histogram in sorted(histograms.items()):
+            labels = [('method', method), ('route', route)]
+            for bound, count in histogram.cumulative():
+                lines.append(f'{name}_bucket{_labels(labels + [("le", bound)])} {count}')
+            lines.append(f'{name}_sum{_labels(labels)} {histogram.sum:.6f}')
+            lines.append(f'{name}_count{_labels(labels)} {histogram.count}')
+
+
+def _labels(pairs):
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+_metrics = None
+
+
+def get_metrics():
+    global _metrics
+    if _metrics is None:
+        options = get_options()
+        _metrics = RequestMetrics(options['DURATION_BUCKETS'], options['QUERY_BUCKETS'])
+    return _metrics
+
+
+@receiver(setting_changed)
+def _reset_metrics(*, setting, **kwargs):
+    global _metrics
+    if setting == 'REQUEST_METRICS':
+        _metrics = None
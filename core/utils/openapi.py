@@ -0,0 +1,128 @@
+"""
+The OpenAPI document behind /docs/ and /redoc/.
+
+drf_yasg builds it by walking every view and serializer, so it is built
+once instead of per page load: `manage.py generate_schema` writes it under
+STATIC_ROOT at deploy time, where WhiteNoise serves it with a content hash
+in the name and far-future cache headers. Without those files (development,
+tests) /docs/schema.json builds it on first use and keeps it in process
+memory. Either way the docs pages point at it through SPEC_URL.
+"""
+import gzip
+import hashlib
+import json
+import os
+import threading
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.templatetags.static import static
+from django.urls import reverse
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+ARTIFACT_DIR = 'openapi'
+MANIFEST = f'{ARTIFACT_DIR}/manifest.json'
+FORMATS = ('json', 'yaml')
+
+_lock = threading.Lock()
+_documents = {}
+_manifest = None
+
+
+def api_info():
+    from drf_yasg import openapi
+
+    return openapi.Info(
+        title="CodeLeap API",
+        default_version='v1',
+        description="Documentação interativa da API CodeLeap",
+    )
+
+
+def build_schema():
+    """Walks the URLconf for the public schema; the expensive part"""
+    from drf_yasg.generators import OpenAPISchemaGenerator
+
+    return OpenAPISchemaGenerator(api_info()).get_schema(request=None, public=True)
+
+
+def encode_schema(schema, fmt):
+    from drf_yasg.codecs import OpenAPICodecJson, OpenAPICodecYaml
+
+    codec = OpenAPICodecJson if fmt == 'json' else OpenAPICodecYaml
+    return codec(validators=[]).encode(schema)
+
+
+def schema_document(fmt='json'):
+    """The encoded schema, built on first call and kept for the life of the process"""
+    document = _documents.get(fmt)
+    if document is None:
+        with _lock:
+            document = _documents.get(fmt)
+            if document is None:
+                document = _documents[fmt] = encode_schema(build_schema(), fmt)
+    return document
+
+
+def write_artifacts(root):
+    """
+    Writes schema.<hash>.json/.yaml, unhashed schema.json/.yaml aliases and
+    gzip (plus brotli, when installed) variants WhiteNoise serves as is,
+    then the manifest naming the hashed files. Returns {format: relative path}.
+    """
+    schema = build_schema()
+    directory = os.path.join(root, ARTIFACT_DIR)
+    os.makedirs(directory, exist_ok=True)
+    written = {}
+    for fmt in FORMATS:
+        document = encode_schema(schema, fmt)
+        digest = hashlib.sha256(document).hexdigest()[:12]
+        for name in (f'schema.{digest}.{fmt}', f'schema.{fmt}'):
+            _write(os.path.join(directory, name), document)
+        written[fmt] = f'{ARTIFACT_DIR}/schema.{digest}.{fmt}'
+    # Last, so a reader never finds a manifest naming files not written yet
+    _write(os.path.join(root, MANIFEST), json.dumps(written, indent=2).encode(), compress=False)
+    return written
+
+
+def _write(path, content, compress=True):
+    with open(path, 'wb') as output:
+        output.write(content)
+    if not compress:
+        return
+    with open(f'{path}.gz', 'wb') as output:
+        output.write(gzip.compress(content, compresslevel=9, mtime=0))
+    if brotli is not None:
+        with open(f'{path}.br', 'wb') as output:
+            output.write(brotli.compress(content))
+
+
+def static_schema_path(fmt='json'):
+    """Path of the generated schema under STATIC_ROOT, or None before generate_schema ran"""
+    global _manifest
+    if _manifest is None:
+        try:
+            with open(os.path.join(settings.STATIC_ROOT, MANIFEST)) as manifest:
+                _manifest = json.load(manifest)
+        except (OSError, TypeError, ValueError):
+            _manifest = {}
+    return _manifest.get(fmt)
+
+
+def schema_url():
+    """SPEC_URL of the docs pages: the static artifact when there is one, the memoized view otherwise"""
+    path = static_schema_path()
+    return static(path) if path else reverse('openapi_schema')
+
+
+@receiver(setting_changed)
+def _reset_schema(*, setting, **kwargs):
+    global _manifest
+    if setting in ('STATIC_ROOT', 'STATIC_URL', 'ROOT_URLCONF'):
+        _manifest = None
+        _documents.clear()
@@ -0,0 +1,123 @@
+import base64
+import json
+from datetime import datetime
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.db.models import Q
+
+
+FEED_ORDERING = ('-created_at', '-id')
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(created_at, post_id, direction='next'):
+    """Encodes a (created_at, id) position into an opaque, URL-safe cursor"""
+    return encode_payload({'t': created_at.isoformat(), 'i': post_id, 'd': direction})
+
+
+def decode_cursor(cursor):
+    """Returns (created_at, id, direction) or raises InvalidCursor"""
+    try:
+        payload = decode_payload(cursor)
+        created_at = datetime.fromisoformat(payload['t'])
+        post_id = int(payload['i'])
+        direction = payload.get('d', 'next')
+    except (ValueError, KeyError, TypeError) as e:
+        raise InvalidCursor('Cursor inválido') from e
+    if direction not in ('next', 'previous'):
+        raise InvalidCursor('Cursor inválido')
+    return created_at, post_id, direction
+
+
+def encode_payload(payload):
+    data = json.dumps(payload, separators=(',', ':'))
+    return base64.urlsafe_b64encode(data.encode()).decode().rstrip('=')
+
+
+def decode_payload(cursor):
+    padded = cursor + '=' * (-len(cursor) % 4)
+    return json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+
+
+def get_page_size(raw_value):
+    default = getattr(settings, 'POSTS_PAGE_SIZE', 20)
+    maximum = getattr(settings, 'POSTS_MAX_PAGE_SIZE', 100)
+    if raw_value in (None, ''):
+        return default
+    try:
+        page_size = int(raw_value)
+    except (TypeError, ValueError):
+        return default
+    return max(1, min(page_size, maximum))
+
+
+def keyset_queryset(queryset, cursor=None):
+    """
+    Applies the cursor position to `queryset` and orders it in the walking
+    direction. Returns (queryset, direction).
+
+    The position is a WHERE clause on (created_at, id) instead of an OFFSET,
+    so every page is a bounded range scan over post_feed_idx. The redundant
+    bound on created_at alone lets the planner seek into the index; the OR
+    only resolves ties on the same timestamp.
+    """
+    if not cursor:
+        return queryset.order_by(*FEED_ORDERING), 'next'
+    created_at, post_id, direction = decode_cursor(cursor)
+    if direction == 'next':
+        queryset = queryset.filter(created_at__lte=created_at).filter(
+            Q(created_at__lt=created_at) | Q(id__lt=post_id)
+        )
+        return queryset.order_by(*FEED_ORDERING), direction
+    queryset = queryset.filter(created_at__gte=created_at).filter(
+        Q(created_at__gt=created_at) | Q(id__gt=post_id)
+    )
+    return queryset.order_by('created_at', 'id'), direction
+
+
+def keyset_page(queryset, cursor=None, page_size=20):
+    """
+    Returns one page of `queryset` ordered by (-created_at, -id) plus the
+    cursors for the neighbouring pages. One extra row is fetched to know
+    whether another page exists in the walking direction.
+    """
+    queryset, direction = keyset_queryset(queryset, cursor)
+    return _page(list(queryset[:page_size + 1]), cursor, direction, page_size)
+
+
+async def akeyset_page(queryset, cursor=None, page_size=20):
+    queryset, direction = keyset_queryset(queryset, cursor)
+    rows = [row async for row in queryset[:page_size + 1]]
+    return _page(rows, cursor, direction, page_size)
+
+
+def _page(rows, cursor, direction, page_size):
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    if direction == 'next':
+        has_next, has_previous = has_more, bool(cursor)
+    else:
+        rows.reverse()
+        has_next, has_previous = True, has_more
+
+    next_cursor = previous_cursor = None
+    if rows:
+        if has_next:
+            next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id, 'next')
+        if has_previous:
+            previous_cursor = encode_cursor(rows[0].created_at, rows[0].id, 'previous')
+    return rows, next_cursor, previous_cursor
+
+
+def page_link(request, cursor, page_size):
+    if cursor is None:
+        return None
+    query = request.GET.copy()
+    query['cursor'] = cursor
+    query['page_size'] = page_size
+    return request.build_absolute_uri(f'{request.path}?{urlencode(sorted(query.items()))}')
+
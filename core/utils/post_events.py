@@ -0,0 +1,196 @@
+import asyncio
+import json
+import logging
+import threading
+from collections import deque, namedtuple
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+from rest_framework.utils.encoders import JSONEncoder
+
+
+logger = logging.getLogger(__name__)
+
+Event = namedtuple('Event', ['id', 'type', 'data'])
+
+POST_CREATED = 'post.created'
+POST_UPDATED = 'post.updated'
+POST_DELETED = 'post.deleted'
+# Sent when a client resumes from an id that has already left the replay
+# buffer; the client has to refetch the feed instead of trusting the stream.
+STREAM_RESET = 'reset'
+
+DEFAULTS = {
+    'BACKEND': 'core.utils.post_events.InProcessHub',
+    'BUFFER_SIZE': 1000,
+    'SUBSCRIBER_QUEUE_SIZE': 100,
+    'POLL_INTERVAL': 1.0,
+}
+
+
+def encode_event_data(data):
+    return json.dumps(data, cls=JSONEncoder, separators=(',', ':'))
+
+
+class _Subscription:
+    def __init__(self, loop, maxsize):
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=maxsize)
+        self.overflowed = False
+
+    def deliver(self, event):
+        # Runs on the subscriber's event loop
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+
+class InProcessHub:
+    """
+    Fan-out of post events to the SSE streams of this process.
+
+    Publishers are usually sync views running in a worker thread, so events
+    are handed to each subscriber's event loop with call_soon_threadsafe. A
+    bounded buffer of recent events allows clients to resume from the last
+    event id they saw. Event ids are only unique within the process; use
+    DatabaseHub when several workers serve the API.
+    """
+
+    def __init__(self, buffer_size=1000, subscriber_queue_size=100, **options):
+        self._buffer = deque(maxlen=buffer_size)
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._last_id = 0
+        self.subscriber_queue_size = subscriber_queue_size
+
+    def publish(self, event_type, data):
+        return self.publish_many(event_type, [data])[0]
+
+    def publish_many(self, event_type, items):
+        payloads = [encode_event_data(data) for data in items]
+        with self._lock:
+            events = []
+            for payload in payloads:
+                self._last_id += 1
+                events.append(Event(self._last_id, event_type, payload))
+            self._buffer.extend(events)
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            try:
+                for event in events:
+                    subscription.loop.call_soon_threadsafe(subscription.deliver, event)
+            except RuntimeError:
+                # The subscriber's loop is closed; its stream is gone
+                self._discard(subscription)
+        return events
+
+    async def subscribe(self, last_event_id=None):
+        subscription = _Subscription(asyncio.get_running_loop(), self.subscriber_queue_size)
+        with self._lock:
+            self._subscribers.add(subscription)
+            backlog = list(self._buffer)
+            current = self._last_id
+        try:
+            last_seen = last_event_id
+            if last_event_id is not None:
+                oldest = backlog[0].id if backlog else current + 1
+                # Either events were evicted from the buffer or the id comes
+                # from before a restart; both mean the stream has a gap.
+                if last_event_id > current or oldest > last_event_id + 1:
+                    last_seen = current
+                    yield Event(current, STREAM_RESET, '{}')
+                else:
+                    for event in backlog:
+                        if event.id > last_event_id:
+                            last_seen = event.id
+                            yield event
+            while not subscription.overflowed:
+                event = await subscription.queue.get()
+                if last_seen is not None and event.id <= last_seen:
+                    continue
+                last_seen = event.id
+                yield event
+        finally:
+            self._discard(subscription)
+
+    def _discard(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+
+class DatabaseHub:
+    """
+    Broker stand-in for multi-worker deployments: events are appended to the
+    PostEvent table and every stream polls it, so any worker can serve any
+    subscriber and ids stay global. Only the newest BUFFER_SIZE rows are kept.
+    """
+
+    def __init__(self, buffer_size=1000, poll_interval=1.0, **options):
+        self.buffer_size = buffer_size
+        self.poll_interval = poll_interval
+        self._publish_count = 0
+
+    def publish(self, event_type, data):
+        return self.publish_many(event_type, [data])[0]
+
+    def publish_many(self, event_type, items):
+        from ..models import PostEvent
+        records = PostEvent.objects.bulk_create(
+            PostEvent(type=event_type, data=encode_event_data(data)) for data in items
+        )
+        previous_count = self._publish_count
+        self._publish_count += len(records)
+        if records and previous_count // 100 != self._publish_count // 100:
+            PostEvent.objects.filter(id__lte=records[-1].id - self.buffer_size).delete()
+        return [Event(record.id, record.type, record.data) for record in records]
+
+    async def subscribe(self, last_event_id=None):
+        from ..models import PostEvent
+        ids = PostEvent.objects.values_list('id', flat=True)
+        latest = await ids.order_by('-id').afirst() or 0
+        last_seen = latest if last_event_id is None else last_event_id
+        if last_event_id is not None:
+            oldest = await ids.order_by('id').afirst() or latest + 1
+            if last_event_id > latest or oldest > last_event_id + 1:
+                last_seen = latest
+                yield Event(latest, STREAM_RESET, '{}')
+        while True:
+            rows = PostEvent.objects.filter(id__gt=last_seen).order_by('id')[:100]
+            found = False
+            async for record in rows:
+                found = True
+                last_seen = record.id
+                yield Event(record.id, record.type, record.data)
+            if not found:
+                await asyncio.sleep(self.poll_interval)
+
+
+_event_hub = None
+
+
+def get_event_hub():
+    global _event_hub
+    if _event_hub is None:
+        options = {**DEFAULTS, **getattr(settings, 'POSTS_EVENT_HUB', {})}
+        backend = import_string(options.pop('BACKEND'))
+        _event_hub = backend(**{key.lower(): value for key, value in options.items()})
+    return _event_hub
+
+
+def publish_post_events(event_type, items):
+    """Publishes without ever failing the write that produced the events"""
+    try:
+        return get_event_hub().publish_many(event_type, items)
+    except Exception as e:
+        logger.error(f"Erro ao publicar evento {event_type}: {str(e)}", exc_info=True)
+        return []
+
+
+@receiver(setting_changed)
+def _reset_event_hub(*, setting, **kwargs):
+    global _event_hub
+    if setting == 'POSTS_EVENT_HUB':
+        _event_hub = None
@@ -0,0 +1,45 @@
+import json
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+
+_encoder = JSONEncoder()
+_OPTIONS = (orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS) if orjson else 0
+
+
+def dumps(data):
+    """
+    Compact JSON bytes, identical to DRF's JSONRenderer output (including
+    'Z' for UTC datetimes). Uses orjson when it is installed and the
+    standard library otherwise.
+    """
+    if orjson is not None:
+        try:
+            content = orjson.dumps(data, default=_encoder.default, option=_OPTIONS)
+        except orjson.JSONEncodeError:
+            # Integers beyond 64 bits and other values only the stdlib encoder takes
+            pass
+        else:
+            # DRF escapes these so the output stays a strict JavaScript subset
+            if b'\xe2\x80' in content:
+                content = content.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+            return content
+    content = json.dumps(data, cls=JSONEncoder, ensure_ascii=False, separators=(',', ':'))
+    return content.replace('\u2028', '\\u2028').replace('\u2029', '\\u2029').encode()
+
+
+class ORJSONRenderer(JSONRenderer):
+    """JSONRenderer backed by orjson; indented output still goes through DRF"""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+        return dumps(data)
@@ -0,0 +1,209 @@
+import re
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import Q
+from django.utils.html import escape
+
+from ..models.post import Post
+from .pagination import FEED_ORDERING, InvalidCursor, decode_payload, encode_payload, keyset_page
+
+
+FTS_TABLE = 'core_post_fts'
+_TOKEN = re.compile(r'\w+', re.UNICODE)
+# highlight() and snippet() wrap matches in these; the post text around them
+# is escaped before they are swapped for the HIGHLIGHT_START/END markup
+_MATCH_START = '\x02'
+_MATCH_END = '\x03'
+
+SEARCH_DEFAULTS = {
+    'TITLE_WEIGHT': 10.0,
+    'CONTENT_WEIGHT': 1.0,
+    'HIGHLIGHT_START': '<mark>',
+    'HIGHLIGHT_END': '</mark>',
+    'SNIPPET_TOKENS': 16,
+}
+
+# External-content FTS5 index over core_post(title, content). The index
+# stores only the tokens; row data is read back from core_post by rowid.
+# Triggers keep it in sync with every INSERT, UPDATE and DELETE issued
+# against the table, including bulk_create and queryset.update()/delete().
+#
+# SQLite drops a table's triggers when the table is rebuilt, which Django's
+# schema editor does for many AlterField/AddField operations. Migrations
+# that rebuild core_post must call create_search_index() again.
+_CREATE_STATEMENTS = (
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        title, content, content='core_post', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS core_post_fts_insert AFTER INSERT ON core_post BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, content) VALUES (new.id, new.title, new.content);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS core_post_fts_delete AFTER DELETE ON core_post BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, content)
+        VALUES ('delete', old.id, old.title, old.content);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS core_post_fts_update AFTER UPDATE OF title, content ON core_post BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, content)
+        VALUES ('delete', old.id, old.title, old.content);
+        INSERT INTO {FTS_TABLE}(rowid, title, content) VALUES (new.id, new.title, new.content);
+    END
+    """,
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+)
+_DROP_STATEMENTS = (
+    'DROP TRIGGER IF EXISTS core_post_fts_insert',
+    'DROP TRIGGER IF EXISTS core_post_fts_delete',
+    'DROP TRIGGER IF EXISTS core_post_fts_update',
+    f'DROP TABLE IF EXISTS {FTS_TABLE}',
+)
+
+# Title matches weigh more than content matches in bm25()
+_SEARCH_SQL = f"""
+    SELECT p.*,
+           s.rank, s.title_highlight, s.snippet
+    FROM (
+        SELECT rowid AS id,
+               bm25({FTS_TABLE}, %s, %s) AS rank,
+               highlight({FTS_TABLE}, 0, %s, %s) AS title_highlight,
+               snippet({FTS_TABLE}, 1, %s, %s, '…', %s) AS snippet
+        FROM {FTS_TABLE}
+        WHERE {FTS_TABLE} MATCH %s
+    ) s
+    JOIN core_post p ON p.id = s.id
+    {{where}}
+    ORDER BY s.rank, s.id
+    LIMIT %s
+"""
+
+
+def create_search_index(schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in _CREATE_STATEMENTS:
+        schema_editor.execute(statement)
+
+
+def drop_search_index(schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in _DROP_STATEMENTS:
+        schema_editor.execute(statement)
+
+
+@contextmanager
+def deferred_search_index(using='default'):
+    """
+    Drops the index and its triggers for a bulk load into core_post and
+    rebuilds it in one pass afterwards, which is much faster than feeding
+    the index row by row through the insert trigger.
+    """
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        yield
+        return
+    with connection.cursor() as cursor:
+        for statement in _DROP_STATEMENTS:
+            cursor.execute(statement)
+    try:
+        yield
+    finally:
+        with connection.cursor() as cursor:
+            for statement in _CREATE_STATEMENTS:
+                cursor.execute(statement)
+
+
+def match_expression(query):
+    """
+    Turns free text into an FTS5 query: every word must match and the last
+    one also matches as a prefix, so results follow the user as they type.
+    Words are quoted, so FTS5 operators in user input are matched literally.
+    """
+    tokens = _TOKEN.findall(query)
+    if not tokens:
+        return None
+    terms = [f'"{token}"' for token in tokens]
+    terms[-1] += '*'
+    return ' '.join(terms)
+
+
+def search_posts(query, cursor=None, page_size=20, using='default'):
+    """
+    Returns (posts, next_cursor). Each post carries `rank`, `title_highlight`
+    and `snippet` attributes, which are None on the fallback. Raises
+    InvalidCursor.
+    """
+    if connections[using].vendor == 'sqlite':
+        return _fts_search(query, cursor, page_size, using)
+    return _fallback_search(query, cursor, page_size)
+
+
+def _fts_search(query, cursor, page_size, using):
+    expression = match_expression(query)
+    if expression is None:
+        return [], None
+    options = {**SEARCH_DEFAULTS, **getattr(settings, 'POSTS_SEARCH', {})}
+    params = [
+        options['TITLE_WEIGHT'], options['CONTENT_WEIGHT'],
+        _MATCH_START, _MATCH_END,
+        _MATCH_START, _MATCH_END, options['SNIPPET_TOKENS'],
+        expression,
+    ]
+    where = ''
+    if cursor:
+        # (rank, id) keyset: rank ascending is best first, id breaks ties
+        rank, post_id = _decode_search_cursor(cursor)
+        where = 'WHERE s.rank > %s OR (s.rank = %s AND s.id > %s)'
+        params += [rank, rank, post_id]
+    params.append(page_size + 1)
+
+    rows = list(Post.objects.using(using).raw(_SEARCH_SQL.format(where=where), params).prefetch_related('author'))
+
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = encode_payload({'r': rows[-1].rank, 'i': rows[-1].id, 'k': 'search'})
+    for row in rows:
+        row.title_highlight = _mark(row.title_highlight, options)
+        row.snippet = _mark(row.snippet, options)
+    return rows, next_cursor
+
+
+def _mark(text, options):
+    """HTML-escapes highlighted post text, then turns the match sentinels into markup"""
+    return (
+        escape(text or '')
+        .replace(_MATCH_START, options['HIGHLIGHT_START'])
+        .replace(_MATCH_END, options['HIGHLIGHT_END'])
+    )
+
+
+def _fallback_search(query, cursor, page_size):
+    """Unranked substring search for backends without FTS5, newest first"""
+    queryset = Post.objects.all()
+    for token in _TOKEN.findall(query):
+        queryset = queryset.filter(Q(title__icontains=token) | Q(content__icontains=token))
+    posts, next_cursor, _ = keyset_page(queryset.select_related('author'), cursor, page_size)
+    for post in posts:
+        post.rank = post.title_highlight = post.snippet = None
+    return posts, next_cursor
+
+
+def _decode_search_cursor(cursor):
+    try:
+        payload = decode_payload(cursor)
+        if payload['k'] != 'search':
+            raise ValueError(cursor)
+        return float(payload['r']), int(payload['i'])
+    except (ValueError, KeyError, TypeError) as e:
+        raise InvalidCursor('Cursor inválido') from e
+
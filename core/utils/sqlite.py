@@ -0,0 +1,45 @@
+import logging
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+
+logger = logging.getLogger(__name__)
+
+# Applied to every new SQLite connection. WAL lets readers proceed while a
+# writer holds the lock; synchronous=NORMAL is durable across application
+# crashes under WAL and only risks the last transactions on power loss.
+DEFAULT_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'mmap_size': 268435456,
+    'cache_size': -20000,
+    'temp_store': 'MEMORY',
+}
+
+
+def get_pragmas():
+    pragmas = getattr(settings, 'SQLITE_PRAGMAS', DEFAULT_PRAGMAS)
+    return {name: value for name, value in pragmas.items() if value is not None}
+
+
+def apply_pragmas(connection, pragmas=None):
+    pragmas = get_pragmas() if pragmas is None else pragmas
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            # Names come from settings, never from requests; PRAGMA takes no bound parameters
+            cursor.execute(f'PRAGMA {name} = {value}')
+    return pragmas
+
+
+@receiver(connection_created)
+def configure_sqlite_connection(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite':
+        return
+    try:
+        apply_pragmas(connection)
+    except Exception as e:
+        # A read-only or in-memory database rejects some pragmas; keep the connection usable
+        logger.warning(f"Erro ao aplicar PRAGMAs do SQLite: {str(e)}")
@@ -0,0 +1,234 @@
+import datetime
+import json
+import logging
+import os
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db import close_old_connections, transaction
+from django.db.models import F, Q
+from django.dispatch import receiver
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'BACKEND': 'core.utils.tasks.ThreadPoolBackend',
+    'WORKERS': 4,
+    'MAX_RETRIES': 3,
+    'RETRY_BACKOFF': 2.0,
+    'RETRY_BACKOFF_MAX': 600.0,
+}
+
+
+class Task:
+    """
+    A function registered with @task. Calling it runs it inline; `enqueue`
+    hands it to the configured queue backend. Arguments must be JSON
+    serializable, since the database backend stores them.
+    """
+
+    def __init__(self, func, max_retries=None, retry_backoff=None):
+        self.func = func
+        self.name = f'{func.__module__}.{func.__qualname__}'
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.__doc__ = func.__doc__
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def __repr__(self):
+        return f'<Task {self.name}>'
+
+    def enqueue(self, *args, **kwargs):
+        return get_task_queue().enqueue(self, args, kwargs)
+
+    def retries(self, options):
+        return options['MAX_RETRIES'] if self.max_retries is None else self.max_retries
+
+    def retry_delay(self, attempt, options):
+        """Seconds before retry number `attempt` (1-based): backoff, 2 * backoff, 4 * backoff..."""
+        backoff = options['RETRY_BACKOFF'] if self.retry_backoff is None else self.retry_backoff
+        return min(backoff * 2 ** (attempt - 1), options['RETRY_BACKOFF_MAX'])
+
+
+def task(func=None, *, max_retries=None, retry_backoff=None):
+    """Registers a function as a task; usable as @task or @task(max_retries=5)"""
+    if func is None:
+        return lambda func: Task(func, max_retries, retry_backoff)
+    return Task(func, max_retries, retry_backoff)
+
+
+def resolve_task(name):
+    obj = import_string(name)
+    if not isinstance(obj, Task):
+        raise ImportError(f'{name} não é uma task')
+    return obj
+
+
+def encode_arguments(args, kwargs):
+    return json.dumps({'args': list(args), 'kwargs': kwargs}, separators=(',', ':'))
+
+
+def get_options():
+    return {**DEFAULTS, **getattr(settings, 'TASK_QUEUE', {})}
+
+
+class ImmediateBackend:
+    """
+    Runs tasks inline when enqueued, retrying at once on failure. Meant for
+    tests and development; errors are logged, never raised to the caller.
+    """
+
+    def __init__(self, **options):
+        self.options = get_options()
+
+    def enqueue(self, task, args, kwargs):
+        # Fails on arguments the other backends could not queue either
+        encode_arguments(args, kwargs)
+        for attempt in range(1, task.retries(self.options) + 2):
+            try:
+                task(*args, **kwargs)
+                return
+            except Exception as e:
+                logger.warning(f"Task {task.name} falhou (tentativa {attempt}): {str(e)}")
+        logger.error(f"Task {task.name} desistiu após {attempt} tentativas")
+
+
+class ThreadPoolBackend:
+    """
+    In-process queue: tasks run on a pool of daemon threads once the current
+    transaction commits, so they see the rows the request wrote. Retries are
+    rescheduled with exponential backoff. Queued work is lost if the process
+    exits; use DatabaseBackend for anything that must survive a restart.
+    """
+
+    def __init__(self, workers=4, **options):
+        self.options = get_options()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='task')
+
+    def enqueue(self, task, args, kwargs):
+        encode_arguments(args, kwargs)
+        transaction.on_commit(lambda: self._submit(task, args, kwargs, 1), robust=True)
+
+    def _submit(self, task, args, kwargs, attempt):
+        self._executor.submit(self._run, task, args, kwargs, attempt)
+
+    def _run(self, task, args, kwargs, attempt):
+        close_old_connections()
+        try:
+            task(*args, **kwargs)
+        except Exception as e:
+            if attempt > task.retries(self.options):
+                logger.error(f"Task {task.name} desistiu após {attempt} tentativas: {str(e)}", exc_info=True)
+                return
+            delay = task.retry_delay(attempt, self.options)
+            logger.warning(f"Task {task.name} falhou (tentativa {attempt}), nova tentativa em {delay:.0f}s: {str(e)}")
+            timer = threading.Timer(delay, self._submit, (task, args, kwargs, attempt + 1))
+            timer.daemon = True
+            timer.start()
+        finally:
+            close_old_connections()
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+
+class DatabaseBackend:
+    """
+    Durable queue: enqueue inserts a QueuedTask row in the caller's
+    transaction and `manage.py run_tasks` workers, in this or any other
+    process, claim and run them. Rows are deleted once their task succeeds
+    and kept with status 'failed' after the last retry.
+    """
+
+    def __init__(self, **options):
+        self.options = get_options()
+
+    def enqueue(self, task, args, kwargs):
+        from ..models.task import QueuedTask
+
+        return QueuedTask.objects.create(
+            name=task.name,
+            arguments=encode_arguments(args, kwargs),
+            max_attempts=task.retries(self.options) + 1,
+        )
+
+
+def worker_id():
+    return f'{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}'
+
+
+def claim_task(worker, lease_seconds):
+    """
+    Marks the next due row as running for `worker` and returns it, or None.
+    Rows left running by a worker that died are claimed again once their
+    lease expires. The claim is a conditional UPDATE, so two workers can
+    never both win the same row.
+    """
+    from ..models.task import QueuedTask
+
+    now = timezone.now()
+    due = QueuedTask.objects.filter(
+        Q(status=QueuedTask.PENDING, run_at__lte=now)
+        | Q(status=QueuedTask.RUNNING, locked_at__lt=now - datetime.timedelta(seconds=lease_seconds))
+    ).order_by('run_at', 'id')
+    for row_id, status in due.values_list('id', 'status')[:10]:
+        claimed = QueuedTask.objects.filter(id=row_id, status=status).filter(
+            Q(status=QueuedTask.PENDING) | Q(locked_at__lt=now - datetime.timedelta(seconds=lease_seconds))
+        ).update(status=QueuedTask.RUNNING, locked_by=worker, locked_at=now, attempts=F('attempts') + 1)
+        if claimed:
+            return QueuedTask.objects.get(id=row_id)
+    return None
+
+
+def run_claimed(row, options=None):
+    """Runs a claimed row; returns True when the task succeeded"""
+    from ..models.task import QueuedTask
+
+    options = options or get_options()
+    task = None
+    try:
+        task = resolve_task(row.name)
+        arguments = json.loads(row.arguments)
+        task(*arguments['args'], **arguments['kwargs'])
+    except Exception as e:
+        error = f'{type(e).__name__}: {e}'
+        if row.attempts >= row.max_attempts:
+            logger.error(f"Task {row.name} (#{row.id}) desistiu após {row.attempts} tentativas: {error}", exc_info=True)
+            QueuedTask.objects.filter(id=row.id).update(status=QueuedTask.FAILED, last_error=error, locked_by='')
+        else:
+            delay = task.retry_delay(row.attempts, options) if task else options['RETRY_BACKOFF']
+            logger.warning(f"Task {row.name} (#{row.id}) falhou (tentativa {row.attempts}), "
+                           f"nova tentativa em {delay:.0f}s: {error}")
+            QueuedTask.objects.filter(id=row.id).update(
+                status=QueuedTask.PENDING, last_error=error, locked_by='', locked_at=None,
+                run_at=timezone.now() + datetime.timedelta(seconds=delay),
+            )
+        return False
+    QueuedTask.objects.filter(id=row.id).delete()
+    return True
+
+
+_task_queue = None
+
+
+def get_task_queue():
+    global _task_queue
+    if _task_queue is None:
+        options = get_options()
+        backend = import_string(options.pop('BACKEND'))
+        _task_queue = backend(**{key.lower(): value for key, value in options.items()})
+    return _task_queue
+
+
+@receiver(setting_changed)
+def _reset_task_queue(*, setting, **kwargs):
+    global _task_queue
+    if setting == 'TASK_QUEUE':
+        _task_queue = None
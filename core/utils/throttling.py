@@ -0,0 +1,261 @@
+import logging
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db import connections, router
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+from rest_framework.exceptions import Throttled
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'ENABLED': True,
+    'STORE': 'core.utils.throttling.DatabaseBucketStore',
+    # Buckets untouched for this long are full again and can be dropped
+    'PURGE_AFTER': 86400,
+    'PURGE_INTERVAL': 600,
+}
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate):
+    """
+    DRF rate string to (capacity, tokens per second): '10/min' is a bucket
+    of 10 requests that refills one every 6 seconds. None disables the scope.
+    """
+    if not rate:
+        return None
+    num, period = rate.split('/')
+    capacity = int(num)
+    return capacity, capacity / PERIODS[period.strip()[0]]
+
+
+class LocalBucketStore:
+    """Buckets in process memory; for tests and single-process deployments"""
+
+    def __init__(self, **options):
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def consume(self, key, capacity, rate, cost=1, now=None):
+        now = time.time() if now is None else now
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + max(now - updated_at, 0) * rate)
+            granted = tokens >= cost
+            if granted:
+                tokens -= cost
+            self._buckets[key] = (tokens, now)
+        return granted, tokens
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+class DatabaseBucketStore:
+    """
+    Buckets in the ThrottleBucket table, shared by all gunicorn workers.
+    Refill, the allow/deny decision and the token deduction happen in one
+    INSERT ... ON CONFLICT DO UPDATE ... RETURNING statement, so concurrent
+    requests can never spend the same token. Needs SQLite 3.35+ or PostgreSQL.
+    """
+
+    def __init__(self, purge_after=86400, purge_interval=600, **options):
+        self.purge_after = purge_after
+        self.purge_interval = purge_interval
+        self._next_purge = 0
+
+    def consume(self, key, capacity, rate, cost=1, now=None):
+        from ..models.throttle import ThrottleBucket
+
+        now = time.time() if now is None else now
+        using = router.db_for_write(ThrottleBucket)
+        connection = connections[using]
+        table = connection.ops.quote_name(ThrottleBucket._meta.db_table)
+        least, greatest = ('MIN', 'MAX') if connection.vendor == 'sqlite' else ('LEAST', 'GREATEST')
+        # Refilled balance of the existing row; SET expressions all see the old values
+        refilled = f'{least}(%s, {table}.tokens + {greatest}(excluded.updated_at - {table}.updated_at, 0) * %s)'
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {table} ("key", tokens, updated_at, granted) VALUES (%s, %s, %s, %s) '
+                f'ON CONFLICT ("key") DO UPDATE SET '
+                f'tokens = {refilled} - CASE WHEN {refilled} >= %s THEN %s ELSE 0 END, '
+                f'granted = {refilled} >= %s, '
+                f'updated_at = excluded.updated_at '
+                f'RETURNING granted, tokens',
+                [
+                    key, max(capacity - cost, 0), now, capacity >= cost,
+                    capacity, rate, capacity, rate, cost, cost,
+                    capacity, rate, cost,
+                ],
+            )
+            granted, tokens = cursor.fetchone()
+        if now >= self._next_purge:
+            self._next_purge = now + self.purge_interval
+            self.purge(now - self.purge_after)
+        return bool(granted), tokens
+
+    def purge(self, before):
+        from ..models.throttle import ThrottleBucket
+
+        return ThrottleBucket.objects.filter(updated_at__lt=before).delete()[0]
+
+    def clear(self):
+        from ..models.throttle import ThrottleBucket
+
+        ThrottleBucket.objects.all().delete()
+
+
+_store = None
+
+
+def get_options():
+    return {**DEFAULTS, **getattr(settings, 'API_THROTTLING', {})}
+
+
+def get_throttle_store():
+    global _store
+    if _store is None:
+        options = get_options()
+        store = import_string(options.pop('STORE'))
+        _store = store(**{key.lower(): value for key, value in options.items()})
+    return _store
+
+
+@receiver(setting_changed)
+def _reset_throttle_store(*, setting, **kwargs):
+    global _store
+    if setting == 'API_THROTTLING':
+        _store = None
+
+
+def take_tokens(scope, key, cost=1):
+    """
+    Spends `cost` tokens from the bucket `key` at the rate of `scope`.
+    Returns (granted, seconds to wait when denied). Unrated scopes and an
+    unavailable store grant every request.
+    """
+    if not get_options()['ENABLED']:
+        return True, None
+    bucket = parse_rate(api_settings.DEFAULT_THROTTLE_RATES.get(scope)) if scope else None
+    if bucket is None:
+        return True, None
+    capacity, rate = bucket
+    try:
+        granted, tokens = get_throttle_store().consume(key, capacity, rate, cost)
+    except Exception as e:
+        logger.error(f"Erro ao consultar o limite de requisições {key}: {str(e)}", exc_info=True)
+        return True, None
+    if granted:
+        return True, None
+    return False, (cost - tokens) / rate if rate else None
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    DRF throttle backed by a token bucket in the shared store. Rates come
+    from REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'] under the scope returned
+    by get_scope; a scope without a rate is not throttled and costs nothing.
+    When the store is unavailable requests are let through.
+    """
+    cost = 1
+
+    def __init__(self):
+        self.wait_seconds = None
+
+    def get_scope(self, request, view):
+        raise NotImplementedError
+
+    def get_cache_key(self, request, view, scope):
+        raise NotImplementedError
+
+    def get_cost(self, request, view):
+        return self.cost
+
+    def allow_request(self, request, view):
+        if not get_options()['ENABLED']:
+            return True
+        scope = self.get_scope(request, view)
+        if not scope or not api_settings.DEFAULT_THROTTLE_RATES.get(scope):
+            return True
+        key = self.get_cache_key(request, view, scope)
+        if key is None:
+            return True
+        granted, self.wait_seconds = take_tokens(scope, key, self.get_cost(request, view))
+        return granted
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class IPTokenBucketThrottle(TokenBucketThrottle):
+    """Every DRF request, per client IP, at the 'ip' rate"""
+
+    def get_scope(self, request, view):
+        return 'ip'
+
+    def get_cache_key(self, request, view, scope):
+        return f'{scope}:{self.get_ident(request)}'
+
+
+class UserTokenBucketThrottle(TokenBucketThrottle):
+    """Every request of an authenticated user, at the 'user' rate"""
+
+    def get_scope(self, request, view):
+        return 'user'
+
+    def get_cache_key(self, request, view, scope):
+        if not request.user or not request.user.is_authenticated:
+            return None
+        return f'{scope}:{request.user.id}'
+
+
+class EndpointTokenBucketThrottle(TokenBucketThrottle):
+    """
+    Writes to one endpoint, rated under the view's `throttle_bucket` or else
+    its URL name ('login', 'createpost'...), so endpoints doing the same
+    thing can share a bucket. (Not DRF's `throttle_scope`, which
+    dj_rest_auth sets on all of its views.) Each user, or each IP for anonymous requests,
+    gets its own bucket per scope. A view's `get_throttle_cost(request)`
+    sets how many tokens a request spends. Safe methods are never throttled here.
+    """
+
+    def get_scope(self, request, view):
+        if request.method in ('GET', 'HEAD', 'OPTIONS'):
+            return None
+        scope = getattr(view, 'throttle_bucket', None)
+        if scope:
+            return scope
+        match = request.resolver_match
+        return match.url_name if match is not None else None
+
+    def get_cache_key(self, request, view, scope):
+        if request.user and request.user.is_authenticated:
+            return self.user_key(scope, request.user.id)
+        return f'endpoint:{scope}:ip:{self.get_ident(request)}'
+
+    def get_cost(self, request, view):
+        get_throttle_cost = getattr(view, 'get_throttle_cost', None)
+        return get_throttle_cost(request) if get_throttle_cost is not None else self.cost
+
+    @staticmethod
+    def user_key(scope, user_id):
+        return f'endpoint:{scope}:user:{user_id}'
+
+
+async def athrottle_endpoint(scope, user_id, cost=1):
+    """
+    The endpoint bucket check for async views outside DRF, sharing the
+    buckets of EndpointTokenBucketThrottle. Returns None when the request
+    may go ahead, else the Throttled error to answer with.
+    """
+    key = EndpointTokenBucketThrottle.user_key(scope, user_id)
+    granted, wait = await sync_to_async(take_tokens)(scope, key, cost)
+    return None if granted else Throttled(wait)
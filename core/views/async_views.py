@@ -0,0 +1,207 @@
+import json
+import logging
+
+from asgiref.sync import sync_to_async
+from django.db.models import F
+from django.http import HttpResponse, HttpResponseNotAllowed, QueryDict
+from django.utils import timezone
+from rest_framework import status
+
+from ..models.post import Post
+from ..serializers import PostSerializer, post_rows, represent_post, represent_rows
+from ..utils.conditional import (
+    afeed_validators, expected_versions, not_modified_response, set_validators, version_etag,
+)
+from ..utils.feed_cache import get_feed_cache
+from ..utils.jwt_auth import aauthenticate_jwt, auser_instance
+from ..utils.pagination import FEED_ORDERING, InvalidCursor, akeyset_page, get_page_size, page_link
+from ..utils.post_events import POST_CREATED, POST_DELETED, POST_UPDATED
+from ..utils.renderers import dumps
+from ..utils.throttling import athrottle_endpoint
+from .views import GetPostsView, post_written, version_conflict
+
+logger = logging.getLogger(__name__)
+
+# Async counterparts of the post CRUD views for ASGI deployments. They keep
+# the request/response contract of the DRF views but run on the event loop
+# with the async ORM, so waiting on the database does not pin a thread.
+
+
+def _json(data, status_code=status.HTTP_200_OK):
+    return HttpResponse(dumps(data), status=status_code, content_type='application/json')
+
+
+def _request_data(request):
+    """Parses a JSON or form-encoded body; raises ValueError on anything else"""
+    if request.content_type == 'application/json':
+        data = json.loads(request.body or b'{}')
+        if not isinstance(data, dict):
+            raise ValueError('O corpo da requisição deve ser um objeto JSON')
+        return data
+    return QueryDict(request.body)
+
+
+def _unauthorized():
+    return _json({'detail': 'As credenciais de autenticação não foram fornecidas.'}, status.HTTP_401_UNAUTHORIZED)
+
+
+def _throttled(exc):
+    # The 429 DRF would send for the same bucket
+    response = _json({'detail': exc.detail}, status.HTTP_429_TOO_MANY_REQUESTS)
+    if exc.wait is not None:
+        response['Retry-After'] = '%d' % exc.wait
+    return response
+
+
+async def async_posts(request):
+    """GET lists the feed, POST creates a post"""
+    if request.method not in ('GET', 'POST'):
+        return HttpResponseNotAllowed(['GET', 'POST'])
+    user = await aauthenticate_jwt(request)
+    if user is None:
+        return _unauthorized()
+    if request.method == 'GET':
+        return await _list_posts(request)
+    # One bucket with POST /createpost/ and /listposts/
+    throttled = await athrottle_endpoint('createpost', user.id)
+    if throttled is not None:
+        return _throttled(throttled)
+    return await _create_post(request, user)
+
+
+async def async_edit_post(request, post_id):
+    if request.method != 'PATCH':
+        return HttpResponseNotAllowed(['PATCH'])
+    user = await aauthenticate_jwt(request)
+    if user is None:
+        return _unauthorized()
+    try:
+        try:
+            request_data = _request_data(request)
+        except ValueError as e:
+            return _json({'detail': f'JSON inválido: {e}'}, status.HTTP_400_BAD_REQUEST)
+        data = {field: request_data[field] for field in ('title', 'content') if field in request_data}
+        try:
+            versions = expected_versions(request.headers.get('If-Match'), request_data.get('version'))
+        except ValueError as e:
+            return _json({'version': [str(e)]}, status.HTTP_400_BAD_REQUEST)
+        serializer = PostSerializer(data=data, partial=True)
+        if not serializer.is_valid():
+            return _json(serializer.errors, status.HTTP_400_BAD_REQUEST)
+        posts = Post.objects.filter(id=post_id, author_id=user.id)
+        updated = []
+        if versions is None or versions:
+            if versions is not None:
+                posts = posts.filter(version__in=versions)
+            updated = await posts.aupdate_returning(
+                **serializer.validated_data, updated_at=timezone.now(), version=F('version') + 1,
+            )
+        if not updated:
+            return await _ownership_error(post_id, 'Você não tem permissão para editar este post.', user.id)
+        post = updated[0]
+        post.author = await auser_instance(user)
+        response_data = represent_post(post)
+        await sync_to_async(post_written)(POST_UPDATED, response_data)
+        response = _json(response_data)
+        response['ETag'] = version_etag(post.version)
+        return response
+    except Exception as e:
+        logger.error(f"Erro ao editar post: {str(e)}", exc_info=True)
+        return _json({'error': 'Erro interno ao editar post', 'detail': str(e)}, status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+async def async_delete_post(request, post_id):
+    if request.method != 'DELETE':
+        return HttpResponseNotAllowed(['DELETE'])
+    user = await aauthenticate_jwt(request)
+    if user is None:
+        return _unauthorized()
+    try:
+        deleted = await Post.objects.filter(id=post_id, author_id=user.id).asoft_delete()
+        if not deleted:
+            return await _ownership_error(post_id, 'Você não tem permissão para deletar este post.')
+        await sync_to_async(post_written)(POST_DELETED, {'id': post_id})
+        return HttpResponse(status=status.HTTP_204_NO_CONTENT)
+    except Exception as e:
+        logger.error(f"Erro ao deletar post: {str(e)}", exc_info=True)
+        return _json({'error': 'Erro interno ao deletar post', 'detail': str(e)}, status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+async def _ownership_error(post_id, forbidden_message, user_id=None):
+    row = await Post.objects.filter(id=post_id).values_list('author_id', 'version').afirst()
+    if row is None:
+        return _json({'detail': 'Não encontrado.'}, status.HTTP_404_NOT_FOUND)
+    author_id, version = row
+    if user_id is None or str(author_id) != str(user_id):
+        return _json({'detail': forbidden_message}, status.HTTP_403_FORBIDDEN)
+    response = _json(version_conflict(version), status.HTTP_412_PRECONDITION_FAILED)
+    response['ETag'] = version_etag(version)
+    return response
+
+
+# Bearer tokens, not cookies, authenticate these views
+for _view in (async_posts, async_edit_post, async_delete_post):
+    _view.csrf_exempt = True
+
+
+async def _list_posts(request):
+    try:
+        etag = await afeed_validators(Post.objects.all(), request.get_full_path())
+        not_modified = not_modified_response(request, etag)
+        if not_modified is not None:
+            return not_modified
+
+        feed_cache = get_feed_cache()
+        if GetPostsView._wants_legacy_response(request):
+            data = await feed_cache.aget_or_set(None, None, _legacy_feed, marker=etag)
+            return set_validators(_json(data), etag)
+
+        page_size = get_page_size(request.GET.get('page_size'))
+        cursor = request.GET.get('cursor')
+        try:
+            page = await feed_cache.aget_or_set(
+                cursor, page_size, lambda: _feed_page(cursor, page_size), marker=etag,
+            )
+        except InvalidCursor as e:
+            return _json({'error': str(e)}, status.HTTP_400_BAD_REQUEST)
+        response = _json({
+            'next': page_link(request, page['next_cursor'], page_size),
+            'previous': page_link(request, page['previous_cursor'], page_size),
+            'results': page['results'],
+        })
+        return set_validators(response, etag)
+    except Exception as e:
+        logger.error(f"Erro ao listar posts: {str(e)}", exc_info=True)
+        return _json({'error': 'Erro interno ao listar posts', 'detail': str(e)}, status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+async def _legacy_feed():
+    return represent_rows([row async for row in post_rows(Post.objects.order_by(*FEED_ORDERING))])
+
+
+async def _feed_page(cursor, page_size):
+    rows, next_cursor, previous_cursor = await akeyset_page(post_rows(Post.objects.all(), named=True), cursor, page_size)
+    return {
+        'results': represent_rows(rows),
+        'next_cursor': next_cursor,
+        'previous_cursor': previous_cursor,
+    }
+
+
+async def _create_post(request, user):
+    try:
+        try:
+            data = _request_data(request).copy()
+        except ValueError as e:
+            return _json({'detail': f'JSON inválido: {e}'}, status.HTTP_400_BAD_REQUEST)
+        data['username'] = user.username
+        serializer = PostSerializer(data=data)
+        if not serializer.is_valid():
+            return _json(serializer.errors, status.HTTP_400_BAD_REQUEST)
+        post = await Post.objects.acreate(**serializer.validated_data, author=await auser_instance(user))
+        response_data = represent_post(post)
+        await sync_to_async(post_written)(POST_CREATED, response_data)
+        return _json(response_data, status.HTTP_201_CREATED)
+    except Exception as e:
+        logger.error(f"Erro ao criar post: {str(e)}", exc_info=True)
+        return _json({'error': 'Erro interno ao criar post', 'detail': str(e)}, status.HTTP_500_INTERNAL_SERVER_ERROR)
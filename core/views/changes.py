@@ -0,0 +1,59 @@
+import logging
+
+from django.conf import settings
+from django.db import router
+from rest_framework import permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from ..models.post import Post
+from ..utils.changes import ChangesExpired, changes_page, represent_changes
+
+logger = logging.getLogger(__name__)
+
+
+class PostChangesView(APIView):
+    """
+    Incremental sync: every post created, edited or deleted after the
+    sequence number `since`, in the order the changes happened. Clients
+    start from since=0, apply `results` and ask again with `until` while
+    `has_more` is true. A `since` older than the last tombstone purge gets
+    410 Gone and the client has to sync again from 0.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        try:
+            since = self._non_negative(request.GET.get('since', '0'))
+            if since is None:
+                return Response({'error': 'Parâmetro since inválido'}, status=status.HTTP_400_BAD_REQUEST)
+            limit = self._non_negative(request.GET.get('limit', str(getattr(settings, 'POSTS_CHANGES_PAGE_SIZE', 500))))
+            if not limit:
+                return Response({'error': 'Parâmetro limit inválido'}, status=status.HTTP_400_BAD_REQUEST)
+            limit = min(limit, getattr(settings, 'POSTS_CHANGES_MAX_PAGE_SIZE', 5000))
+            try:
+                rows, until, has_more = changes_page(since, limit, using=router.db_for_read(Post))
+            except ChangesExpired as e:
+                return Response({
+                    'error': 'Alterações anteriores a este ponto foram expurgadas; sincronize novamente a partir de since=0',
+                    'horizon': e.horizon,
+                }, status=status.HTTP_410_GONE)
+            response = Response({
+                'since': since,
+                'until': until,
+                'has_more': has_more,
+                'results': represent_changes(rows),
+            }, status=status.HTTP_200_OK)
+            response['Cache-Control'] = 'no-store'
+            return response
+        except Exception as e:
+            logger.error(f"Erro ao listar alterações de posts: {str(e)}", exc_info=True)
+            return Response({'error': 'Erro interno ao listar alterações de posts', 'detail': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    @staticmethod
+    def _non_negative(value):
+        try:
+            number = int(value)
+        except (TypeError, ValueError):
+            return None
+        return number if number >= 0 else None
@@ -0,0 +1,52 @@
+import hashlib
+
+from django.http import HttpResponse
+from django.views.decorators.http import etag, require_GET
+
+from ..utils.openapi import schema_document
+
+CONTENT_TYPES = {
+    'json': 'application/json',
+    'yaml': 'application/yaml',
+}
+
+
+def _schema_etag(request, fmt='json'):
+    return hashlib.sha256(schema_document(fmt)).hexdigest()[:12]
+
+
+@require_GET
+@etag(_schema_etag)
+def openapi_schema(request, fmt='json'):
+    """
+    The schema built once per process; the docs pages use it when
+    `manage.py generate_schema` has not written the static copy.
+    """
+    response = HttpResponse(schema_document(fmt), content_type=CONTENT_TYPES[fmt])
+    response['Cache-Control'] = 'no-cache'
+    return response
+
+
+def docs_ui(renderer):
+    """
+    /docs/ or /redoc/, with drf_yasg imported on the first page load rather
+    than when the URLconf is, which keeps it out of every worker's startup.
+    """
+    view = None
+
+    def docs(request, *args, **kwargs):
+        nonlocal view
+        if view is None:
+            from drf_yasg.views import get_schema_view
+            from rest_framework import permissions
+
+            from ..utils.openapi import api_info
+
+            view = get_schema_view(
+                api_info(), public=True, permission_classes=(permissions.AllowAny,),
+            ).with_ui(renderer, cache_timeout=0)
+        return view(request, *args, **kwargs)
+
+    # Like the DRF view it wraps; it is only built on the first request
+    docs.csrf_exempt = True
+    return docs
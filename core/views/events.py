@@ -0,0 +1,71 @@
+import asyncio
+import logging
+import time
+from contextlib import suppress
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponseNotAllowed, JsonResponse, StreamingHttpResponse
+
+from ..utils.jwt_auth import aauthenticate_jwt
+from ..utils.post_events import get_event_hub
+
+logger = logging.getLogger(__name__)
+
+
+async def post_events(request):
+    """Server-Sent Events stream of post create/edit/delete events"""
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+
+    user = await aauthenticate_jwt(request, allow_query_token=True)
+    if user is None:
+        return JsonResponse({'detail': 'Token inválido ou ausente'}, status=401)
+
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse({'error': 'O stream de eventos requer o servidor ASGI'}, status=501)
+
+    last_event_id = request.headers.get('Last-Event-ID') or request.GET.get('last_event_id')
+    try:
+        last_event_id = int(last_event_id) if last_event_id not in (None, '') else None
+    except ValueError:
+        return JsonResponse({'error': 'Last-Event-ID inválido'}, status=400)
+
+    response = StreamingHttpResponse(
+        _event_stream(get_event_hub().subscribe(last_event_id)),
+        content_type='text/event-stream',
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+async def _event_stream(events):
+    heartbeat = getattr(settings, 'POSTS_EVENT_HEARTBEAT_SECONDS', 15)
+    # Streams end after a while so that clients whose disconnect went
+    # unnoticed do not pin a subscription forever; EventSource reconnects
+    # with Last-Event-ID and resumes where it left off.
+    deadline = time.monotonic() + getattr(settings, 'POSTS_EVENT_STREAM_MAX_SECONDS', 300)
+    pending = None
+    try:
+        yield f'retry: {getattr(settings, "POSTS_EVENT_RETRY_MS", 3000)}\n\n'
+        while time.monotonic() < deadline:
+            if pending is None:
+                pending = asyncio.ensure_future(events.__anext__())
+            done, _ = await asyncio.wait({pending}, timeout=heartbeat)
+            if not done:
+                yield ': keep-alive\n\n'
+                continue
+            try:
+                event = pending.result()
+            except StopAsyncIteration:
+                return
+            finally:
+                pending = None
+            yield f'id: {event.id}\nevent: {event.type}\ndata: {event.data}\n\n'
+    finally:
+        if pending is not None:
+            pending.cancel()
+            with suppress(asyncio.CancelledError, StopAsyncIteration):
+                await pending
+        await events.aclose()
@@ -0,0 +1,137 @@
+import logging
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework import permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from ..models.post import Post
+from ..serializers import post_rows, represent_rows
+from ..utils.renderers import dumps
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPES = {
+    'json': 'application/json',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+class ExportPostsView(APIView):
+    """
+    Streams every post, oldest first, as a JSON array or as NDJSON
+    (`?output=ndjson`). Rows are read in chunks with a server-side iterator
+    and written out as they arrive, so memory does not grow with the table.
+    Under ASGI the body is an async iterator: Django would otherwise drain a
+    sync iterator into a list before sending the first byte.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        try:
+            output = request.GET.get('output', 'json')
+            if output not in CONTENT_TYPES:
+                return Response({'error': f'Formato inválido: {output}'}, status=status.HTTP_400_BAD_REQUEST)
+
+            queryset = Post.objects.order_by('created_at', 'id')
+            since = request.GET.get('since')
+            if since:
+                since = self._parse_since(since)
+                if since is None:
+                    return Response({'error': 'Parâmetro since inválido'}, status=status.HTTP_400_BAD_REQUEST)
+                queryset = queryset.filter(created_at__gte=since)
+
+            chunk_size = getattr(settings, 'POSTS_EXPORT_CHUNK_SIZE', 2000)
+            if isinstance(request._request, ASGIRequest):
+                batches = _abatches(post_rows(queryset).iterator(chunk_size=chunk_size), chunk_size)
+                stream = _andjson(batches) if output == 'ndjson' else _ajson_array(batches)
+            else:
+                batches = _batches(post_rows(queryset).iterator(chunk_size=chunk_size), chunk_size)
+                stream = _ndjson(batches) if output == 'ndjson' else _json_array(batches)
+            response = StreamingHttpResponse(stream, content_type=CONTENT_TYPES[output])
+            response['Cache-Control'] = 'no-store'
+            return response
+        except Exception as e:
+            logger.error(f"Erro ao exportar posts: {str(e)}", exc_info=True)
+            return Response({'error': 'Erro interno ao exportar posts', 'detail': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    @staticmethod
+    def _parse_since(value):
+        """Accepts an ISO 8601 datetime or a date; naive values use the current timezone"""
+        try:
+            since = parse_datetime(value)
+            if since is None:
+                date = parse_date(value)
+                if date is None:
+                    return None
+                since = timezone.datetime.combine(date, timezone.datetime.min.time())
+        except ValueError:
+            return None
+        if timezone.is_naive(since):
+            since = timezone.make_aware(since)
+        return since
+
+
+def _encode(batch):
+    return [dumps(post).decode() for post in represent_rows(batch)]
+
+
+def _batches(rows, chunk_size):
+    """Yields lists of encoded rows, one list per chunk read from the database"""
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= chunk_size:
+            yield _encode(batch)
+            batch = []
+    if batch:
+        yield _encode(batch)
+
+
+async def _abatches(rows, chunk_size):
+    """
+    Async counterpart of `_batches`. Each chunk is read from the sync iterator
+    in the database thread; `aiterator()` can't be used because Django 4.2
+    runs values_list queries on the event loop.
+    """
+    read = sync_to_async(lambda: list(islice(rows, chunk_size)))
+    try:
+        while batch := await read():
+            yield _encode(batch)
+    finally:
+        await sync_to_async(rows.close)()
+
+
+def _ndjson(batches):
+    for batch in batches:
+        yield ('\n'.join(batch) + '\n').encode()
+
+
+async def _andjson(batches):
+    async for batch in batches:
+        yield ('\n'.join(batch) + '\n').encode()
+
+
+def _json_array(batches):
+    yield b'['
+    separator = ''
+    for batch in batches:
+        yield (separator + ','.join(batch)).encode()
+        separator = ','
+    yield b']'
+
+
+async def _ajson_array(batches):
+    yield b'['
+    separator = ''
+    async for batch in batches:
+        yield (separator + ','.join(batch)).encode()
+        separator = ','
+    yield b']'
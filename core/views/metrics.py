@@ -0,0 +1,22 @@
+from django.http import HttpResponse
+from rest_framework import permissions
+from rest_framework.views import APIView
+
+from ..utils.feed_cache import get_feed_cache
+from ..utils.metrics import get_metrics
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class MetricsView(APIView):
+    """Request histograms and feed cache counters of this process, in the Prometheus text format"""
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        cache = get_feed_cache().stats()
+        body = get_metrics().render(extra=[
+            ('feed_cache_hits_total', 'counter', 'Feed pages served from the cache.', cache['hits']),
+            ('feed_cache_misses_total', 'counter', 'Feed pages computed from the database.', cache['misses']),
+            ('feed_cache_entries', 'gauge', 'Feed pages currently cached.', cache['entries']),
+        ])
+        return HttpResponse(body, content_type=PROMETHEUS_CONTENT_TYPE)
@@ -0,0 +1,50 @@
+import logging
+
+from django.db import router
+from rest_framework import permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from ..models.post import Post
+from ..serializers import represent_post
+from ..utils.pagination import InvalidCursor, get_page_size, page_link
+from ..utils.search import search_posts
+
+logger = logging.getLogger(__name__)
+
+
+class SearchPostsView(APIView):
+    """
+    Full-text search over post titles and content, best matches first.
+    On SQLite results come from the FTS5 index with bm25 ranking and
+    highlighted snippets; other backends fall back to substring matching.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        try:
+            query = request.GET.get('q', '').strip()
+            if not query:
+                return Response({'error': 'Informe o termo de busca em q'}, status=status.HTTP_400_BAD_REQUEST)
+            page_size = get_page_size(request.GET.get('page_size'))
+            try:
+                posts, next_cursor = search_posts(
+                    query, request.GET.get('cursor'), page_size, using=router.db_for_read(Post),
+                )
+            except InvalidCursor as e:
+                return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+            return Response({
+                'next': page_link(request, next_cursor, page_size),
+                'results': [
+                    {
+                        **represent_post(post),
+                        'rank': post.rank,
+                        'title_highlight': post.title_highlight,
+                        'snippet': post.snippet,
+                    }
+                    for post in posts
+                ],
+            }, status=status.HTTP_200_OK)
+        except Exception as e:
+            logger.error(f"Erro ao buscar posts: {str(e)}", exc_info=True)
+            return Response({'error': 'Erro interno ao buscar posts', 'detail': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -2,17 +2,27 @@ from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status, permissions
-from django.shortcuts import get_object_or_404
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
+from django.conf import settings
+from django.db import router, transaction
+from django.db.models import F
+from django.utils import timezone
 from ..models.post import Post
 
-from ..serializers import PostSerializer
+from ..serializers import PostSerializer, post_rows, represent_post, represent_rows
+from ..utils.audit import GOOGLE_LOGIN, LOGIN, REGISTER, audit_auth_event
+from ..utils.conditional import (
+    expected_versions, feed_validators, not_modified_response, set_validators, version_etag,
+)
+from ..utils.db_router import pin_to_primary
+from ..utils.feed_cache import get_feed_cache
+from ..utils.google_certs import get_google_certs
+from ..utils.jwt_auth import UserRefreshToken, user_instance
+from ..utils.pagination import FEED_ORDERING, InvalidCursor, get_page_size, keyset_page, page_link
+from ..utils.post_events import POST_CREATED, POST_DELETED, POST_UPDATED, publish_post_events
 
-from google.oauth2 import id_token
-from google.auth.transport import requests
 from django.contrib.auth import get_user_model, authenticate
-from rest_framework_simplejwt.tokens import RefreshToken
 import os
 import logging
 
@@ -27,15 +37,45 @@ from django.views.decorators.http import require_GET
 def health_check(request):
     return JsonResponse({"status": "ok"})
 
+
+def ownership_error(post_id, forbidden_message, user_id=None):
+    """
+    404 or 403 for a conditional write on post_id that matched no row. Given
+    `user_id`, a miss on a post that user owns means the version
+    precondition failed: 412 with the current version.
+    """
+    row = Post.objects.filter(id=post_id).values_list('author_id', 'version').first()
+    if row is None:
+        return Response({'detail': 'Não encontrado.'}, status=status.HTTP_404_NOT_FOUND)
+    author_id, version = row
+    # Token users carry their id as a string
+    if user_id is None or str(author_id) != str(user_id):
+        return Response({'detail': forbidden_message}, status=status.HTTP_403_FORBIDDEN)
+    response = Response(version_conflict(version), status=status.HTTP_412_PRECONDITION_FAILED)
+    response['ETag'] = version_etag(version)
+    return response
+
+
+def version_conflict(version):
+    """Body of the 412 sent when an edit's expected version is no longer current"""
+    return {'detail': 'O post foi alterado por outra requisição.', 'version': version}
+
+
+def post_written(event_type, data):
+    """Side effects shared by every successful post write"""
+    posts_written(event_type, [data])
+
+
+def posts_written(event_type, items):
+    pin_to_primary()
+    get_feed_cache().invalidate()
+    publish_post_events(event_type, items)
+
 @method_decorator(csrf_exempt, name='dispatch')
 class GoogleLoginJWT(APIView):
     permission_classes = [permissions.AllowAny]
     
     def post(self, request, *args, **kwargs):
-        logger.info("=== Iniciando autenticação Google ===")
-        logger.info(f"Request data: {request.data}")
-        logger.info(f"Headers: {request.headers}")
-        
         try:
             token = request.data.get('token')
             
@@ -45,11 +85,8 @@ class GoogleLoginJWT(APIView):
                     'error': 'Token não fornecido'
                 }, status=status.HTTP_400_BAD_REQUEST)
             
-            logger.info(f"Token recebido (primeiros 50 chars): {token[:50]}...")
-            
 
             client_id = os.getenv('GOOGLE_CLIENT_ID')
-            logger.info(f"Google Client ID: {client_id}")
             
             if not client_id:
                 logger.error("GOOGLE_CLIENT_ID não configurado")
@@ -58,18 +95,12 @@ class GoogleLoginJWT(APIView):
                 }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
             
             try:
-                logger.info("Verificando token com Google...")
-
-                idinfo = id_token.verify_oauth2_token(
-                    token, 
-                    requests.Request(), 
+                idinfo = get_google_certs().verify_oauth2_token(
+                    token,
                     client_id,
                     clock_skew_in_seconds=300
                 )
                 
-                logger.info(f"Token verificado com sucesso! Email: {idinfo.get('email')}")
-                logger.info(f"Issuer: {idinfo.get('iss')}")
-                
 
                 if idinfo['iss'] not in ['accounts.google.com', 'https://accounts.google.com']:
                     logger.error(f"Issuer inválido: {idinfo['iss']}")
@@ -82,8 +113,6 @@ class GoogleLoginJWT(APIView):
                 first_name = idinfo.get('given_name', '')
                 last_name = idinfo.get('family_name', '')
                 
-                logger.info(f"Buscando/criando usuário para email: {email}")
-                
 
                 user, created = User.objects.get_or_create(
                     email=email,
@@ -94,12 +123,10 @@ class GoogleLoginJWT(APIView):
                     }
                 )
                 
-                logger.info(f"Usuário {'criado' if created else 'encontrado'}: {user.username}")
-                
+                logger.debug(f"Login Google: usuário {'criado' if created else 'encontrado'}: {user.username}")
+                audit_auth_event(request, REGISTER if created else GOOGLE_LOGIN, user)
 
-                refresh = RefreshToken.for_user(user)
-                
-                logger.info("Tokens JWT gerados com sucesso!")
+                refresh = UserRefreshToken.for_user(user)
                 
                 return Response({
                     'refresh': str(refresh),
@@ -158,9 +185,9 @@ class RegisterView(APIView):
                 email=email,
                 password=password
             )
-            
+            audit_auth_event(request, REGISTER, user)
 
-            refresh = RefreshToken.for_user(user)
+            refresh = UserRefreshToken.for_user(user)
             
             return Response({
                 'refresh': str(refresh),
@@ -198,9 +225,9 @@ class LoginView(APIView):
             return Response({
                 'error': 'Credenciais inválidas'
             }, status=status.HTTP_401_UNAUTHORIZED)
-        
+        audit_auth_event(request, LOGIN, user)
 
-        refresh = RefreshToken.for_user(user)
+        refresh = UserRefreshToken.for_user(user)
         
         return Response({
             'refresh': str(refresh),
@@ -217,10 +244,12 @@ class DeletePostView(APIView):
     permission_classes = [permissions.IsAuthenticated]
     def delete(self, request, post_id):
         try:
-            post = get_object_or_404(Post, id=post_id)
-            if post.username != request.user.username:
-                return Response({'detail': 'Você não tem permissão para deletar este post.'}, status=status.HTTP_403_FORBIDDEN)
-            post.delete()
+            # Ownership is part of the UPDATE itself; only a miss costs a second query.
+            # The row stays behind as a tombstone for /posts/changes/.
+            deleted = Post.objects.filter(id=post_id, author_id=request.user.id).soft_delete()
+            if not deleted:
+                return ownership_error(post_id, 'Você não tem permissão para deletar este post.')
+            post_written(POST_DELETED, {'id': post_id})
             return Response({'detail': 'Post deleted successfully.'}, status=status.HTTP_204_NO_CONTENT)
         except Exception as e:
             logger.error(f"Erro ao deletar post: {str(e)}", exc_info=True)
@@ -230,25 +259,35 @@ class PatchPostView(APIView):
     permission_classes = [permissions.IsAuthenticated]
     def patch(self, request, post_id):
         try:
-            post = get_object_or_404(Post, id=post_id)
-            if post.username != request.user.username:
-                return Response({'detail': 'Você não tem permissão para editar este post.'}, status=status.HTTP_403_FORBIDDEN)
             data = {}
             if 'title' in request.data:
                 data['title'] = request.data['title']
             if 'content' in request.data:
                 data['content'] = request.data['content']
-            serializer = PostSerializer(post, data=data, partial=True)
+            try:
+                versions = expected_versions(request.headers.get('If-Match'), request.data.get('version'))
+            except ValueError as e:
+                return Response({'version': [str(e)]}, status=status.HTTP_400_BAD_REQUEST)
+            serializer = PostSerializer(data=data, partial=True)
             if serializer.is_valid():
-                post = serializer.save()
-                response_data = {
-                    'id': post.id,
-                    'username': post.username,
-                    'created_datetime': post.created_at,
-                    'title': post.title,
-                    'content': post.content
-                }
-                return Response(response_data, status=status.HTTP_200_OK)
+                # One UPDATE ... RETURNING that enforces ownership and the expected version
+                posts = Post.objects.filter(id=post_id, author_id=request.user.id)
+                updated = []
+                if versions is None or versions:
+                    if versions is not None:
+                        posts = posts.filter(version__in=versions)
+                    updated = posts.update_returning(
+                        **serializer.validated_data, updated_at=timezone.now(), version=F('version') + 1,
+                    )
+                if not updated:
+                    return ownership_error(post_id, 'Você não tem permissão para editar este post.', request.user.id)
+                post = updated[0]
+                post.author = user_instance(request.user)
+                response_data = represent_post(post)
+                post_written(POST_UPDATED, response_data)
+                response = Response(response_data, status=status.HTTP_200_OK)
+                response['ETag'] = version_etag(post.version)
+                return response
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             logger.error(f"Erro ao editar post: {str(e)}", exc_info=True)
@@ -281,22 +320,52 @@ class GetPostsView(APIView):
     permission_classes = [IsAuthenticated]
     def get(self, request):
         try:
-            posts = Post.objects.all().order_by('-created_at')
-            data = [
-                {
-                    'id': post.id,
-                    'username': post.username,
-                    'created_datetime': post.created_at,
-                    'title': post.title,
-                    'content': post.content
-                }
-                for post in posts
-            ]
-            return Response(data)
+            etag = feed_validators(Post.objects.all(), request.get_full_path())
+            not_modified = not_modified_response(request, etag)
+            if not_modified is not None:
+                return not_modified
+
+            feed_cache = get_feed_cache()
+            if self._wants_legacy_response(request):
+                data = feed_cache.get_or_set(None, None, self._legacy_feed, marker=etag)
+                return set_validators(Response(data), etag)
+
+            page_size = get_page_size(request.query_params.get('page_size'))
+            cursor = request.query_params.get('cursor')
+            try:
+                page = feed_cache.get_or_set(
+                    cursor, page_size, lambda: self._feed_page(cursor, page_size), marker=etag,
+                )
+            except InvalidCursor as e:
+                return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+            response = Response({
+                'next': page_link(request, page['next_cursor'], page_size),
+                'previous': page_link(request, page['previous_cursor'], page_size),
+                'results': page['results'],
+            })
+            return set_validators(response, etag)
         except Exception as e:
             logger.error(f"Erro ao listar posts: {str(e)}", exc_info=True)
             return Response({'error': 'Erro interno ao listar posts', 'detail': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+    @staticmethod
+    def _wants_legacy_response(request):
+        """Clients that send no cursor/page_size keep the plain list response"""
+        if 'cursor' in request.GET or 'page_size' in request.GET:
+            return False
+        return getattr(settings, 'POSTS_FEED_LEGACY_RESPONSE', True)
+
+    def _legacy_feed(self):
+        return represent_rows(post_rows(Post.objects.order_by(*FEED_ORDERING)))
+
+    def _feed_page(self, cursor, page_size):
+        rows, next_cursor, previous_cursor = keyset_page(post_rows(Post.objects.all(), named=True), cursor, page_size)
+        return {
+            'results': represent_rows(rows),
+            'next_cursor': next_cursor,
+            'previous_cursor': previous_cursor,
+        }
+
 
 class CreatePostView(APIView):
     permission_classes = [permissions.IsAuthenticated]
@@ -306,14 +375,9 @@ class CreatePostView(APIView):
             data['username'] = request.user.username
             serializer = PostSerializer(data=data)
             if serializer.is_valid():
-                post = serializer.save()
-                response_data = {
-                    'id': post.id,
-                    'username': post.username,
-                    'created_datetime': post.created_at,
-                    'title': post.title,
-                    'content': post.content
-                }
+                post = serializer.save(author=user_instance(request.user))
+                response_data = represent_post(post)
+                post_written(POST_CREATED, response_data)
                 return Response(response_data, status=status.HTTP_201_CREATED)
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
@@ -324,6 +388,8 @@ class CreatePostView(APIView):
 class PostsRouterView(APIView):
     """Routes GET and POST requests to separate views"""
     permission_classes = [IsAuthenticated]
+    # Creating here spends from the same bucket as POST /createpost/
+    throttle_bucket = 'createpost'
 
     def get(self, request):
         """List all posts"""
@@ -334,3 +400,114 @@ class PostsRouterView(APIView):
         """Create a new post"""
         create_view = CreatePostView()
         return create_view.post(request)
+
+
+class BulkPostsView(APIView):
+    """
+    POST creates an array of posts, DELETE soft-deletes an array of post ids.
+    Each request runs in one transaction and a fixed handful of queries,
+    however many items it carries.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    # SQLite caps bound parameters per statement; id lists are sent in chunks
+    ID_CHUNK_SIZE = 500
+
+    def get_throttle_cost(self, request):
+        """One token of the 'bulk_posts' bucket per item, so a request weighs what it writes"""
+        data = request.data
+        items = data.get('posts' if request.method == 'POST' else 'ids') if isinstance(data, dict) else data
+        if not isinstance(items, list) or not items:
+            return 1
+        # Longer lists are rejected anyway; never ask for more than a full bucket
+        return min(len(items), getattr(settings, 'POSTS_BULK_MAX_ITEMS', 5000))
+
+    def post(self, request):
+        try:
+            items = self._items(request.data, 'posts')
+            if isinstance(items, Response):
+                return items
+            data = [
+                {**item, 'username': request.user.username} if isinstance(item, dict) else item
+                for item in items
+            ]
+            serializer = PostSerializer(data=data, many=True)
+            if not serializer.is_valid():
+                # All or nothing: report which items failed and create none
+                return Response({
+                    'created': 0,
+                    'results': [
+                        {'index': index, 'status': 'invalid', 'errors': item_errors} if item_errors
+                        else {'index': index, 'status': 'valid'}
+                        for index, item_errors in enumerate(serializer.errors)
+                    ],
+                }, status=status.HTTP_400_BAD_REQUEST)
+            author = user_instance(request.user)
+            with transaction.atomic(using=router.db_for_write(Post)):
+                posts = Post.objects.bulk_create(
+                    Post(**fields, author=author) for fields in serializer.validated_data
+                )
+            created = [represent_post(post) for post in posts]
+            posts_written(POST_CREATED, created)
+            return Response({
+                'created': len(created),
+                'results': [
+                    {'index': index, 'status': 'created', 'post': post_data}
+                    for index, post_data in enumerate(created)
+                ],
+            }, status=status.HTTP_201_CREATED)
+        except Exception as e:
+            logger.error(f"Erro ao criar posts em lote: {str(e)}", exc_info=True)
+            return Response({'error': 'Erro interno ao criar posts em lote', 'detail': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    def delete(self, request):
+        try:
+            items = self._items(request.data, 'ids')
+            if isinstance(items, Response):
+                return items
+            if not all(isinstance(post_id, int) and not isinstance(post_id, bool) for post_id in items):
+                return Response({'detail': 'Os ids devem ser números inteiros.'}, status=status.HTTP_400_BAD_REQUEST)
+            post_ids = list(dict.fromkeys(items))
+            # Token users carry their id as a string
+            user_id = str(request.user.pk)
+            with transaction.atomic(using=router.db_for_write(Post)):
+                owners = {}
+                for chunk in self._chunks(post_ids):
+                    owners.update(Post.objects.filter(id__in=chunk).values_list('id', 'author_id'))
+                owned = [post_id for post_id in post_ids if str(owners.get(post_id)) == user_id]
+                for chunk in self._chunks(owned):
+                    # The author filter is the ownership rule itself, not just a re-check
+                    Post.objects.filter(id__in=chunk, author_id=user_id).soft_delete()
+            if owned:
+                posts_written(POST_DELETED, [{'id': post_id} for post_id in owned])
+            return Response({
+                'deleted': len(owned),
+                'results': [
+                    {'id': post_id, 'status': self._delete_status(post_id, owners, user_id)}
+                    for post_id in post_ids
+                ],
+            }, status=status.HTTP_200_OK)
+        except Exception as e:
+            logger.error(f"Erro ao deletar posts em lote: {str(e)}", exc_info=True)
+            return Response({'error': 'Erro interno ao deletar posts em lote', 'detail': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    @staticmethod
+    def _items(data, key):
+        """Accepts a bare JSON array or an object wrapping it under `key`"""
+        items = data.get(key) if isinstance(data, dict) else data
+        if not isinstance(items, list) or not items:
+            return Response({'detail': f'Envie uma lista não vazia (ou um objeto com "{key}").'}, status=status.HTTP_400_BAD_REQUEST)
+        max_items = getattr(settings, 'POSTS_BULK_MAX_ITEMS', 5000)
+        if len(items) > max_items:
+            return Response({'detail': f'No máximo {max_items} itens por requisição.'}, status=status.HTTP_400_BAD_REQUEST)
+        return items
+
+    @classmethod
+    def _chunks(cls, values):
+        for start in range(0, len(values), cls.ID_CHUNK_SIZE):
+            yield values[start:start + cls.ID_CHUNK_SIZE]
+
+    @staticmethod
+    def _delete_status(post_id, owners, user_id):
+        if post_id not in owners:
+            return 'not_found'
+        return 'deleted' if str(owners[post_id]) == user_id else 'forbidden'